@@ -0,0 +1,161 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+End-to-end benchmark of the ingestion process, running entirely offline:
+a local pyftpdlib server serves synthetic FLoX data, which is ingested into
+a local sink by the regular ingestion. Reports the throughput of each stage,
+as recorded in the run metrics, and the events of the run. The ingestion is
+configured by the environment as usual, e.g. `PARSE_WORKERS`, `QC_FLAGS` or
+`INGEST_PROFILES`.
+
+Usage:
+
+    python -m benchmarks.ingest_benchmark --days 5 --files-per-day 4 --blocks 200
+"""
+
+import argparse
+import logging
+import os
+import socket
+import tempfile
+import threading
+from typing import List
+
+from pyftpdlib.authorizers import DummyAuthorizer
+from pyftpdlib.handlers import FTPHandler
+from pyftpdlib.servers import FTPServer
+
+from benchmarks import synthetic_data
+from deflox.ingestion.ingest import _ingest
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.sinks import MemorySink, Sink, SqliteSink
+from deflox.ingestion.sources import FtpSource
+
+
+class StageResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+
+    def __str__(self):
+        rows_per_s = self.rows / self.seconds if self.seconds else 0.0
+        mb_per_s = self.bytes / 1024**2 / self.seconds if self.seconds else 0.0
+        return (
+            f"{self.name:<12} {self.seconds:>9.3f} s {self.rows:>9d} rows "
+            f"{rows_per_s:>12.1f} rows/s {mb_per_s:>9.2f} MB/s"
+        )
+
+
+def run(
+    days: int, files_per_day: int, blocks_per_file: int, sink: Sink
+) -> List[StageResult]:
+    with tempfile.TemporaryDirectory() as work_dir:
+        ftp_root = os.path.join(work_dir, "ftp")
+        target_dir = os.path.join(work_dir, "target")
+        os.makedirs(ftp_root)
+        os.makedirs(target_dir)
+        synthetic_data.generate(
+            ftp_root,
+            days=days,
+            cycles=blocks_per_file,
+            files_per_day=files_per_day,
+            f_prefixed=False,
+        )
+
+        server = start_ftp_server(ftp_root)
+        try:
+            return _run_stages(target_dir, sink)
+        finally:
+            server.close()
+
+
+def _run_stages(target_dir: str, sink: Sink) -> List[StageResult]:
+    station = os.environ["FTP_USER"]
+    metrics = RunMetrics()
+    _ingest(lambda: sink, FtpSource(target_dir), station, 73000, metrics, {})
+
+    results = []
+    for (_, name), stage_metrics in metrics.stages.items():
+        result = StageResult(name)
+        result.seconds = stage_metrics.duration
+        result.rows = stage_metrics.rows
+        result.bytes = stage_metrics.bytes
+        results.append(result)
+    for event, count in sorted(metrics.events.items()):
+        print(f"{event}: {count}")
+    return results
+
+
+def start_ftp_server(ftp_root: str) -> FTPServer:
+    """
+    Serves the given directory from a local FTP server in a background
+    thread, and points the FTP environment variables to it.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    os.environ["FTP_HOST"] = "127.0.0.1"
+    os.environ["FTP_PORT"] = str(port)
+    os.environ["FTP_USER"] = "benchmark"
+    os.environ["FTP_PW"] = "benchmark"
+
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(
+        os.environ["FTP_USER"], os.environ["FTP_PW"], ftp_root, perm="elr"
+    )
+    handler = FTPHandler
+    handler.authorizer = authorizer
+    handler.passive_ports = range(60000, 65535)
+    logging.basicConfig(level=logging.ERROR)
+    server = FTPServer(("127.0.0.1", port), handler)
+    threading.Thread(
+        target=server.serve_forever, kwargs={"timeout": 0.1}, daemon=True
+    ).start()
+    return server
+
+
+def _create_sink(sink_type: str, work_dir: str) -> Sink:
+    if sink_type == "sqlite":
+        return SqliteSink(os.path.join(work_dir, "benchmark.db"))
+    return MemorySink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--files-per-day", type=int, default=2)
+    parser.add_argument("--blocks", type=int, default=100)
+    parser.add_argument("--sink", choices=["memory", "sqlite"], default="memory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as sink_dir:
+        sink = _create_sink(args.sink, sink_dir)
+        results = run(args.days, args.files_per_day, args.blocks, sink)
+        if isinstance(sink, SqliteSink):
+            sink.close()
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+Benchmark of the start-up of the ingestion in the most frequent case, i.e.
+when there is no new data: runs the ingestion in fresh interpreters against
+an empty local FTP server, and checks that no heavy modules are imported.
+
+Usage:
+
+    python -m benchmarks.startup_benchmark --runs 5 --max-seconds 1.0
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from benchmarks.ingest_benchmark import start_ftp_server
+
+# modules which must not be imported when there is nothing to ingest
+HEAVY_MODULES = ["pandas", "geopandas", "shapely", "numpy", "xcube_geodb"]
+
+_NO_NEW_DATA_SCRIPT = """
+import json, sys
+from deflox.ingestion.ingest import ingest
+try:
+    ingest()
+except SystemExit:
+    pass
+print(json.dumps(sorted({{m.split(".")[0] for m in sys.modules}} & {modules})))
+"""
+
+
+def run_no_new_data() -> List[str]:
+    """
+    Runs the ingestion once in a fresh interpreter; the FTP environment
+    variables must point to a server without new data.
+
+    :return: the heavy modules which have been imported
+    """
+    env = dict(os.environ)
+    env["SINK_TYPE"] = "memory"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join([root, env.get("PYTHONPATH", "")])
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _NO_NEW_DATA_SCRIPT.format(modules=set(HEAVY_MODULES)),
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().split("\n")[-1])
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="fail if the median start-up takes longer",
+    )
+    args = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as ftp_root:
+        server = start_ftp_server(ftp_root)
+        try:
+            durations = []
+            imported = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                imported = run_no_new_data()
+                durations.append(time.perf_counter() - start)
+        finally:
+            server.close()
+
+    median = statistics.median(durations)
+    print(f"no new data: median {median:.3f} s over {args.runs} runs")
+    failed = False
+    if imported:
+        print(f"FAILED heavy modules imported: {', '.join(imported)}")
+        failed = True
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"FAILED start-up slower than {args.max_seconds} s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
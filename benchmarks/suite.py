@@ -0,0 +1,263 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+Repeatable benchmark suite for the ingestion hot paths. Measures the wall
+time and the peak memory of `DataReader.read`, `DataFetcher.fetch_data`
+and the ingestion loop on synthetic data, and compares them against a
+stored baseline.
+
+Usage:
+
+    python -m benchmarks.suite                     # compare against baseline
+    python -m benchmarks.suite --update-baseline   # store a new baseline
+    python -m benchmarks.suite --scale 10          # 10 times more data
+
+`read_raw_workers` reads the same large file as `read_raw_large` with
+`PARSE_WORKERS` processes (default: the number of CPUs); the suite reports
+the speedup of the parallel over the serial read.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+from benchmarks import synthetic_data
+from benchmarks.ingest_benchmark import start_ftp_server
+from deflox.ingestion.data_fetcher import DataFetcher
+from deflox.ingestion.flox_data_reader import DataReader
+from deflox.ingestion.ingest import ingest
+from deflox.ingestion.sinks import MemorySink
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+class Case:
+    """
+    A single benchmark case: `setup` creates the input data in a work
+    directory and returns the function to measure.
+    """
+
+    def __init__(self, name: str, setup: Callable[[str, int], Callable[[], None]]):
+        self.name = name
+        self.setup = setup
+
+
+def _read_raw_case(f_prefixed: bool):
+    def setup(work_dir: str, scale: int) -> Callable[[], None]:
+        (path,) = synthetic_data.generate(
+            work_dir, cycles=100 * scale, f_prefixed=f_prefixed, corrupt_every=50
+        )
+        with open(path) as f:
+            lines = f.readlines()
+        return lambda: DataReader().read(lines)
+
+    return setup
+
+
+def _read_large_case(parallel: bool):
+    def setup(work_dir: str, scale: int) -> Callable[[], None]:
+        (path,) = synthetic_data.generate(
+            work_dir, cycles=3000 * scale, f_prefixed=False
+        )
+        with open(path) as f:
+            lines = f.readlines()
+        if not parallel:
+            return lambda: DataReader().read(lines)
+
+        executor = ProcessPoolExecutor(
+            int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))
+        )
+        # start the worker processes before measuring
+        executor.submit(int).result()
+
+        def read():
+            DataReader().read(lines, executor=executor)
+
+        read.executor = executor
+        return read
+
+    return setup
+
+
+def _read_processed_setup(work_dir: str, scale: int) -> Callable[[], None]:
+    paths = synthetic_data.generate(
+        work_dir, cycles=100 * scale, f_prefixed=False, processed=True
+    )
+    with open(paths[0]) as f:
+        raw_lines = f.readlines()
+    processed = [p for p in paths if "Reflectance_FULL" in p][0]
+    with open(processed) as f:
+        processed_lines = f.read().split("\n")
+    return lambda: DataReader().read(raw_lines, processed_lines, "reflectance_f")
+
+
+def _fetch_setup(work_dir: str, scale: int) -> Callable[[], None]:
+    ftp_root = os.path.join(work_dir, "ftp")
+    synthetic_data.generate(ftp_root, days=2 * scale, cycles=50, files_per_day=2)
+    server = start_ftp_server(ftp_root)
+
+    def fetch():
+        target_dir = tempfile.mkdtemp(dir=work_dir)
+        DataFetcher(target_dir).fetch_data(73000)
+
+    fetch.server = server
+    return fetch
+
+
+def _ingest_setup(work_dir: str, scale: int) -> Callable[[], None]:
+    ftp_root = os.path.join(work_dir, "ftp")
+    synthetic_data.generate(
+        ftp_root, days=2 * scale, cycles=50, files_per_day=2, corrupt_every=25
+    )
+    server = start_ftp_server(ftp_root)
+
+    def run_ingest():
+        target_dir = tempfile.mkdtemp(dir=work_dir)
+        with mock.patch.dict(
+            os.environ, {"TEMP_DATA_DIR": target_dir, "MAX_DAY_DIFF": "73000"}
+        ):
+            ingest(MemorySink())
+
+    run_ingest.server = server
+    return run_ingest
+
+
+CASES = [
+    Case("read_raw", _read_raw_case(False)),
+    Case("read_raw_f", _read_raw_case(True)),
+    Case("read_raw_large", _read_large_case(False)),
+    Case("read_raw_workers", _read_large_case(True)),
+    Case("read_processed", _read_processed_setup),
+    Case("fetch_data", _fetch_setup),
+    Case("ingest", _ingest_setup),
+]
+
+
+def run_case(case: Case, scale: int, repeats: int) -> Dict[str, float]:
+    """
+    Runs the given case `repeats` times and returns the best wall time in
+    seconds and the peak memory in MiB, as traced by tracemalloc.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        func = case.setup(work_dir, scale)
+        try:
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                func()
+                best = min(best, time.perf_counter() - start)
+
+            tracemalloc.start()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            server = getattr(func, "server", None)
+            if server is not None:
+                server.close()
+            executor = getattr(func, "executor", None)
+            if executor is not None:
+                executor.shutdown()
+    return {"seconds": round(best, 4), "peak_mib": round(peak / 1024**2, 2)}
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """
+    Returns a message for each measure that is worse than the baseline by
+    more than the given relative tolerance.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for measure, value in result.items():
+            reference = baseline[name].get(measure)
+            if reference and value > reference * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {measure} {value:.3f} > {reference:.3f} (baseline)"
+                )
+    return regressions
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="relative slowdown accepted before reporting a regression",
+    )
+    parser.add_argument("cases", nargs="*", help="the cases to run, default: all")
+    args = parser.parse_args(args)
+
+    results = {}
+    for case in CASES:
+        if args.cases and case.name not in args.cases:
+            continue
+        results[case.name] = run_case(case, args.scale, args.repeats)
+        print(
+            f"{case.name:<16} {results[case.name]['seconds']:>9.3f} s "
+            f"{results[case.name]['peak_mib']:>9.1f} MiB"
+        )
+
+    if "read_raw_large" in results and "read_raw_workers" in results:
+        speedup = (
+            results["read_raw_large"]["seconds"]
+            / results["read_raw_workers"]["seconds"]
+        )
+        print(f"PARSE_WORKERS speedup: {speedup:.2f}")
+
+    key = f"scale={args.scale}"
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    if args.update_baseline:
+        baselines.setdefault(key, {}).update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baselines.get(key, {}), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
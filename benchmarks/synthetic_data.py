@@ -0,0 +1,318 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+Generates synthetic FLoX data in the formats the stations upload: raw files
+in both the F-prefixed (42 columns header) and the classic layout, and
+processed products. Raw files may contain deliberately corrupted blocks.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+
+SPECTRUM_NAMES = ["WR", "VEG", "WR2", "DC_WR", "DC_VEG"]
+NUM_CHANNELS = 1024
+
+PROCESSED_PRODUCTS = [
+    "Incoming_radiance",
+    "Reflected_radiance",
+    "Reflectance",
+]
+
+
+class SyntheticFlox:
+    """
+    Generates the data of a single synthetic FLoX.
+
+    :param station_index: used to derive the identifier and the position
+    :param seed: seed of the random number generator
+    :param cycle_seconds: time between two measurement cycles
+    """
+
+    def __init__(self, station_index: int = 0, seed: int = 0, cycle_seconds=90):
+        self.station_index = station_index
+        self.identifier = f"FloX 2.35d JB-{station_index:03d}-SYN"
+        self.lat = 50.86594 + station_index * 0.01
+        self.lon = 6.44715 + station_index * 0.01
+        self.cycle_seconds = cycle_seconds
+        self.rng = np.random.default_rng(seed + station_index)
+
+    def raw_lines(
+        self,
+        start: datetime,
+        cycles: int,
+        f_prefixed: bool = False,
+        corrupt_every: int = 0,
+    ) -> List[str]:
+        """
+        Returns the lines of a raw file with the given number of measurement
+        cycles, i.e. blocks of 6 lines.
+
+        :param start: local time of the first cycle
+        :param cycles: number of blocks
+        :param f_prefixed: whether to generate the F-prefixed layout
+        :param corrupt_every: if > 0, every n-th block gets a truncated
+            spectrum line, which the reader has to skip
+        """
+        lines = []
+        t = start
+        base = self._spectrum_shape()
+        for cycle in range(cycles):
+            if f_prefixed:
+                lines.append(self._f_meta_line(t, cycle))
+            else:
+                lines.append(self._classic_meta_line(t, cycle))
+            spectra = self.rng.integers(
+                0, 200, size=(len(SPECTRUM_NAMES), NUM_CHANNELS)
+            ) + base.astype(np.int64)
+            spectra[3:] = self.rng.integers(1500, 1800, size=(2, NUM_CHANNELS))
+            for name, spectrum in zip(SPECTRUM_NAMES, spectra):
+                lines.append(f"{name};" + ";".join(map(str, spectrum)) + ";")
+            if corrupt_every > 0 and cycle % corrupt_every == corrupt_every - 1:
+                corrupted_index = len(lines) - 1 - int(self.rng.integers(0, 5))
+                lines[corrupted_index] = lines[corrupted_index][:1000]
+            t += timedelta(seconds=self.cycle_seconds)
+        return lines
+
+    def processed_lines(
+        self, start: datetime, cycles: int, num_wavelengths: int, full: bool
+    ) -> List[str]:
+        """
+        Returns the lines of a processed product: a header line with the
+        times of the cycles, and one line per wavelength.
+
+        :param full: whether to use the full range of wavelengths, or the
+            fluorescence range only
+        """
+        times = [
+            start + timedelta(seconds=self.cycle_seconds * i) for i in range(cycles)
+        ]
+        header = '"wl";' + ";".join(f'"{t.strftime("%H_%M_%S")}"' for t in times)
+        low, high = (339.5, 1014.5) if full else (649.8, 812.6)
+        lines = [header]
+        values = self.rng.normal(0.01, 0.005, size=(num_wavelengths, cycles))
+        missing = self.rng.random(size=values.shape) < 0.01
+        for wl, row, row_missing in zip(
+            np.linspace(low, high, num_wavelengths), values, missing
+        ):
+            cells = ["#N/D" if m else repr(float(v)) for v, m in zip(row, row_missing)]
+            lines.append(f"{float(wl)!r};" + ";".join(cells))
+        return lines
+
+    def _spectrum_shape(self) -> np.ndarray:
+        channels = np.arange(NUM_CHANNELS)
+        return 3000 + 20000 * np.exp(-(((channels - 500) / 200.0) ** 2))
+
+    def _classic_meta_line(self, t: datetime, cycle: int) -> str:
+        utc = t - timedelta(hours=2)
+        multical = cycle % 5
+        return ";".join(
+            [
+                "01",
+                t.strftime("%y%m%d"),
+                t.strftime("%H%M%S"),
+                "auto_mode",
+                "IT_WR[us]=",
+                "4000000",
+                "IT_VEG[us]=",
+                "4000000",
+                "cycle_duration[ms]=",
+                str(25000 + int(self.rng.integers(0, 500))),
+                "QEpro_Frame[C]=",
+                "21.00",
+                "QEpro_CCD[C]=",
+                "20.19",
+                "chamber_temp[C]=",
+                "18.90",
+                "chamber_humidity=",
+                "43.10",
+                "mainboard_temp[C]=",
+                f"{20 + self.rng.random() * 5:.2f}",
+                "mainboard_humidity=",
+                "49.30",
+                self.identifier,
+                "GPS_TIME_UTC=",
+                utc.strftime("%H%M%S") + ".",
+                "GPS_date=",
+                utc.strftime("%d%m%y"),
+                "GPS_lat=",
+                f"{self.lat:.5f} N",
+                "GPS_lon=",
+                f"{self.lon:.5f} E",
+                "voltage=",
+                f"{11.5 + self.rng.random():.2f}",
+                "gps_CPU=",
+                str(482049889 + cycle * 25000),
+                "wr_CPU=",
+                str(482107614 + cycle * 25000),
+                "veg_CPU=",
+                str(482112559 + cycle * 25000),
+                "wr2_CPU=",
+                str(482117506 + cycle * 25000),
+                "DUE_RTC_DATE=",
+                t.strftime("%y%m%d"),
+                "DUE_RTC_TIME=",
+                t.strftime("%H%M%S"),
+                "cooling_active=",
+                "1",
+                "heating_active=",
+                "0",
+                "Temp0",
+                "25.25",
+                "Temp1",
+                f"{26 + self.rng.random():.2f}",
+                "Temp2",
+                "19.06",
+                "MultiCal",
+                str(multical),
+                "",
+            ]
+        )
+
+    def _f_meta_line(self, t: datetime, cycle: int) -> str:
+        utc = t - timedelta(hours=2)
+        return ";".join(
+            [
+                "01",
+                t.strftime("%y%m%d"),
+                t.strftime("%H%M%S"),
+                "auto_mode",
+                "IT_WR[us]=",
+                "1000000",
+                "IT_VEG[us]=",
+                "1000000",
+                "cycle_duration[ms]=",
+                str(13000 + int(self.rng.integers(0, 500))),
+                "mainboard_temp[C]=",
+                f"{20 + self.rng.random() * 5:.2f}",
+                "mainboard_humidity=",
+                "49.30",
+                self.identifier,
+                "GPS_TIME_UTC=",
+                utc.strftime("%H%M%S") + ".",
+                "GPS_date=",
+                utc.strftime("%d%m%y"),
+                "GPS_lat=",
+                f"{self.lat:.5f} N",
+                "GPS_lon=",
+                f"{self.lon:.5f} E",
+                "voltage=",
+                f"{11.5 + self.rng.random():.2f}",
+                "gps_CPU=",
+                str(482049889 + cycle * 13000),
+                "wr_CPU=",
+                str(482107614 + cycle * 13000),
+                "veg_CPU=",
+                str(482112559 + cycle * 13000),
+                "wr2_CPU=",
+                str(482117506 + cycle * 13000),
+                "DUE_RTC_DATE=",
+                t.strftime("%y%m%d"),
+                "DUE_RTC_TIME=",
+                t.strftime("%H%M%S"),
+                "MultiCal",
+                "0",
+                "RSSI",
+                str(-60 - int(self.rng.integers(0, 20))),
+                "",
+            ]
+        )
+
+
+def generate(
+    root: str,
+    stations: int = 1,
+    days: int = 1,
+    cycles: int = 100,
+    files_per_day: int = 1,
+    f_prefixed: Optional[bool] = None,
+    processed: bool = False,
+    corrupt_every: int = 0,
+    start: datetime = datetime(2024, 11, 5, 7, 0, 0),
+    seed: int = 0,
+) -> List[str]:
+    """
+    Writes synthetic data laid out like the station FTP trees, i.e.
+    `<root>/<station>/<YYMMDD>/<HHMMSS>.CSV`; if there is only a single
+    station, the station directory is omitted.
+
+    :param stations: number of stations
+    :param days: number of days per station
+    :param cycles: number of measurement cycles per file
+    :param files_per_day: number of raw files per day and layout
+    :param f_prefixed: True for F-prefixed files only, False for classic
+        files only, None for both
+    :param processed: whether to write processed products, too
+    :param corrupt_every: if > 0, every n-th block is corrupted
+    :return: the paths of the written files
+    """
+    layouts = [False, True] if f_prefixed is None else [f_prefixed]
+    written = []
+    for station_index in range(stations):
+        flox = SyntheticFlox(station_index, seed)
+        station_root = (
+            root if stations == 1 else os.path.join(root, f"station{station_index:03d}")
+        )
+        for day in range(days):
+            day_start = start + timedelta(days=day)
+            day_dir = os.path.join(station_root, day_start.strftime("%y%m%d"))
+            os.makedirs(day_dir, exist_ok=True)
+            for file_index in range(files_per_day):
+                file_start = day_start + timedelta(
+                    seconds=file_index * cycles * flox.cycle_seconds
+                )
+                for layout in layouts:
+                    prefix = "F" if layout else ""
+                    path = os.path.join(
+                        day_dir, f"{prefix}{file_start.strftime('%H%M%S')}.CSV"
+                    )
+                    _write(
+                        path,
+                        flox.raw_lines(file_start, cycles, layout, corrupt_every),
+                    )
+                    written.append(path)
+            if processed:
+                for product in PROCESSED_PRODUCTS:
+                    for full in [False, True]:
+                        name = (
+                            f"{product}_FULL_F{day_start.strftime('%H%M%S')}.csv"
+                            if full
+                            else f"{product}_FLUO_{day_start.strftime('%H%M%S')}.csv"
+                        )
+                        path = os.path.join(day_dir, name)
+                        _write(
+                            path,
+                            flox.processed_lines(
+                                day_start,
+                                cycles * files_per_day,
+                                1024 if full else 256,
+                                full,
+                            ),
+                        )
+                        written.append(path)
+    return written
+
+
+def _write(path: str, lines: List[str]) -> None:
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
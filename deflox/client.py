@@ -0,0 +1,305 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+Reads FLoX collections back, as slices of a station and a time range with
+the spectra decoded into NumPy arrays. Slices are cached on local disk,
+keyed by collection and time range, and the least recently used slices
+are evicted when the cache exceeds its size. A cached slice whose range
+reaches beyond the latest time of its collection (its watermark) is
+refreshed by fetching only the rows which have been appended since.
+
+This relies on the ingestion appending rows in time order. Rows inserted
+below the watermark later on, e.g. by a backfill, are only read by
+`FloxClient.read` with `refresh=True`.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+
+from deflox.ingestion.sinks import Sink
+from deflox.radiometry import PRODUCTS
+from deflox.spectra import SPECTRUM_COLUMNS, decode_spectrum
+
+# the resolution of `utc_datetime`
+_RESOLUTION = timedelta(seconds=1)
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class FloxSlice:
+    """
+    The rows of a collection in a time range.
+
+    :param gdf: the rows without their spectra, ordered by `utc_datetime`
+    :param spectra: the spectra by column name, each as 2D array with one
+        row per measurement
+    """
+
+    def __init__(self, gdf, spectra: Dict[str, np.ndarray]):
+        self.gdf = gdf
+        self.spectra = spectra
+
+    def __len__(self) -> int:
+        return len(self.gdf)
+
+
+class FloxClient:
+    """
+    Reads slices of FLoX collections.
+
+    :param sink: where to read from; by default the sink configured by
+        `SINK_TYPE`, as for the ingestion
+    :param cache_dir: the directory of the cache; by default
+        `READ_CACHE_DIR`; if not given, nothing is cached
+    :param max_cache_bytes: the size from which on the least recently used
+        slices are evicted; by default `READ_CACHE_BYTES`, or 1 GiB
+    """
+
+    def __init__(
+        self,
+        sink: Optional[Sink] = None,
+        cache_dir: Optional[str] = None,
+        max_cache_bytes: Optional[int] = None,
+    ):
+        if sink is None:
+            from dotenv import load_dotenv
+
+            from deflox.ingestion.ingest import _get_sink
+
+            load_dotenv()
+            sink = _get_sink(os.getenv("SINK_TYPE", "geodb"))
+        if cache_dir is None:
+            cache_dir = os.getenv("READ_CACHE_DIR")
+        if max_cache_bytes is None:
+            max_cache_bytes = int(os.getenv("READ_CACHE_BYTES", str(1 << 30)))
+        self.sink = sink
+        self.cache_dir = cache_dir
+        self.max_cache_bytes = max_cache_bytes
+
+    def read(
+        self,
+        station: str,
+        start: datetime,
+        end: datetime,
+        collection: str = "raw",
+        refresh: bool = False,
+    ) -> FloxSlice:
+        """
+        Reads the rows of a collection of a station with a `utc_datetime`
+        from `start` (inclusive) to `end` (exclusive).
+
+        :param collection: the collection without the station prefix, e.g.
+            "raw", "raw-f" or "raw-processed"
+        :param refresh: whether to query the whole range again, instead of
+            using the cache
+        """
+        name = f"{station}-{collection}"
+        if self.cache_dir is None:
+            latest = self.sink.get_latest_time(name)
+            return self._fetch(name, start, min(end, latest + _RESOLUTION))
+
+        entry = self._entry_path(name, start, end)
+        meta = None if refresh else _read_meta(entry)
+        if meta is not None:
+            cached = _load(entry)
+            watermark = datetime.strptime(meta["watermark"], _TIME_FORMAT)
+            if watermark + _RESOLUTION >= end:
+                _touch(entry)
+                return cached
+            latest = self.sink.get_latest_time(name)
+            if latest <= watermark:
+                _touch(entry)
+                return cached
+            appended = self._fetch(
+                name, watermark + _RESOLUTION, min(end, latest + _RESOLUTION)
+            )
+            result = _concat(cached, appended)
+        else:
+            latest = self.sink.get_latest_time(name)
+            result = self._fetch(name, start, min(end, latest + _RESOLUTION))
+        # fetch up to the latest time only, so that rows inserted meanwhile
+        # are fetched by the next refresh
+        self._store(entry, name, start, end, max(latest, start - _RESOLUTION), result)
+        self._evict(keep=entry)
+        return result
+
+    def clear(self) -> None:
+        """
+        Removes all cached slices.
+        """
+        if self.cache_dir is not None and os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+
+    def _fetch(self, collection: str, start: datetime, end: datetime) -> FloxSlice:
+        import geopandas
+        import pandas as pd
+
+        if start >= end:
+            df = pd.DataFrame()
+        else:
+            df = self.sink.get_time_range(collection, start, end)
+        # an empty frame has no column names to write
+        df.columns = df.columns.astype(str)
+        spectra = {}
+        for column in list(df.columns):
+            if _is_spectrum_column(df, column):
+                spectra[column] = _to_array(df[column])
+                df = df.drop(columns=column)
+        if len(df) > 0:
+            df["utc_datetime"] = pd.to_datetime(
+                df["utc_datetime"], format="ISO8601"
+            ).dt.strftime(_TIME_FORMAT)
+        if "geometry" in df.columns and not isinstance(df, geopandas.GeoDataFrame):
+            df["geometry"] = geopandas.GeoSeries.from_wkt(df["geometry"])
+        gdf = geopandas.GeoDataFrame(
+            df, geometry="geometry" if "geometry" in df.columns else None
+        )
+        return FloxSlice(gdf.reset_index(drop=True), spectra)
+
+    def _entry_path(self, collection: str, start: datetime, end: datetime) -> str:
+        key = f"{collection}\n{start:{_TIME_FORMAT}}\n{end:{_TIME_FORMAT}}"
+        return os.path.join(
+            self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest()
+        )
+
+    def _store(
+        self,
+        entry: str,
+        collection: str,
+        start: datetime,
+        end: datetime,
+        watermark: datetime,
+        result: FloxSlice,
+    ) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_entry = f"{entry}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(temp_entry)
+        result.gdf.to_parquet(os.path.join(temp_entry, "rows.parquet"))
+        for column, values in result.spectra.items():
+            np.save(os.path.join(temp_entry, f"{column}.npy"), values)
+        meta = {
+            "collection": collection,
+            "start": f"{start:{_TIME_FORMAT}}",
+            "end": f"{end:{_TIME_FORMAT}}",
+            "watermark": f"{watermark:{_TIME_FORMAT}}",
+            "spectra": list(result.spectra),
+        }
+        # the meta data is written last, it marks the entry as complete
+        with open(os.path.join(temp_entry, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.rename(temp_entry, entry)
+
+    def _evict(self, keep: str) -> None:
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(path, "meta.json")
+            if name.endswith(".tmp") or not os.path.exists(meta_path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(meta_path), path, size))
+            total_size += size
+        # least recently used first
+        for _, path, size in sorted(entries):
+            if total_size <= self.max_cache_bytes:
+                break
+            if path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+                total_size -= size
+
+
+def _is_spectrum_column(df, column: str) -> bool:
+    if column in SPECTRUM_COLUMNS or column in PRODUCTS:
+        return True
+    return len(df) > 0 and isinstance(df[column].iloc[0], (list, np.ndarray))
+
+
+def _to_array(values) -> np.ndarray:
+    values = list(values)
+    if not values:
+        return np.zeros((0, 0))
+    if isinstance(values[0], (str, bytes)):
+        return np.stack([decode_spectrum(v) for v in values])
+    return np.array(
+        [[np.nan if v is None else v for v in row] for row in values]
+        if any(v is None for row in values for v in row)
+        else values
+    )
+
+
+def _concat(cached: FloxSlice, appended: FloxSlice) -> FloxSlice:
+    import geopandas
+    import pandas as pd
+
+    if len(appended) == 0:
+        return cached
+    if len(cached) == 0:
+        return appended
+    gdf = geopandas.GeoDataFrame(
+        pd.concat([cached.gdf, appended.gdf], ignore_index=True),
+        geometry=cached.gdf.geometry.name,
+    )
+    spectra = {
+        column: np.concatenate([values, appended.spectra[column]])
+        for column, values in cached.spectra.items()
+    }
+    return FloxSlice(gdf, spectra)
+
+
+def _read_meta(entry: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(entry, "meta.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _load(entry: str) -> FloxSlice:
+    import geopandas
+    import pandas as pd
+
+    meta = _read_meta(entry)
+    rows_path = os.path.join(entry, "rows.parquet")
+    try:
+        gdf = geopandas.read_parquet(rows_path)
+    except ValueError:
+        # rows without geometry
+        gdf = geopandas.GeoDataFrame(pd.read_parquet(rows_path))
+    spectra = {
+        column: np.load(os.path.join(entry, f"{column}.npy"), mmap_mode="r")
+        for column in meta["spectra"]
+    }
+    return FloxSlice(gdf, spectra)
+
+
+def _touch(entry: str) -> None:
+    now = time.time()
+    os.utime(os.path.join(entry, "meta.json"), (now, now))
@@ -0,0 +1,223 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+A compressed local archive of raw station files, laid out like the FTP
+server of a station: `<root>/<YYMMDD>/<file name>.gz`. Each archived file
+is a sequence of gzip members of `blocks_per_member` blocks of measurements
+each, so it is a regular gzip file, and an index `<file name>.gz.json`
+gives the offset of each member. Ranges of blocks can therefore be read
+without decompressing the whole file. Blocks are counted by their meta
+data lines, including the blocks the reader skips as invalid.
+"""
+
+import gzip
+import io
+import json
+import os
+import uuid
+from typing import Dict, List, Optional
+
+from deflox.ingestion.content_index import hash_file
+from deflox.ingestion.flox_data_reader import _HEADER_PATTERN
+
+BLOCKS_PER_MEMBER = 100
+
+
+class RawArchive:
+    """
+    Archives raw files, and reads them back.
+
+    :param root: the directory of the archive
+    :param blocks_per_member: the number of blocks compressed into a single
+        gzip member
+    """
+
+    def __init__(self, root: str, blocks_per_member: int = BLOCKS_PER_MEMBER):
+        self.root = root
+        self.blocks_per_member = blocks_per_member
+
+    def path(self, key: str) -> str:
+        """
+        Returns the path of the archived file of the given key, which is
+        `<YYMMDD>/<file name>`.
+        """
+        return os.path.join(self.root, *key.split("/")) + ".gz"
+
+    def contains(self, key: str, content_hash: str) -> bool:
+        """
+        Tells whether the given file has been archived with the given content.
+        """
+        index = self.index(key)
+        return index is not None and index["sha256"] == content_hash
+
+    def add(self, file_path: str, key: str, content_hash: Optional[str] = None) -> int:
+        """
+        Archives the given file, replacing an earlier version of it. The
+        archived file gets the modification time of the given one.
+
+        :return: the size of the archived file
+        """
+        with open(file_path, "rb") as f:
+            lines = f.read().splitlines(keepends=True)
+
+        members = []
+        member_lines = []
+        blocks = 0
+        for line_number, line in enumerate(lines):
+            if _HEADER_PATTERN.match(line.decode("latin-1")):
+                if blocks % self.blocks_per_member == 0 and member_lines:
+                    members.append(member_lines)
+                    member_lines = []
+                if not member_lines:
+                    member_lines.append((blocks, line_number))
+                blocks += 1
+            elif not member_lines:
+                # lines before the first block
+                member_lines.append((blocks, line_number))
+            member_lines.append(line)
+        if member_lines:
+            members.append(member_lines)
+
+        archive_path = self.path(key)
+        os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+        temp_path = f"{archive_path}.{uuid.uuid4().hex}.tmp"
+        index = {
+            "sha256": content_hash or hash_file(file_path),
+            "lines": len(lines),
+            "blocks": blocks,
+            "members": [],
+        }
+        offset = 0
+        with open(temp_path, "wb") as f:
+            for (first_block, first_line), *data in members:
+                member = gzip.compress(b"".join(data), mtime=0)
+                f.write(member)
+                index["members"].append(
+                    {
+                        "first_block": first_block,
+                        "first_line": first_line,
+                        "offset": offset,
+                        "length": len(member),
+                    }
+                )
+                offset += len(member)
+        mtime = os.path.getmtime(file_path)
+        os.utime(temp_path, (mtime, mtime))
+        # the index comes last, so that it never refers to missing data
+        os.replace(temp_path, archive_path)
+        _write_json(f"{archive_path}.json", index)
+        return offset
+
+    def index(self, key: str) -> Optional[Dict]:
+        """
+        Returns the index of the archived file of the given key, or None if
+        it has not been archived.
+        """
+        try:
+            with open(f"{self.path(key)}.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def read_lines(
+        self, key: str, first_block: int = 0, last_block: Optional[int] = None
+    ) -> List[str]:
+        """
+        Returns the lines of the given range of blocks of an archived file,
+        as read from the original file in text mode. Only the members
+        containing these blocks are decompressed.
+
+        :param first_block: the first block, counting from 0
+        :param last_block: the last block (inclusive); by default the last
+            block of the file
+        """
+        index = self.index(key)
+        if index is None:
+            raise FileNotFoundError(f"{key} has not been archived")
+        if last_block is None:
+            last_block = index["blocks"] - 1
+        members = index["members"]
+        ends = [m["first_block"] for m in members[1:]] + [index["blocks"]]
+        data = []
+        with open(self.path(key), "rb") as f:
+            for member, end in zip(members, ends):
+                if member["first_block"] > last_block or end <= first_block:
+                    continue
+                f.seek(member["offset"])
+                data.append(gzip.decompress(f.read(member["length"])))
+        lines = io.TextIOWrapper(io.BytesIO(b"".join(data))).readlines()
+        # drop the blocks of the decompressed members outside the range
+        offset = _first_block(members, first_block)
+        return _slice_blocks(lines, first_block - offset, last_block - offset)
+
+    def read(
+        self,
+        key: str,
+        first_block: int = 0,
+        last_block: Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Reads the given range of blocks of an archived file into a
+        GeoDataFrame, see `DataReader.read` for the keyword arguments.
+        """
+        from deflox.ingestion.flox_data_reader import DataReader
+
+        return DataReader().read(
+            self.read_lines(key, first_block, last_block), **kwargs
+        )
+
+
+def _first_block(members: List[Dict], block: int) -> int:
+    """
+    Returns the first block of the member containing the given block.
+    """
+    first_block = 0
+    for member in members:
+        if member["first_block"] <= block:
+            first_block = member["first_block"]
+    return first_block
+
+
+def _slice_blocks(lines: List[str], first: int, last: int) -> List[str]:
+    """
+    Returns the lines from the meta data line of the `first` block up to
+    the one of the block following the `last` block.
+    """
+    start = 0 if first == 0 else None
+    end = len(lines)
+    block = -1
+    for line_number, line in enumerate(lines):
+        if _HEADER_PATTERN.match(line):
+            block += 1
+            if block == first and start is None:
+                start = line_number
+            if block == last + 1:
+                end = line_number
+                break
+    return lines[start:end] if start is not None else []
+
+
+def _write_json(path: str, content: Dict) -> None:
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(content, f)
+    os.replace(temp_path, path)
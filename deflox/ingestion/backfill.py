@@ -0,0 +1,337 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from deflox.ingestion.ingest import (
+    _get_config,
+    _get_content_index,
+    _get_lease,
+    _lease_held,
+    _get_sink,
+    _get_source,
+    _get_summarizer,
+    _ingest_files,
+)
+from deflox.ingestion.metrics import RunMetrics, _write_atomically
+from deflox.ingestion.outbox import Outbox
+from deflox.ingestion.sinks import EARLIEST_TIME, Sink
+
+_DAY_FORMAT = "%y%m%d"
+
+
+def get_partitions(first_day: str, last_day: str, days: int) -> List[Tuple[str, str]]:
+    """
+    Splits a range of day directories into partitions of consecutive days.
+
+    :param first_day: the first day, as YYMMDD
+    :param last_day: the last day, as YYMMDD
+    :param days: the number of days per partition
+    :return: the first and last day of each partition, as YYMMDD
+    """
+    if days < 1:
+        raise ValueError(f"Invalid number of days per partition: {days}")
+    start = datetime.strptime(first_day, _DAY_FORMAT).date()
+    end = datetime.strptime(last_day, _DAY_FORMAT).date()
+    partitions = []
+    while start <= end:
+        partition_end = min(start + timedelta(days=days - 1), end)
+        partitions.append(
+            (start.strftime(_DAY_FORMAT), partition_end.strftime(_DAY_FORMAT))
+        )
+        start = partition_end + timedelta(days=1)
+    return partitions
+
+
+class Backfill:
+    """
+    Ingests the history of a single FLoX. The range of day directories is
+    split into partitions, which are processed in parallel. A checkpoint
+    file per partition records the ingested files, so that an interrupted
+    backfill resumes where it stopped.
+
+    The rows are not filtered by the latest time in the sink, so the range
+    must not overlap with data which has been ingested already.
+
+    :param first_day: the first day directory, as YYMMDD
+    :param last_day: the last day directory, as YYMMDD
+    :param checkpoint_dir: the directory of the checkpoint files
+    :param partition_days: the number of days per partition
+    :param workers: the number of partitions processed in parallel
+    :param pause: seconds to pause after each file, so that the backfill
+        does not starve the regular ingestion
+    :param niceness: the increment of the niceness of the worker processes
+    :param sink: the sink to write into; if given, the partitions are
+        processed one after another in this process. If not given, each
+        worker creates a sink according to the environment variable
+        SINK_TYPE.
+    """
+
+    def __init__(
+        self,
+        first_day: str,
+        last_day: str,
+        checkpoint_dir: str,
+        partition_days: int = 7,
+        workers: int = 2,
+        pause: float = 0.0,
+        niceness: int = 10,
+        sink: Optional[Sink] = None,
+    ):
+        load_dotenv()
+        self.temp_data_dir, _, self.sink_type = _get_config(sink is not None)
+        self.station = os.environ["FTP_USER"]
+        self.partitions = get_partitions(first_day, last_day, partition_days)
+        self.checkpoint_dir = checkpoint_dir
+        self.workers = workers
+        self.pause = pause
+        self.niceness = niceness
+        self.sink = sink
+
+    def run(self) -> Dict[str, int]:
+        """
+        Processes all partitions which have not been completed yet.
+
+        :return: the number of completed partitions, of skipped partitions
+            which had been completed before, of busy partitions which are
+            processed by another run, and of failed partitions
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        pending = [p for p in self.partitions if not _Checkpoint(self._path(p)).done]
+        result = {
+            "completed": 0,
+            "skipped": len(self.partitions) - len(pending),
+            "busy": 0,
+            "failed": 0,
+        }
+        print(
+            f"backfilling {self.station}: {len(pending)} of "
+            f"{len(self.partitions)} partition(s) pending"
+        )
+        if self.sink is not None:
+            for partition in pending:
+                try:
+                    processed = self._run_partition(partition, self.sink)
+                    result["completed" if processed else "busy"] += 1
+                except Exception as exc:
+                    print(f"partition {partition[0]}-{partition[1]} failed: {exc}")
+                    result["failed"] += 1
+            return result
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_lower_priority, initargs=(self,)
+        ) as executor:
+            futures = {
+                executor.submit(self._run_partition, partition): partition
+                for partition in pending
+            }
+            for future, partition in futures.items():
+                try:
+                    result["completed" if future.result() else "busy"] += 1
+                except Exception as exc:
+                    print(f"partition {partition[0]}-{partition[1]} failed: {exc}")
+                    result["failed"] += 1
+        return result
+
+    def _run_partition(
+        self, partition: Tuple[str, str], sink: Optional[Sink] = None
+    ) -> bool:
+        """
+        Processes a partition, unless another backfill holds its lease.
+
+        :return: whether the partition has been processed
+        """
+        first_dir, last_dir = partition
+        lease = _get_lease(
+            f"{self.station}-{first_dir}-{last_dir}", self.checkpoint_dir
+        )
+        if lease is not None and not lease.acquire():
+            print(f"partition {first_dir}-{last_dir} is processed by another run")
+            return False
+        try:
+            self._backfill_partition(partition, sink, _lease_held(lease))
+        finally:
+            if lease is not None:
+                lease.release()
+        return True
+
+    def _backfill_partition(
+        self,
+        partition: Tuple[str, str],
+        sink: Optional[Sink] = None,
+        should_continue: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        first_dir, last_dir = partition
+        checkpoint = _Checkpoint(self._path(partition))
+        if checkpoint.done:
+            # completed by another run in the meantime
+            return
+        metrics = RunMetrics()
+        target_dir = os.path.join(
+            self.temp_data_dir, f"backfill-{first_dir}-{last_dir}"
+        )
+        source = _get_source(target_dir)
+        files = source.fetch(metrics, None, first_dir, last_dir, checkpoint.files)
+
+        if files:
+            sink = sink if sink is not None else _get_sink(self.sink_type)
+            outbox = (
+                Outbox(os.environ["OUTBOX_DIR"]) if os.getenv("OUTBOX_DIR") else None
+            )
+
+            def on_file_done(file_path: str):
+                checkpoint.add(source.key(file_path))
+                time.sleep(self.pause)
+
+            _ingest_files(
+                files,
+                sink,
+                source,
+                self.station,
+                metrics,
+                {
+                    f"{self.station}-raw": EARLIEST_TIME,
+                    f"{self.station}-raw-f": EARLIEST_TIME,
+                },
+                outbox,
+                on_file_done,
+                content_index=_get_content_index(),
+                summarizer=_get_summarizer(self.station, outbox),
+                should_continue=should_continue,
+            )
+        shutil.rmtree(target_dir, ignore_errors=True)
+        if should_continue is not None and not should_continue():
+            # the partition is continued by the new holder of its lease
+            print(f"partition {first_dir}-{last_dir} stopped, the lease has been lost")
+            return
+        checkpoint.finish(metrics)
+        print(f"partition {first_dir}-{last_dir} completed")
+
+    def _path(self, partition: Tuple[str, str]) -> str:
+        return os.path.join(
+            self.checkpoint_dir, f"{self.station}-{partition[0]}-{partition[1]}.json"
+        )
+
+
+class _Checkpoint:
+    """The progress of a single partition, stored as JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: List[str] = []
+        self.done = False
+        self.metrics = None
+        if os.path.exists(path):
+            with open(path) as f:
+                content = json.load(f)
+            self.files = content["files"]
+            self.done = content["done"]
+            self.metrics = content.get("metrics")
+
+    def add(self, file: str) -> None:
+        self.files.append(file)
+        self._write()
+
+    def finish(self, metrics: RunMetrics) -> None:
+        self.done = True
+        self.metrics = metrics.to_dict()
+        self._write()
+
+    def _write(self) -> None:
+        content = {"files": self.files, "done": self.done, "metrics": self.metrics}
+        _write_atomically(self.path, json.dumps(content, indent=2))
+
+
+def _lower_priority(backfill: Backfill) -> None:
+    if backfill.niceness and hasattr(os, "nice"):
+        os.nice(backfill.niceness)
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Ingests the history of a single FLoX into the xcube geoDB."
+    )
+    parser.add_argument("first_day", help="the first day directory, as YYMMDD")
+    parser.add_argument(
+        "last_day",
+        nargs="?",
+        default=(date.today() - timedelta(days=1)).strftime(_DAY_FORMAT),
+        help="the last day directory, as YYMMDD, default: yesterday",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default="backfill",
+        help="directory of the checkpoint files, default: backfill",
+    )
+    parser.add_argument(
+        "--partition-days",
+        type=int,
+        default=7,
+        help="number of days per partition, default: 7",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="number of partitions processed in parallel, default: 2",
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=0.0,
+        help="seconds to pause after each file, default: 0",
+    )
+    parser.add_argument(
+        "--nice",
+        type=int,
+        default=10,
+        help="niceness increment of the worker processes, default: 10",
+    )
+    args = parser.parse_args(args)
+
+    result = Backfill(
+        args.first_day,
+        args.last_day,
+        args.checkpoint_dir,
+        partition_days=args.partition_days,
+        workers=args.workers,
+        pause=args.pause,
+        niceness=args.nice,
+    ).run()
+    print(
+        f"backfill finished: {result['completed']} partition(s) completed, "
+        f"{result['skipped']} skipped, {result['busy']} busy, "
+        f"{result['failed']} failed"
+    )
+    if result["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import hashlib
+import sqlite3
+from datetime import datetime, timezone
+from typing import BinaryIO
+
+
+def new_hash():
+    """Returns a new hash object of the kind used for the content index."""
+    return hashlib.sha256()
+
+
+def hash_file(file_path: str, chunk_size: int = 256 * 1024) -> str:
+    """Returns the content hash of the given file."""
+    content_hash = new_hash()
+    with open(file_path, "rb") as f:
+        _update(content_hash, f, chunk_size)
+    return content_hash.hexdigest()
+
+
+def _update(content_hash, f: BinaryIO, chunk_size: int) -> None:
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        content_hash.update(chunk)
+
+
+class ContentIndex:
+    """
+    Persistent index of the content hashes of ingested files, stored in a
+    SQLite database, so that files which are uploaded by a station more
+    than once are ingested only once.
+
+    :param path: the path of the database file
+    """
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS content "
+            "(hash TEXT PRIMARY KEY, station TEXT, file TEXT, ingested TEXT)"
+        )
+        self.connection.commit()
+
+    def __contains__(self, content_hash: str) -> bool:
+        cursor = self.connection.execute(
+            "SELECT 1 FROM content WHERE hash = ?", (content_hash,)
+        )
+        return cursor.fetchone() is not None
+
+    def add(self, content_hash: str, station: str, file: str) -> None:
+        self.connection.execute(
+            "INSERT OR IGNORE INTO content VALUES (?, ?, ?, ?)",
+            (
+                content_hash,
+                station,
+                file,
+                datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            ),
+        )
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,172 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import random
+import signal
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from deflox.ingestion.ingest import (
+    _get_config,
+    _get_lease,
+    _get_sink,
+    _get_source,
+    _ingest,
+    _lease_held,
+    _release_lease,
+    _write_run_report,
+)
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.sinks import Sink
+from deflox.ingestion.sources import FtpSource
+
+
+class IngestionService:
+    """
+    Runs the ingestion of a single FLoX as a long-running service: the
+    process, the sink with its authenticated client, the FTP session, and
+    the latest times per collection are kept alive, and the station is
+    polled for new data.
+
+    :param sink: the sink to write into; if not given, it is created once,
+        according to the environment variable SINK_TYPE
+    :param interval: the polling interval in seconds; defaults to the
+        environment variable POLL_INTERVAL, or 300
+    :param jitter: the maximum random deviation from the interval in seconds,
+        so that many stations do not poll simultaneously; defaults to the
+        environment variable POLL_JITTER, or 30
+    """
+
+    def __init__(
+        self,
+        sink: Optional[Sink] = None,
+        interval: Optional[float] = None,
+        jitter: Optional[float] = None,
+    ):
+        load_dotenv()
+        self.temp_data_dir, self.max_day_diff, sink_type = _get_config(sink is not None)
+        self.station = os.environ["FTP_USER"]
+        if interval is None:
+            interval = float(os.getenv("POLL_INTERVAL", "300"))
+        if jitter is None:
+            jitter = float(os.getenv("POLL_JITTER", "30"))
+        self.interval = interval
+        self.jitter = jitter
+        self.sink_type = sink_type
+        self.sink = sink
+        self.source = _get_source(self.temp_data_dir, keep_session=True)
+        self.latest_times: Dict[str, datetime] = {}
+        self.stopped = threading.Event()
+        self.cycles = 0
+
+    def run(self, max_cycles: Optional[int] = None) -> None:
+        """
+        Polls until stopped by SIGTERM or SIGINT, or by calling `stop()`.
+
+        :param max_cycles: stop after this number of cycles; runs forever if
+            not given
+        """
+        previous_handlers = self._install_signal_handlers()
+        print(
+            f"polling {self.station} every {self.interval} s "
+            f"(jitter {self.jitter} s)"
+        )
+        try:
+            while not self.stopped.is_set():
+                self.run_cycle()
+                if max_cycles is not None and self.cycles >= max_cycles:
+                    break
+                self.stopped.wait(self._next_delay())
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            if isinstance(self.source, FtpSource):
+                self.source.close()
+        print("ingestion service stopped")
+
+    def run_cycle(self) -> int:
+        """
+        Runs a single polling cycle. Errors are reported, but do not end the
+        service; the cached latest times are dropped, then, as they might be
+        out of date.
+
+        :return: the number of fetched files
+        """
+        self.cycles += 1
+        metrics = RunMetrics(
+            profile_stages=("parse",) if os.getenv("PROFILE_PARSE") else ()
+        )
+        start = time.perf_counter()
+        file_count = 0
+        lease = _get_lease(self.station, self.temp_data_dir)
+        if lease is not None and not lease.acquire():
+            print(f"cycle {self.cycles}: {self.station} is being ingested elsewhere")
+            metrics.count("skipped_cycles")
+            # the other run inserts data, so the cached latest times get stale
+            self.latest_times.clear()
+            _write_run_report(metrics)
+            return 0
+        try:
+            file_count = _ingest(
+                self._get_sink,
+                self.source,
+                self.station,
+                self.max_day_diff,
+                metrics,
+                self.latest_times,
+                _lease_held(lease),
+            )
+        except Exception:
+            traceback.print_exc()
+            metrics.count("failed_cycles")
+            self.latest_times.clear()
+        finally:
+            _release_lease(lease, metrics)
+            _write_run_report(metrics)
+        print(
+            f"cycle {self.cycles}: {file_count} new file(s) "
+            f"in {time.perf_counter() - start:.3f} s"
+        )
+        return file_count
+
+    def stop(self, *_) -> None:
+        self.stopped.set()
+
+    def _get_sink(self) -> Sink:
+        if self.sink is None:
+            self.sink = _get_sink(self.sink_type)
+        return self.sink
+
+    def _next_delay(self) -> float:
+        return max(0.0, self.interval + random.uniform(-self.jitter, self.jitter))
+
+    def _install_signal_handlers(self) -> Dict[int, Any]:
+        previous_handlers = {}
+        # signal handlers can only be installed from the main thread
+        if threading.current_thread() is threading.main_thread():
+            for signum in [signal.SIGTERM, signal.SIGINT]:
+                previous_handlers[signum] = signal.signal(signum, self.stop)
+        return previous_handlers
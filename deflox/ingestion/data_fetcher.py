@@ -24,96 +24,200 @@ import os
 import re
 import time
 from ftplib import FTP
+from typing import Collection, Optional
 
 from dotenv import load_dotenv
 
+from deflox.ingestion.content_index import new_hash
+from deflox.ingestion.metrics import RunMetrics
+
+# name prefixes of the processed products uploaded by the stations, which can
+# be derived from the raw data, see deflox.radiometry
+PROCESSED_PRODUCT_PREFIXES = (
+    "Incoming_radiance_",
+    "Reflected_radiance_",
+    "Reflectance_",
+)
+
+
+def is_processed_product(file_name: str) -> bool:
+    return file_name.startswith(PROCESSED_PRODUCT_PREFIXES)
+
+
+def connect() -> FTP:
+    """
+    Opens a passive FTP session to FTP_HOST and FTP_PORT, logged in as
+    FTP_USER.
+    """
+    ftp = FTP()
+    ftp.connect(os.getenv("FTP_HOST"), int(os.getenv("FTP_PORT", "21")))
+    ftp.set_pasv(True)
+    ftp.login(os.getenv("FTP_USER"), os.getenv("FTP_PW"))
+    return ftp
+
+
+def disconnect(ftp: Optional[FTP]) -> None:
+    if ftp is None:
+        return
+    try:
+        ftp.quit()
+    except Exception:
+        ftp.close()
+
 
 class DataFetcher(object):
     """
     This class fetches data from the source; data must not be older than a configurable number of days.
+
+    :param ftp: an open, logged-in FTP session to use, e.g. of a previous
+        fetch; if not given, a new session is opened
+    :param keep_session: whether to leave the session open after fetching,
+        so that it can be reused by the next `DataFetcher`, see `ftp`
     """
 
-    def __init__(self, target_dir: str):
+    def __init__(
+        self,
+        target_dir: str,
+        metrics: Optional[RunMetrics] = None,
+        ftp: Optional[FTP] = None,
+        keep_session: bool = False,
+    ):
         self.max_days = None
+        self.exclude = set()
         load_dotenv()
-        self.ftp = FTP()
-        self.ftp.connect(os.getenv("FTP_HOST"), int(os.getenv("FTP_PORT", "21")))
-        self.ftp.set_pasv(True)
+        self.station = os.getenv("FTP_USER")
+        self.skip_processed = bool(os.getenv("SKIP_PROCESSED_PRODUCTS"))
+        self.metrics = metrics if metrics is not None else RunMetrics()
+        self.ftp = ftp
+        self.keep_session = keep_session
         self.data_dir = None
         self.target_dir = target_dir
         self.downloaded_files = []
-
-    def fetch_data(self, max_days: int = 2) -> None:
-        self.ftp.login(os.getenv("FTP_USER"), os.getenv("FTP_PW"))
+        # content hashes of the downloaded files, computed while downloading
+        self.file_hashes = {}
+
+    def fetch_data(
+        self,
+        max_days: Optional[int] = 2,
+        first_dir: Optional[str] = None,
+        last_dir: Optional[str] = None,
+        exclude: Collection[str] = (),
+    ) -> None:
+        """
+        Downloads the CSV files of the station.
+
+        :param max_days: the maximum age of the files in days; if None, the
+            modification times of the files are not checked
+        :param first_dir: if given, the first day directory (YYMMDD) to fetch
+        :param last_dir: if given, the last day directory (YYMMDD) to fetch
+        :param exclude: files not to fetch, given as `<YYMMDD>/<file name>`
+        """
+        if self.ftp is None:
+            self.ftp = connect()
         self.max_days = max_days
+        self.exclude = set(exclude)
 
         data_dirs = []
 
-        for directory in self.ftp.nlst("."):
-            if re.search("^\\d\\d\\d\\d\\d\\d$", directory):
+        with self.metrics.stage(self.station, "list"):
+            for directory in self.ftp.nlst("."):
+                if not re.search("^\\d\\d\\d\\d\\d\\d$", directory):
+                    continue
+                if first_dir is not None and directory < first_dir:
+                    continue
+                if last_dir is not None and directory > last_dir:
+                    continue
                 data_dirs.append(directory)
 
         for data_dir in data_dirs:
             self.data_dir = data_dir
-            self.ftp.dir(f"./{data_dir}", self._download_csv_file)
+            with self.metrics.stage(self.station, "list"):
+                entries = []
+                self.ftp.dir(f"./{data_dir}", entries.append)
+            for entry in entries:
+                self._download_csv_file(entry)
 
-        self.ftp.quit()
+        if not self.keep_session:
+            self.ftp.quit()
+            self.ftp = None
 
     def _download_csv_file(self, entry: str):
         entry = entry.split(" ")[-1]
+        if f"{self.data_dir}/{entry}" in self.exclude:
+            return
+        if self.skip_processed and is_processed_product(entry):
+            return
         if entry.lower().endswith(".csv") and not entry.lower() == "log.csv":
             td = f"{self.target_dir}/{self.data_dir}"
-
-            # sometimes, the MDTM command responds with "226 Transfer Complete"
-            # instead of the correct timestamp. We are trying 10 times before
-            # giving up, that usually is enough.
-            count = 0
-            timestamp = ""
+            if self.max_days is None or self._is_recent(entry):
+                self._download(entry, td)
+
+    def _is_recent(self, entry: str) -> bool:
+        # sometimes, the MDTM command responds with "226 Transfer Complete"
+        # instead of the correct timestamp. We are trying 10 times before
+        # giving up, that usually is enough.
+        count = 0
+        timestamp = ""
+        with self.metrics.stage(self.station, "mdtm") as mdtm_metrics:
             while True and count < 10:
                 count += 1
                 cmd = f"MDTM ./{self.data_dir}/{entry}"
                 timestamp = self.ftp.voidcmd(cmd)
                 if "Transfer" in timestamp:
+                    mdtm_metrics.retries += 1
                     time.sleep(1)
                     continue
                 else:
                     break
 
-            if "Transfer" in timestamp:
-                raise RuntimeError(
-                    "FTP server does not implement MDTM command correctly."
-                )
-
-            timestamp = timestamp.split(" ")[1]
-            if not re.search("\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d", timestamp):
-                return
-
-            last_modified_date = datetime.datetime.strptime(timestamp, "%Y%m%d%H%M%S")
-            earliest_day = datetime.datetime.today() - datetime.timedelta(
-                days=self.max_days
-            )
-
-            if last_modified_date <= earliest_day:
-                return
-
-            print(f"Downloading {entry} from {self.data_dir} to {td}")
-
-            os.makedirs(td, exist_ok=True)
-            with open(f"{td}/{entry}", "wb") as file:
-                self.ftp = FTP()
-                attempt = 0
-                while attempt < 10:
-                    try:
-                        attempt += 1
-                        self.ftp.connect(
-                            os.getenv("FTP_HOST"), int(os.getenv("FTP_PORT"))
-                        )
-                        self.ftp.login(os.getenv("FTP_USER"), os.getenv("FTP_PW"))
-                        self.ftp.retrbinary(
-                            f"RETR {self.data_dir}/{entry}", file.write, 256 * 1024
-                        )
-                        self.downloaded_files.append(f"{td}/{entry}")
-                        break
-                    except Exception as exc:
-                        print(exc.args)
-                        time.sleep(10)
+        if "Transfer" in timestamp:
+            raise RuntimeError("FTP server does not implement MDTM command correctly.")
+
+        timestamp = timestamp.split(" ")[1]
+        if not re.search("\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d\\d", timestamp):
+            return False
+
+        last_modified_date = datetime.datetime.strptime(timestamp, "%Y%m%d%H%M%S")
+        earliest_day = datetime.datetime.today() - datetime.timedelta(
+            days=self.max_days
+        )
+
+        return last_modified_date > earliest_day
+
+    def _download(self, entry: str, td: str):
+        print(f"Downloading {entry} from {self.data_dir} to {td}")
+
+        os.makedirs(td, exist_ok=True)
+        with (
+            open(f"{td}/{entry}", "wb") as file,
+            self.metrics.stage(self.station, "transfer") as transfer_metrics,
+        ):
+            attempt = 0
+            while attempt < 10:
+                try:
+                    attempt += 1
+                    if attempt > 1:
+                        # the session might be broken by the failed attempt
+                        disconnect(self.ftp)
+                        self.ftp = connect()
+                    # start over, in case a previous attempt failed midway
+                    file.seek(0)
+                    file.truncate()
+                    content_hash = new_hash()
+
+                    def write(chunk: bytes):
+                        file.write(chunk)
+                        content_hash.update(chunk)
+
+                    self.ftp.retrbinary(
+                        f"RETR {self.data_dir}/{entry}", write, 256 * 1024
+                    )
+                    self.downloaded_files.append(f"{td}/{entry}")
+                    self.file_hashes[f"{td}/{entry}"] = content_hash.hexdigest()
+                    transfer_metrics.files += 1
+                    transfer_metrics.bytes += file.tell()
+                    break
+                except Exception as exc:
+                    print(exc.args)
+                    transfer_metrics.retries += 1
+                    time.sleep(10)
@@ -19,12 +19,17 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 import re
+import threading
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import Callable, Optional, List
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 import geopandas
 import numpy as np
 import pandas as pd
+import shapely
+
+from deflox.quality import QualityLimits, compute_flags, count_spectra
 
 
 class Var:
@@ -37,211 +42,95 @@ class Var:
             self.converter_func = lambda x: x
         else:
             self.converter_func = converter_func
-        self.values = []
 
 
 class DataReader:
     """
     Reads FLoX data and turns it into a geopandas GeoDataFrame, ready for ingestion into the xcube geoDB.
-    """
 
-    def __init__(self):
-        self.df = pd.DataFrame()
+    A reader keeps no state between reads, so a single instance can be
+    reused for any number of files, and shared by threads.
+    """
 
     def read(
         self,
         raw_lines: List[str],
         processed_lines: Optional[List[str]] = None,
         var_name: Optional[str] = None,
+        executor: Optional[Executor] = None,
+        quality: Optional[QualityLimits] = None,
     ) -> geopandas.GeoDataFrame:
+        """
+        Reads raw data, or processed data if `processed_lines` are given.
+
+        :param executor: if given, the blocks of large raw files are parsed
+            in parallel by the executor, e.g. a ProcessPoolExecutor; the
+            result is the same as when reading serially
+        :param quality: if given, the quality control columns (see
+            `deflox.quality.QC_COLUMNS`) are added to raw data
+        """
         if processed_lines:
             return self._read_processed(raw_lines[0], processed_lines, var_name)
         else:
-            return self._read_raw(raw_lines)
-
-    def _read_raw(self, raw_lines: List[str]) -> geopandas.GeoDataFrame:
-        local_datetime_values = []
-        utc_datetime_values = []
+            return self._read_raw(raw_lines, executor, quality)
 
+    def _read_raw(
+        self,
+        raw_lines: List[str],
+        executor: Optional[Executor] = None,
+        quality: Optional[QualityLimits] = None,
+    ) -> geopandas.GeoDataFrame:
+        saturation = quality.saturation if quality is not None else None
         first_line = raw_lines[0]
         is_f_prefixed_data = len(first_line.split(";")) == 42
-        self._initialize_vars(is_f_prefixed_data)
-
-        cursor = 0
-        while cursor + 6 <= len(raw_lines):
-            skip_block = False
-            current_block = raw_lines[cursor : cursor + 6]
-            cursor += 6
-
-            meta = current_block[0].split(";")
-
-            values_to_add = {}
-            for core_var in self.core_vars:
-                values = [
-                    m
-                    for m in current_block[core_var.index]
-                    .replace("\r", "")
-                    .split(";")[1:-1]
-                ]
-                if not len(values) == 1024:
-                    print(
-                        f"WARN: line {cursor - 6 + core_var.index + 1} invalid. "
-                        f"Skipping respective block of measurements."
-                    )
-                    for line_index, line in enumerate(
-                        raw_lines[cursor - 6 + core_var.index + 1 :]
-                    ):
-                        if re.match(
-                            "^\\d+;\\d\\d\\d\\d\\d\\d;\\d\\d\\d\\d\\d\\d;.*;IT_WR.us.=",
-                            line,
-                        ):
-                            cursor = cursor - 6 + core_var.index + line_index + 1
-                            break
-
-                    skip_block = True
-                    break
 
-                values_to_add[core_var.var_name] = [int(v) for v in values]
-
-            if skip_block:
-                continue
-
-            for core_var in self.core_vars:
-                core_var.values.append(values_to_add[core_var.var_name])
-
-            local_datetime_values.append(
-                f"20{meta[1][:2]}-{meta[1][2:4]}-{meta[1][4:6]} "
-                f"{meta[2][:2]}:{meta[2][2:4]}:{meta[2][4:6]}"
-            )
-            if is_f_prefixed_data:
-                utc_datetime_values.append(
-                    f"20{meta[18][4:]}-{meta[18][2:4]}-{meta[18][0:2]} "
-                    f"{meta[16][:2]}:{meta[16][2:4]}:{meta[16][4:6]}"
-                )
-            else:
-                utc_datetime_values.append(
-                    f"20{meta[26][4:]}-{meta[26][2:4]}-{meta[26][0:2]} "
-                    f"{meta[24][:2]}:{meta[24][2:4]}:{meta[24][4:6]}"
+        block_starts, skipped_blocks = _scan_blocks(raw_lines)
+
+        if executor is not None and len(block_starts) > BLOCKS_PER_TASK:
+            # parse chunks of blocks in parallel, passing only their lines
+            tasks = []
+            for i in range(0, len(block_starts), BLOCKS_PER_TASK):
+                lines = []
+                for start in block_starts[i : i + BLOCKS_PER_TASK]:
+                    lines += raw_lines[start : start + 6]
+                tasks.append(
+                    executor.submit(
+                        _parse_blocks,
+                        lines,
+                        range(0, len(lines), 6),
+                        is_f_prefixed_data,
+                        saturation,
+                    )
                 )
+            # the spectra are returned as arrays, which are much cheaper to
+            # send between processes than lists
+            results = [task.result() for task in tasks]
+            columns = {}
+            for name in results[0]:
+                if isinstance(results[0][name], np.ndarray):
+                    columns[name] = np.concatenate([r[name] for r in results])
+                else:
+                    columns[name] = [v for r in results for v in r[name]]
+        else:
+            columns = _parse_blocks(
+                raw_lines, block_starts, is_f_prefixed_data, saturation
+            )
+        for core_var in CORE_VARS:
+            columns[core_var.var_name] = columns[core_var.var_name].tolist()
 
-            for meta_var in self.meta_vars:
-                meta_var.values.append(meta_var.converter_func(meta[meta_var.index]))
-
-        for var in self.core_vars:
-            self._append_column(var.var_name, var.values)
-
-        for var in self.meta_vars:
-            self._append_column(var.var_name, var.values)
-
-        self._append_column("local_datetime", local_datetime_values)
-        self._append_column("utc_datetime", utc_datetime_values)
-
+        df = pd.DataFrame({name: pd.Series(values) for name, values in columns.items()})
+        if quality is not None:
+            df["qc_flags"] = compute_flags(df, quality)
         gdf = geopandas.GeoDataFrame(
-            self.df,
-            geometry=geopandas.points_from_xy(self.df.GPS_lon, self.df.GPS_lat),
+            df,
+            geometry=_points(df.GPS_lon, df.GPS_lat),
             crs="EPSG:4326",
         )
+        # line numbers of invalid lines, whose blocks have been skipped
+        gdf.attrs["skipped_blocks"] = skipped_blocks
 
         return gdf
 
-    def _append_column(self, column_name: str, new_data: List) -> None:
-        if column_name not in self.df.columns:
-            self.df[column_name] = pd.Series(new_data)
-        else:
-            self.df[column_name] = pd.concat(
-                [self.df[column_name], pd.Series(new_data)], ignore_index=True
-            )
-
-    def _initialize_vars(self, is_f_prefixed_data):
-        self.core_vars = [
-            Var("wr", 1),
-            Var("veg", 2),
-            Var("wr2", 3),
-            Var("DC_WR", 4),
-            Var("DC_VEG", 5),
-        ]
-
-        if is_f_prefixed_data:
-            self.meta_vars = [
-                Var("IT_WR[us]", 5, float),
-                Var(
-                    "IT_VEG[us]",
-                    7,
-                    float,
-                ),
-                Var("cycle_duration[ms]", 9, float),
-                Var("mainboard_temp[C]", 11, float),
-                Var("mainboard_humidity", 13, float),
-                Var("flox_identifier", 14),
-                Var(
-                    "GPS_lat",
-                    20,
-                    lambda v: float(v.replace(" N", "").replace(" S", "")),
-                ),
-                Var(
-                    "GPS_lon",
-                    22,
-                    lambda v: float(v.replace(" E", "").replace(" W", "")),
-                ),
-                Var("voltage", 24, float),
-                Var("gps_CPU", 26, float),
-                Var("wr_CPU", 28, float),
-                Var("veg_CPU", 30, float),
-                Var(
-                    "wr2_CPU",
-                    32,
-                    float,
-                ),
-                Var("MultiCal", 38, int),
-                Var("RSSI", 40, int),
-            ]
-        else:
-            self.meta_vars = [
-                Var("IT_WR[us]", 5, float),
-                Var(
-                    "IT_VEG[us]",
-                    7,
-                    float,
-                ),
-                Var("cycle_duration[ms]", 9, float),
-                Var(
-                    "QEpro_Frame[C]",
-                    11,
-                    float,
-                ),
-                Var("QEpro_CCD[C]", 13, float),
-                Var("chamber_temp[C]", 15, float),
-                Var("chamber_humidity", 17, float),
-                Var("mainboard_temp[C]", 19, float),
-                Var("mainboard_humidity", 21, float),
-                Var("flox_identifier", 22),
-                Var(
-                    "GPS_lat",
-                    28,
-                    lambda v: float(v.replace(" N", "").replace(" S", "")),
-                ),
-                Var(
-                    "GPS_lon",
-                    30,
-                    lambda v: float(v.replace(" E", "").replace(" W", "")),
-                ),
-                Var("voltage", 32, float),
-                Var("gps_CPU", 34, float),
-                Var("wr_CPU", 36, float),
-                Var("veg_CPU", 38, float),
-                Var(
-                    "wr2_CPU",
-                    40,
-                    float,
-                ),
-                Var("cooling_active", 46),
-                Var("heating_active", 48),
-                Var("Temp0", 50, float),
-                Var("Temp1", 52, float),
-                Var("Temp2", 54, float),
-                Var("MultiCal", 56, int),
-            ]
-
     def _read_processed(
         self, first_header_line: str, processed_lines: List[str], var_name: str
     ) -> geopandas.GeoDataFrame:
@@ -276,16 +165,240 @@ class DataReader:
         lat_values = np.repeat(lat, len(local_datetime_values))
         lon_values = np.repeat(lon, len(local_datetime_values))
 
-        self.df["local_datetime"] = local_datetime_values
-        self.df["GPS_lon"] = lon_values
-        self.df["GPS_lat"] = lat_values
-        self.df[f"{var_name}_wl"] = wavelengths
-        self.df[var_name] = core_var_values
+        df = pd.DataFrame()
+        df["local_datetime"] = local_datetime_values
+        df["GPS_lon"] = lon_values
+        df["GPS_lat"] = lat_values
+        df[f"{var_name}_wl"] = wavelengths
+        df[var_name] = core_var_values
 
         gdf = geopandas.GeoDataFrame(
-            self.df,
-            geometry=geopandas.points_from_xy(self.df.GPS_lon, self.df.GPS_lat),
+            df,
+            geometry=_points(df.GPS_lon, df.GPS_lat),
             crs="EPSG:4326",
         )
 
         return gdf
+
+
+CORE_VARS = (
+    Var("wr", 1),
+    Var("veg", 2),
+    Var("wr2", 3),
+    Var("DC_WR", 4),
+    Var("DC_VEG", 5),
+)
+
+F_META_VARS = (
+    Var("IT_WR[us]", 5, float),
+    Var("IT_VEG[us]", 7, float),
+    Var("cycle_duration[ms]", 9, float),
+    Var("mainboard_temp[C]", 11, float),
+    Var("mainboard_humidity", 13, float),
+    Var("flox_identifier", 14),
+    Var("GPS_lat", 20, lambda v: float(v.replace(" N", "").replace(" S", ""))),
+    Var("GPS_lon", 22, lambda v: float(v.replace(" E", "").replace(" W", ""))),
+    Var("voltage", 24, float),
+    Var("gps_CPU", 26, float),
+    Var("wr_CPU", 28, float),
+    Var("veg_CPU", 30, float),
+    Var("wr2_CPU", 32, float),
+    Var("MultiCal", 38, int),
+    Var("RSSI", 40, int),
+)
+
+META_VARS = (
+    Var("IT_WR[us]", 5, float),
+    Var("IT_VEG[us]", 7, float),
+    Var("cycle_duration[ms]", 9, float),
+    Var("QEpro_Frame[C]", 11, float),
+    Var("QEpro_CCD[C]", 13, float),
+    Var("chamber_temp[C]", 15, float),
+    Var("chamber_humidity", 17, float),
+    Var("mainboard_temp[C]", 19, float),
+    Var("mainboard_humidity", 21, float),
+    Var("flox_identifier", 22),
+    Var("GPS_lat", 28, lambda v: float(v.replace(" N", "").replace(" S", ""))),
+    Var("GPS_lon", 30, lambda v: float(v.replace(" E", "").replace(" W", ""))),
+    Var("voltage", 32, float),
+    Var("gps_CPU", 34, float),
+    Var("wr_CPU", 36, float),
+    Var("veg_CPU", 38, float),
+    Var("wr2_CPU", 40, float),
+    Var("cooling_active", 46),
+    Var("heating_active", 48),
+    Var("Temp0", 50, float),
+    Var("Temp1", 52, float),
+    Var("Temp2", 54, float),
+    Var("MultiCal", 56, int),
+)
+
+# number of values of a spectrum
+SPECTRUM_LENGTH = 1024
+
+# number of blocks of measurements parsed by a single task when reading in
+# parallel
+BLOCKS_PER_TASK = 1000
+
+# number of blocks whose spectra fit into the parse buffer of a thread
+BUFFER_BLOCKS = 256
+
+_HEADER_PATTERN = re.compile(
+    "^\\d+;\\d\\d\\d\\d\\d\\d;\\d\\d\\d\\d\\d\\d;.*;IT_WR.us.="
+)
+
+
+def _scan_blocks(raw_lines: List[str]) -> Tuple[List[int], List[int]]:
+    """
+    Finds the blocks of measurements in raw data. A block consists of a
+    meta data line and five spectra with 1024 values each. If a spectrum is
+    invalid, its block is skipped, and the next block is searched for from
+    the line following the invalid one.
+
+    :return: the indices of the first lines of the valid blocks, and the
+        line numbers of the invalid lines
+    """
+    block_starts = []
+    skipped_blocks = []
+    cursor = 0
+    while cursor + 6 <= len(raw_lines):
+        block_start = cursor
+        cursor += 6
+        for index in range(1, 6):
+            # a valid spectrum line is "NAME;v1;...;v1024;"
+            if raw_lines[block_start + index].count(";") != 1025:
+                line_number = block_start + index + 1
+                print(
+                    f"WARN: line {line_number} invalid. "
+                    f"Skipping respective block of measurements."
+                )
+                skipped_blocks.append(line_number)
+                for line_index, line in enumerate(raw_lines[line_number:]):
+                    if _HEADER_PATTERN.match(line):
+                        cursor = line_number + line_index
+                        break
+                break
+        else:
+            block_starts.append(block_start)
+    return block_starts, skipped_blocks
+
+
+def _parse_blocks(
+    raw_lines: List[str],
+    block_starts: Iterable[int],
+    is_f_prefixed_data: bool,
+    saturation: Optional[int] = None,
+) -> Dict[str, List]:
+    """
+    Parses the given valid blocks of measurements into columns. The spectra
+    are returned as 2D arrays with one row per block, the other columns as
+    lists.
+
+    :param saturation: if given, the quality control counters of the
+        spectra are added as columns, see `deflox.quality.count_spectra`
+    """
+    meta_vars = F_META_VARS if is_f_prefixed_data else META_VARS
+    block_starts = list(block_starts)
+    columns = {var.var_name: [] for var in CORE_VARS + meta_vars}
+    spectra = np.empty(
+        (len(CORE_VARS), len(block_starts), SPECTRUM_LENGTH), dtype=np.int64
+    )
+    qc_columns = {}
+    local_datetime_values = []
+    utc_datetime_values = []
+    last_raw_values = {}
+    last_values = {}
+
+    buffer = _get_spectrum_buffer()
+    for i in range(0, len(block_starts), BUFFER_BLOCKS):
+        chunk = block_starts[i : i + BUFFER_BLOCKS]
+        for row, block_start in enumerate(chunk):
+            meta = raw_lines[block_start].split(";")
+
+            for var_index, core_var in enumerate(CORE_VARS):
+                line = raw_lines[block_start + core_var.index]
+                # the values between the name and the trailing separator
+                buffer[var_index, row] = np.fromstring(
+                    line[line.index(";") + 1 : line.rindex(";")],
+                    dtype=np.int64,
+                    sep=";",
+                )
+
+            local_datetime_values.append(
+                f"20{meta[1][:2]}-{meta[1][2:4]}-{meta[1][4:6]} "
+                f"{meta[2][:2]}:{meta[2][2:4]}:{meta[2][4:6]}"
+            )
+            if is_f_prefixed_data:
+                utc_datetime_values.append(
+                    f"20{meta[18][4:]}-{meta[18][2:4]}-{meta[18][0:2]} "
+                    f"{meta[16][:2]}:{meta[16][2:4]}:{meta[16][4:6]}"
+                )
+            else:
+                utc_datetime_values.append(
+                    f"20{meta[26][4:]}-{meta[26][2:4]}-{meta[26][0:2]} "
+                    f"{meta[24][:2]}:{meta[24][2:4]}:{meta[24][4:6]}"
+                )
+
+            for meta_var in meta_vars:
+                raw_value = meta[meta_var.index]
+                # stations are stationary: most meta values repeat from block
+                # to block, so reuse the previous value instead of converting
+                # again
+                if raw_value != last_raw_values.get(meta_var.var_name):
+                    last_raw_values[meta_var.var_name] = raw_value
+                    last_values[meta_var.var_name] = meta_var.converter_func(raw_value)
+                columns[meta_var.var_name].append(last_values[meta_var.var_name])
+
+        spectra[:, i : i + len(chunk)] = buffer[:, : len(chunk)]
+        if saturation is not None:
+            counters = count_spectra(buffer[:, : len(chunk)], saturation)
+            for name, values in counters.items():
+                qc_columns.setdefault(name, []).extend(values.tolist())
+
+    for var_index, core_var in enumerate(CORE_VARS):
+        columns[core_var.var_name] = spectra[var_index]
+    columns["local_datetime"] = local_datetime_values
+    columns["utc_datetime"] = utc_datetime_values
+    if saturation is not None:
+        for name in ["qc_saturated", "qc_dc_wr", "qc_dc_veg"]:
+            columns[name] = qc_columns.get(name, [])
+    return columns
+
+
+_thread_local = threading.local()
+
+
+def _get_spectrum_buffer() -> np.ndarray:
+    """
+    Returns the buffer the spectra are parsed into by the current thread.
+    It is created once per thread and reused for all files, as the spectra
+    are copied out of it into the columns of each chunk of blocks.
+    """
+    buffer = getattr(_thread_local, "spectrum_buffer", None)
+    if buffer is None or buffer.shape[1] != BUFFER_BLOCKS:
+        buffer = np.empty(
+            (len(CORE_VARS), BUFFER_BLOCKS, SPECTRUM_LENGTH), dtype=np.int64
+        )
+        _thread_local.spectrum_buffer = buffer
+    return buffer
+
+
+def _points(
+    lons: Iterable[float], lats: Iterable[float]
+) -> geopandas.array.GeometryArray:
+    """
+    Creates the point geometries of the given positions. Consecutive rows at
+    the same position share a single point, so a stationary station needs
+    only as many points as it has distinct positions in a row.
+    """
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+    if len(lons) == 0:
+        return geopandas.array.from_shapely(np.empty(0, dtype=object))
+    changed = np.empty(len(lons), dtype=bool)
+    changed[0] = True
+    changed[1:] = (lons[1:] != lons[:-1]) | (lats[1:] != lats[:-1])
+    run_starts = np.flatnonzero(changed)
+    run_lengths = np.diff(np.append(run_starts, len(lons)))
+    points = shapely.points(lons[run_starts], lats[run_starts])
+    return geopandas.array.from_shapely(np.repeat(points, run_lengths))
@@ -18,25 +18,83 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
+import argparse
+import contextlib
+import functools
+import itertools
 import os
-import shutil
 import sys
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime
-from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-import pandas
 from dotenv import load_dotenv
-from xcube_geodb.core.geodb import GeoDBClient
 
-from data_fetcher import DataFetcher
-from flox_data_reader import DataReader
+from deflox.ingestion.content_index import ContentIndex
+from deflox.ingestion.lease import Lease, get_lease
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.outbox import SUMMARIES_DIR, Outbox
+from deflox.ingestion.sinks import GeoDBSink, MemorySink, Sink, SqliteSink
+from deflox.ingestion.sources import ArchiveSource, FtpSource, LocalSource, Source
 
+# Note: pandas, geopandas and xcube_geodb are imported only when there is new
+# data, so that polling the FTP for new data starts up quickly.
 
-def ingest():
+# the number of files read ahead when reading in parallel
+_READ_AHEAD = 16
+
+
+def ingest(sink: Optional[Sink] = None):
     """
     Does the complete ingestion process for a single FLoX.
+
+    :param sink: the sink to write into; if not given, it is created according
+        to the environment variable SINK_TYPE (geodb, sqlite or memory).
     """
     load_dotenv()
+    temp_data_dir, max_day_diff, sink_type = _get_config(sink is not None)
+
+    station = os.environ["FTP_USER"]
+    metrics = RunMetrics(
+        profile_stages=("parse",) if os.getenv("PROFILE_PARSE") else ()
+    )
+    lease = _get_lease(station, temp_data_dir)
+    if lease is not None and not lease.acquire():
+        print(f"{station} is being ingested by another run, skipping...")
+        metrics.count("skipped_runs")
+        _write_run_report(metrics)
+        sys.exit(0)
+    try:
+        file_count = _ingest(
+            (lambda: sink) if sink is not None else (lambda: _get_sink(sink_type)),
+            _get_source(temp_data_dir),
+            station,
+            max_day_diff,
+            metrics,
+            {},
+            _lease_held(lease),
+        )
+    finally:
+        _release_lease(lease, metrics)
+        _write_run_report(metrics)
+
+    if file_count == 0:
+        print("No new data to ingest, exiting...")
+        sys.exit(0)
+    print("ingestion process finished")
+
+
+def _get_config(has_sink: bool) -> Tuple[str, int, str]:
+    """
+    Reads the configuration from the environment, and checks that all
+    mandatory environment variables are set.
+
+    :param has_sink: whether the sink is given, so that its configuration is
+        not needed
+    :return: the temporary data directory, the maximum age of files in days
+        and the sink type
+    """
     temp_data_dir = (
         os.environ["TEMP_DATA_DIR"] if "TEMP_DATA_DIR" in os.environ else "."
     )
@@ -44,78 +102,518 @@ def ingest():
         int(os.environ["MAX_DAY_DIFF"]) if "MAX_DAY_DIFF" in os.environ else 2
     )
 
-    mandatory_env_vars = [
-        "FTP_HOST",
-        "FTP_USER",
-        "FTP_PW",
-        "GEODB_SERVER_URL",
-        "GEODB_CLIENT_ID",
-        "GEODB_CLIENT_SECRET",
-    ]
+    sink_type = os.environ["SINK_TYPE"] if "SINK_TYPE" in os.environ else "geodb"
+
+    # the FTP user is the name of the station, also for local sources
+    mandatory_env_vars = ["FTP_USER"]
+    if os.getenv("SOURCE_TYPE", "ftp") == "ftp":
+        mandatory_env_vars += ["FTP_HOST", "FTP_PW"]
+    if not has_sink and sink_type == "geodb":
+        mandatory_env_vars += [
+            "GEODB_SERVER_URL",
+            "GEODB_CLIENT_ID",
+            "GEODB_CLIENT_SECRET",
+        ]
     for v in mandatory_env_vars:
         if not os.getenv(v):
             raise ValueError(f"Missing mandatory environment variable: {v}")
 
-    data_fetcher = DataFetcher(temp_data_dir)
-    data_fetcher.fetch_data(max_day_diff)
+    return temp_data_dir, max_day_diff, sink_type
 
-    if not data_fetcher.downloaded_files:
-        print("No new data to ingest, exiting...")
-        sys.exit(0)
 
-    # get time information from geoDB
-    raw_collection_name = os.environ["FTP_USER"] + "-raw"
-    raw_f_collection_name = f"{os.environ['FTP_USER']}-raw-f"
-    geodb = _get_geodb_client()
-    latest_time_raw = _get_latest_time(geodb, raw_collection_name)
-    latest_time_raw_f = _get_latest_time(geodb, raw_f_collection_name)
-
-    for f in data_fetcher.downloaded_files:
-        print(f"reading {f}")
-        file_path = os.path.join(temp_data_dir, f)
-        with open(file_path, "r") as csvfile:
-            gdf = DataReader().read(csvfile.readlines())
-        is_f_file = os.path.basename(f)[0] == "F"
-        latest_time = latest_time_raw_f if is_f_file else latest_time_raw
+def _ingest(
+    get_sink: Callable[[], Sink],
+    source: Source,
+    station: str,
+    max_day_diff: int,
+    metrics: RunMetrics,
+    latest_times: Dict[str, datetime],
+    should_continue: Optional[Callable[[], bool]] = None,
+) -> int:
+    """
+    Fetches new files of a station and writes their new rows into the sink.
+
+    :param get_sink: returns the sink; only called if there are new files
+    :param source: the source of the files
+    :param latest_times: the latest times per collection; missing entries
+        are requested from the sink, and all entries are updated after
+        insertion, so that the dict can be reused by subsequent calls
+    :param should_continue: see `_ingest_files`
+    :return: the number of fetched files
+    """
+    outbox = Outbox(os.environ["OUTBOX_DIR"]) if os.getenv("OUTBOX_DIR") else None
+    summarizer = _get_summarizer(station, outbox)
+    if outbox is not None and outbox.pending(station=station):
+        # data of earlier runs which could not be written into the sink
+        sink = get_sink()
+        drained = {collection for collection, _ in outbox.pending(station=station)}
+        outbox.drain(
+            sink,
+            station,
+            metrics,
+            on_drained=functools.partial(_summarize, summarizer, station),
+        )
+        for collection_name in drained:
+            latest_times.pop(collection_name, None)
+
+    files = source.fetch(metrics, max_day_diff)
+
+    if not files:
+        if summarizer is not None and summarizer.summaries:
+            # statistics of drained rows, or of earlier runs
+            summarizer.write(get_sink(), station, metrics)
+        return 0
+
+    sink = get_sink()
+    _get_latest_times(sink, station, metrics, latest_times, outbox)
+    parse_workers = int(os.getenv("PARSE_WORKERS", "1"))
+    with (
+        ProcessPoolExecutor(parse_workers)
+        if parse_workers > 1
+        else contextlib.nullcontext()
+    ) as parse_executor:
+        _ingest_files(
+            files,
+            sink,
+            source,
+            station,
+            metrics,
+            latest_times,
+            outbox,
+            content_index=_get_content_index(),
+            parse_executor=parse_executor,
+            summarizer=summarizer,
+            should_continue=should_continue,
+        )
+    return len(files)
+
+
+def _get_latest_times(
+    sink: Sink,
+    station: str,
+    metrics: RunMetrics,
+    latest_times: Dict[str, datetime],
+    outbox: Optional[Outbox] = None,
+) -> None:
+    """
+    Adds the missing latest times of both raw collections of the station to
+    the given dict. They are taken from the sink, or from the outbox if it
+    holds later data.
+    """
+    with metrics.stage(station, "latest_time"):
+        for collection_name in [f"{station}-raw", f"{station}-raw-f"]:
+            if collection_name not in latest_times:
+                latest_times[collection_name] = sink.get_latest_time(collection_name)
+                if outbox is not None:
+                    outbox_time = outbox.latest_time(collection_name, station)
+                    if outbox_time is not None:
+                        latest_times[collection_name] = max(
+                            latest_times[collection_name], outbox_time
+                        )
+
+
+def _ingest_files(
+    files: List[str],
+    sink: Sink,
+    source: Source,
+    station: str,
+    metrics: RunMetrics,
+    latest_times: Dict[str, datetime],
+    outbox: Optional[Outbox] = None,
+    on_file_done: Optional[Callable[[str], None]] = None,
+    executor: Optional[Executor] = None,
+    content_index: Optional[ContentIndex] = None,
+    parse_executor: Optional[Executor] = None,
+    summarizer=None,
+    should_continue: Optional[Callable[[], bool]] = None,
+) -> None:
+    """
+    Reads the given files, writes their rows newer than the latest times
+    into the sink, and releases the files at the source.
+
+    :param latest_times: the latest times of both raw collections of the
+        station; updated after all files have been inserted
+    :param outbox: if given, rows which cannot be inserted are stored there
+    :param on_file_done: called with each file once it has been ingested
+    :param executor: if given, the files are read in parallel by the
+        executor; they are still inserted in the given order
+    :param content_index: if given, files with a content which has been
+        ingested before are neither read nor inserted
+    :param parse_executor: if given, the blocks of each large file are
+        parsed in parallel by the executor
+    :param summarizer: if given, a `Summarizer` which updates the summary
+        collections with the inserted rows
+    :param should_continue: if given, checked before each file and before
+        inserting its rows; once it returns False, e.g. because the lease of
+        the run has been lost, the remaining files are left at the source
+
+    The rows are also reduced by the profiles of `INGEST_PROFILES` and
+    written into a collection per profile, see `deflox.ingestion.profiles`.
+    """
+    import pandas
+
+    from deflox.ingestion.profiles import parse_profiles, write_definitions
+    from deflox.quality import QualityLimits
+    from deflox.quality import report as quality_report
+    from deflox.radiometry import load_station_calibration, to_products_gdf
+    from deflox.spectra import encode_spectra_columns
+
+    spectrum_encoding = os.getenv("SPECTRUM_ENCODING", "list")
+    calibration = load_station_calibration(os.getenv("CALIBRATION_DIR"), station)
+    quality = QualityLimits.from_env()
+    archive = _get_archive()
+    profiles = parse_profiles(os.getenv("INGEST_PROFILES"))
+    profile_collections = {}
+    station_geometry = None
+
+    raw_collection_name = station + "-raw"
+    raw_f_collection_name = f"{station}-raw-f"
+    inserted_latest_times = dict(latest_times)
+
+    def stopped() -> bool:
+        if should_continue is None or should_continue():
+            return False
+        print(f"stopping the ingestion of {station}, the lease has been lost")
+        metrics.count("stopped_runs")
+        return True
+
+    content_hashes = {}
+    # the hashes of the files of this run, to detect duplicates among them
+    seen_hashes = set()
+    duplicates = set()
+    if content_index is not None:
+        with metrics.stage(station, "dedup") as dedup_metrics:
+            for file_path in files:
+                content_hash = source.content_hash(file_path)
+                if content_hash in content_index or content_hash in seen_hashes:
+                    duplicates.add(file_path)
+                else:
+                    content_hashes[file_path] = content_hash
+                    seen_hashes.add(content_hash)
+                dedup_metrics.files += 1
+
+    files_to_read = [f for f in files if f not in duplicates]
+    if executor is not None:
+        gdfs = _map_ordered(
+            executor,
+            functools.partial(_read_file, quality=quality),
+            files_to_read,
+            _READ_AHEAD,
+        )
+    else:
+        gdfs = (_read_file(f, parse_executor, quality) for f in files_to_read)
+
+    for file_path in files:
+        if stopped():
+            break
+        if file_path in duplicates:
+            print(f"{file_path} has been ingested before, skipping it")
+            metrics.count("duplicate_files")
+            source.release(file_path)
+            if on_file_done is not None:
+                on_file_done(file_path)
+            continue
+
+        print(f"reading {file_path}")
+        with metrics.stage(station, "parse") as parse_metrics:
+            gdf = next(gdfs)
+            parse_metrics.files += 1
+            parse_metrics.bytes += os.path.getsize(file_path)
+            parse_metrics.rows += len(gdf)
+            skipped_blocks = gdf.attrs.get("skipped_blocks", [])
+            parse_metrics.skipped_blocks += len(skipped_blocks)
+            metrics.skip_blocks(station, source.key(file_path), skipped_blocks)
+        is_f_file = os.path.basename(file_path)[0] == "F"
+        collection_name = raw_f_collection_name if is_f_file else raw_collection_name
+        latest_time = latest_times[collection_name]
         gdf["utc_datetime"] = pandas.to_datetime(
             gdf["utc_datetime"], format="%Y-%m-%d %H:%M:%S"
         )
         gdf = gdf[gdf["utc_datetime"] > latest_time]
+        if len(gdf) > 0 and stopped():
+            break
+        if quality is not None and len(gdf) > 0:
+            # only the new rows, so that re-read files are not counted again
+            for name, count in quality_report(gdf)["flags"].items():
+                if count > 0:
+                    metrics.count(f"qc_{name}", count)
+        if len(gdf) > 0:
+            inserted_latest_times[collection_name] = max(
+                inserted_latest_times[collection_name],
+                gdf["utc_datetime"].max().to_pydatetime(),
+            )
         gdf["utc_datetime"] = gdf["utc_datetime"].astype(str)
 
-        collection_name = raw_f_collection_name if is_f_file else raw_collection_name
         if len(gdf) > 0:
-            geodb.insert_into_collection(collection_name, gdf, database="deflox")
+            station_geometry = gdf.geometry.iloc[-1]
+            encoded = encode_spectra_columns(gdf, spectrum_encoding)
+            if (
+                _insert(sink, collection_name, encoded, station, metrics, outbox)
+                and summarizer is not None
+            ):
+                # outboxed rows are summarized once they have been drained
+                summarizer.add(collection_name, gdf)
+            # the derived collections come after the raw rows, and must not
+            # fail the run
+            products = None
+            if calibration is not None:
+                try:
+                    with metrics.stage(station, "process"):
+                        products = to_products_gdf(gdf, calibration)
+                    _insert(
+                        sink,
+                        f"{collection_name}-processed",
+                        products,
+                        station,
+                        metrics,
+                        outbox,
+                    )
+                except Exception as exc:
+                    print(f"could not write the products of {file_path}: {exc}")
+                    metrics.count("failed_products")
+            reducible = {collection_name: gdf}
+            if products is not None:
+                reducible[f"{collection_name}-processed"] = products
+            for profile in profiles:
+                for name, full in reducible.items():
+                    profile_collection = f"{name}-{profile.name}"
+                    try:
+                        with metrics.stage(station, "profile"):
+                            reduced = profile.apply(full)
+                            # products have no spectra to encode
+                            reduced = encode_spectra_columns(reduced, spectrum_encoding)
+                        _insert(
+                            sink, profile_collection, reduced, station, metrics, outbox
+                        )
+                    except Exception as exc:
+                        print(f"could not write {profile_collection}: {exc}")
+                        metrics.count("failed_profiles")
+                        continue
+                    profile_collections[profile_collection] = profile
         else:
-            print(f"{f} does not contain any new data")
+            print(f"{file_path} does not contain any new data")
+            metrics.count("files_without_new_data")
 
-        os.remove(file_path)
-        parent = Path(file_path).parent.absolute()
-        files_in_dir = parent.glob("*")
-        # weirdly, this does not work with the extra 'len':
-        if len(list(files_in_dir)) == 0:
-            shutil.rmtree(parent)
+        if archive is not None:
+            _archive(archive, source, file_path, station, metrics)
+        if content_index is not None:
+            content_index.add(content_hashes[file_path], station, source.key(file_path))
+        source.release(file_path)
+        if on_file_done is not None:
+            on_file_done(file_path)
 
-    print("ingestion process finished")
+    latest_times.update(inserted_latest_times)
+
+    if summarizer is not None:
+        summarizer.write(sink, station, metrics)
 
+    try:
+        write_definitions(sink, station, profile_collections, station_geometry, metrics)
+    except Exception as exc:
+        print(f"could not store the profile definitions: {exc}")
+        metrics.count("failed_profile_definitions")
+
+
+def _insert(
+    sink: Sink,
+    collection: str,
+    gdf,
+    station: str,
+    metrics: RunMetrics,
+    outbox: Optional[Outbox] = None,
+) -> bool:
+    """
+    Inserts the rows into the sink, or stores them in the outbox if given.
 
-def _get_latest_time(geodb, raw_collection_name) -> datetime:
-    latest_time_raw_df = geodb.get_collection_pg(
-        collection=raw_collection_name,
-        select="utc_datetime",
-        database="deflox",
-        order="utc_datetime DESC",
-        limit=1,
+    :return: whether the rows have been inserted into the sink
+    """
+    try:
+        with metrics.stage(station, "insert") as insert_metrics:
+            sink.insert(collection, gdf)
+            insert_metrics.files += 1
+            insert_metrics.rows += len(gdf)
+    except Exception as exc:
+        if outbox is None:
+            raise
+        print(f"could not insert into {collection}, storing it in the outbox: {exc}")
+        outbox.put(collection, station, gdf)
+        metrics.count("outboxed_files")
+        return False
+    return True
+
+
+def _summarize(summarizer, station: str, collection: str, gdf) -> None:
+    """Adds rows drained from the outbox to the summaries, if configured."""
+    if summarizer is not None and collection in (f"{station}-raw", f"{station}-raw-f"):
+        summarizer.add(collection, gdf)
+
+
+def _archive(
+    archive,
+    source: Source,
+    file_path: str,
+    station: str,
+    metrics: RunMetrics,
+) -> None:
+    key = source.key(file_path)
+    try:
+        with metrics.stage(station, "archive") as archive_metrics:
+            content_hash = source.content_hash(file_path)
+            if not archive.contains(key, content_hash):
+                archive_metrics.bytes += archive.add(file_path, key, content_hash)
+                archive_metrics.files += 1
+    except Exception as exc:
+        # the archive is a copy, which must not fail the run
+        print(f"could not archive {key}: {exc}")
+        metrics.count("failed_archives")
+
+
+def _read_file(file_path: str, executor: Optional[Executor] = None, quality=None):
+    from deflox.ingestion.flox_data_reader import DataReader
+
+    with open(file_path, "r") as csvfile:
+        return DataReader().read(
+            csvfile.readlines(), executor=executor, quality=quality
+        )
+
+
+def _map_ordered(
+    executor: Executor, fn: Callable, items: List, window: int
+) -> Iterator:
+    """
+    Like `executor.map`, but submits at most `window` items ahead of the
+    consumer, so that the results do not pile up in memory.
+    """
+    futures = deque()
+    items = iter(items)
+    for item in itertools.islice(items, window):
+        futures.append(executor.submit(fn, item))
+    while futures:
+        result = futures.popleft().result()
+        for item in itertools.islice(items, 1):
+            futures.append(executor.submit(fn, item))
+        yield result
+
+
+def _write_run_report(metrics: RunMetrics):
+    """
+    Writes the metrics of the run to the files given by the environment
+    variables RUN_REPORT_JSON, RUN_REPORT_PROM and PROFILE_PARSE, if set.
+    """
+    if os.getenv("RUN_REPORT_JSON"):
+        metrics.write_json(os.environ["RUN_REPORT_JSON"])
+    if os.getenv("RUN_REPORT_PROM"):
+        metrics.write_prometheus(os.environ["RUN_REPORT_PROM"])
+    if os.getenv("PROFILE_PARSE"):
+        metrics.write_profile(os.environ["PROFILE_PARSE"])
+
+
+def _get_sink(sink_type: str) -> Sink:
+    if sink_type == "geodb":
+        return GeoDBSink(_get_geodb_client())
+    if sink_type == "sqlite":
+        sqlite_path = (
+            os.environ["SQLITE_PATH"] if "SQLITE_PATH" in os.environ else "deflox.db"
+        )
+        return SqliteSink(sqlite_path)
+    if sink_type == "memory":
+        return MemorySink()
+    raise ValueError(f"Unknown sink type: {sink_type}")
+
+
+def _get_lease(name: str, temp_data_dir: str) -> Optional[Lease]:
+    """
+    Creates the lease of the given work according to the environment
+    variables LEASE_TYPE (file or sqlite; no lease if not set),
+    LEASE_LOCATION (the lease directory or database, by default the
+    temporary data directory or `leases.db`) and LEASE_TTL (in seconds,
+    default: 600).
+    """
+    lease_type = os.getenv("LEASE_TYPE")
+    if not lease_type:
+        return None
+    default_location = temp_data_dir if lease_type == "file" else "leases.db"
+    return get_lease(
+        name,
+        lease_type,
+        os.getenv("LEASE_LOCATION", default_location),
+        float(os.getenv("LEASE_TTL", "600")),
     )
-    if len(latest_time_raw_df) == 0:
-        return datetime.strptime("1900-01-01", "%Y-%m-%d")
-    latest_time = datetime.strptime(
-        latest_time_raw_df["utc_datetime"][0], "%Y-%m-%dT%H:%M:%S"
+
+
+def _lease_held(lease: Optional[Lease]) -> Optional[Callable[[], bool]]:
+    """Returns a check whether the given lease is still held, if any."""
+    if lease is None:
+        return None
+    return lambda: not lease.lost
+
+
+def _release_lease(lease: Optional[Lease], metrics: RunMetrics) -> None:
+    if lease is None:
+        return
+    lease.release()
+    if lease.lost:
+        metrics.count("lost_leases")
+
+
+def _get_content_index() -> Optional[ContentIndex]:
+    if os.getenv("CONTENT_INDEX"):
+        return ContentIndex(os.environ["CONTENT_INDEX"])
+    return None
+
+
+def _get_summarizer(station: str, outbox: Optional[Outbox] = None):
+    """
+    Creates the summarizer according to SUMMARY_PERIODS and SUMMARY_BANDS.
+    Statistics which cannot be written are kept in the outbox, if given, in
+    a directory of the station, so that only its holder writes them.
+    """
+    if not os.getenv("SUMMARY_PERIODS"):
+        return None
+    from deflox.ingestion.summaries import Summarizer, parse_bands, parse_periods
+
+    return Summarizer(
+        parse_periods(os.environ["SUMMARY_PERIODS"]),
+        parse_bands(os.getenv("SUMMARY_BANDS")),
+        (
+            os.path.join(outbox.root, SUMMARIES_DIR, f"station={station}")
+            if outbox is not None
+            else None
+        ),
+    )
+
+
+def _get_archive():
+    if not os.getenv("ARCHIVE_DIR"):
+        return None
+    from deflox.ingestion.archive import BLOCKS_PER_MEMBER, RawArchive
+
+    return RawArchive(
+        os.environ["ARCHIVE_DIR"],
+        int(os.getenv("ARCHIVE_BLOCKS_PER_MEMBER", str(BLOCKS_PER_MEMBER))),
     )
-    return latest_time
+
+
+def _get_source(temp_data_dir: str, keep_session: bool = False) -> Source:
+    """
+    Creates the source according to SOURCE_TYPE (ftp, local or archive).
+
+    :param keep_session: whether an FTP source keeps its session open
+        between fetches
+    """
+    source_type = os.environ["SOURCE_TYPE"] if "SOURCE_TYPE" in os.environ else "ftp"
+    if source_type == "ftp":
+        return FtpSource(temp_data_dir, keep_session)
+    if source_type == "local":
+        return LocalSource(os.environ["SOURCE_DIR"])
+    if source_type == "archive":
+        return ArchiveSource(os.environ["SOURCE_DIR"], temp_data_dir)
+    raise ValueError(f"Unknown source type: {source_type}")
 
 
 def _get_geodb_client():
+    from xcube_geodb.core.geodb import GeoDBClient
+
     server_url = (
         os.environ["GEODB_SERVER_URL"]
         if "GEODB_SERVER_URL" in os.environ
@@ -143,5 +641,37 @@ def _get_geodb_client():
     return geodb
 
 
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Ingests new data of a single FLoX into the xcube geoDB."
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and poll for new data, instead of running once",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        help="polling interval in seconds, default: POLL_INTERVAL or 300",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=None,
+        help="maximum random deviation from the polling interval in seconds, "
+        "default: POLL_JITTER or 30",
+    )
+    args = parser.parse_args(args)
+
+    if args.daemon:
+        from deflox.ingestion.daemon import IngestionService
+
+        IngestionService(interval=args.interval, jitter=args.jitter).run()
+    else:
+        ingest()
+
+
 if __name__ == "__main__":
-    ingest()
+    main()
@@ -0,0 +1,282 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+def new_owner() -> str:
+    """Returns an identifier of the calling process, unique per call."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Lease(ABC):
+    """
+    An exclusive, expiring claim on a named piece of work, e.g. the
+    ingestion of a station. The holder has to renew the lease before it
+    expires; a lease which has expired can be taken over, so that a crashed
+    holder does not block the work forever.
+
+    :param name: the name of the leased work
+    :param ttl: the number of seconds until the lease expires
+    :param owner: the identifier of the holder; unique by default
+    """
+
+    def __init__(self, name: str, ttl: float = 600, owner: Optional[str] = None):
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner if owner is not None else new_owner()
+        self.lost = False
+        # the expiry set by the last successful claim
+        self._expires = 0.0
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @abstractmethod
+    def _claim(self, now: float, renew: bool) -> bool:
+        """
+        Atomically sets this owner as holder of the lease, with an expiry of
+        `now + ttl`, if the lease is free, expired, or already held by this
+        owner. If `renew` is set, only succeeds if this owner holds the
+        lease.
+
+        :return: whether the lease is held by this owner
+        """
+
+    @abstractmethod
+    def _free(self) -> None:
+        """Atomically frees the lease, if held by this owner."""
+
+    def acquire(self) -> bool:
+        """
+        Tries to acquire the lease, and starts renewing it in the
+        background.
+
+        :return: whether the lease has been acquired
+        """
+        now = time.time()
+        if not self._claim(now, renew=False):
+            return False
+        self._expires = now + self.ttl
+        self.lost = False
+        self._stopped.clear()
+        self._heartbeat = threading.Thread(
+            target=self._renew_periodically, name=f"lease-{self.name}", daemon=True
+        )
+        self._heartbeat.start()
+        return True
+
+    def renew(self) -> bool:
+        """
+        Extends the lease; sets `lost` if it is held by someone else. If
+        the lease cannot be claimed, e.g. because its storage is not
+        available, it counts as held until its last known expiry, and as
+        lost afterwards.
+
+        :return: whether the lease has been renewed
+        """
+        now = time.time()
+        try:
+            claimed = self._claim(now, renew=True)
+        except Exception as exc:
+            if now < self._expires:
+                print(f"WARN: could not renew lease {self.name}, retrying: {exc}")
+                return False
+            print(f"WARN: lease {self.name} has expired, could not renew it: {exc}")
+            self.lost = True
+            return False
+        if claimed:
+            self._expires = now + self.ttl
+        else:
+            print(f"WARN: lease {self.name} has been lost")
+            self.lost = True
+        return not self.lost
+
+    def release(self) -> None:
+        """Stops renewing the lease and frees it."""
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        self._free()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *_) -> None:
+        if self._heartbeat is not None:
+            self.release()
+
+    def _renew_periodically(self) -> None:
+        interval = self.ttl / 3
+        while not self._stopped.wait(interval):
+            if self.renew():
+                interval = self.ttl / 3
+            elif self.lost:
+                break
+            else:
+                # retry sooner, to renew the lease before it expires
+                interval = self.ttl / 10
+
+
+class FileLease(Lease):
+    """
+    A lease stored as JSON file `<directory>/<name>.lease`; for a single
+    host, or a shared file system with working locks. Changes of the lease
+    file are serialised by an advisory lock on `<name>.lease.lock`.
+    """
+
+    def __init__(
+        self, directory: str, name: str, ttl: float = 600, owner: Optional[str] = None
+    ):
+        super().__init__(name, ttl, owner)
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.lease")
+
+    def _claim(self, now: float, renew: bool) -> bool:
+        with self._locked():
+            holder = self._read()
+            if holder is not None and holder["owner"] != self.owner:
+                if renew or holder["expires"] > now:
+                    return False
+            elif holder is None and renew:
+                return False
+            tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"owner": self.owner, "expires": now + self.ttl}, f)
+            os.replace(tmp_path, self.path)
+            return True
+
+    def _free(self) -> None:
+        with self._locked():
+            holder = self._read()
+            if holder is not None and holder["owner"] == self.owner:
+                os.remove(self.path)
+
+    def _read(self) -> Optional[dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # a lease file which has not been written completely is void
+            return None
+
+    def _locked(self):
+        return _FileLock(f"{self.path}.lock")
+
+
+class _FileLock:
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+
+    def __exit__(self, *_):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+class SqliteLease(Lease):
+    """
+    A lease stored as row of the table `leases` in a SQLite database. Serves
+    as example of a database backend: the lease row is checked and updated
+    within a single write transaction.
+    """
+
+    def __init__(
+        self, path: str, name: str, ttl: float = 600, owner: Optional[str] = None
+    ):
+        super().__init__(name, ttl, owner)
+        self.path = path
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS leases "
+                "(name TEXT PRIMARY KEY, owner TEXT, expires REAL)"
+            )
+
+    def _claim(self, now: float, renew: bool) -> bool:
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT owner, expires FROM leases WHERE name = ?", (self.name,)
+            ).fetchone()
+            if row is not None and row[0] != self.owner:
+                if renew or row[1] > now:
+                    connection.rollback()
+                    return False
+            elif row is None and renew:
+                connection.rollback()
+                return False
+            connection.execute(
+                "INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                (self.name, self.owner, now + self.ttl),
+            )
+            connection.commit()
+            return True
+        finally:
+            connection.close()
+
+    def _free(self) -> None:
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "DELETE FROM leases WHERE name = ? AND owner = ?",
+                (self.name, self.owner),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+
+def get_lease(name: str, lease_type: Optional[str], location: str, ttl: float):
+    """
+    Creates a lease of the given type ("file" or "sqlite"), or returns None
+    if no type is given.
+
+    :param location: the directory of file leases, or the database file of
+        SQLite leases
+    """
+    if not lease_type:
+        return None
+    if lease_type == "file":
+        return FileLease(location, name, ttl)
+    if lease_type == "sqlite":
+        return SqliteLease(location, name, ttl)
+    raise ValueError(f"Unknown lease type: {lease_type}")
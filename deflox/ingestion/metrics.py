@@ -0,0 +1,179 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import cProfile
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class StageMetrics:
+    """
+    The metrics of a single stage of the ingestion for a single station.
+    Durations and counters accumulate over all invocations of the stage.
+    """
+
+    COUNTERS = ["bytes", "rows", "files", "retries", "skipped_blocks"]
+
+    def __init__(self):
+        self.duration = 0.0
+        self.calls = 0
+        self.bytes = 0
+        self.rows = 0
+        self.files = 0
+        self.retries = 0
+        self.skipped_blocks = 0
+
+    def to_dict(self) -> Dict:
+        result = {"duration": self.duration, "calls": self.calls}
+        for counter in self.COUNTERS:
+            result[counter] = getattr(self, counter)
+        if self.duration > 0:
+            result["rows_per_second"] = self.rows / self.duration
+            result["bytes_per_second"] = self.bytes / self.duration
+        return result
+
+
+class RunMetrics:
+    """
+    Collects the metrics of an ingestion run, per station and stage, and
+    writes them as a run report.
+
+    :param profile_stages: names of stages to run under cProfile
+    :param on_stage_end: called with station, stage name and metrics each
+        time a stage has been left; can be used for tracing
+    """
+
+    def __init__(
+        self,
+        profile_stages: Tuple[str, ...] = (),
+        on_stage_end: Optional[Callable[[str, str, StageMetrics], None]] = None,
+    ):
+        self.started = datetime.now(timezone.utc)
+        self.stages: Dict[Tuple[str, str], StageMetrics] = {}
+        self.profile_stages = profile_stages
+        self.profiler = cProfile.Profile() if profile_stages else None
+        self.on_stage_end = on_stage_end
+        self.events: Dict[str, int] = {}
+        # station -> file -> line numbers of the skipped blocks
+        self.skipped_blocks: Dict[str, Dict[str, List[int]]] = {}
+
+    def get(self, station: str, stage: str) -> StageMetrics:
+        key = (station, stage)
+        if key not in self.stages:
+            self.stages[key] = StageMetrics()
+        return self.stages[key]
+
+    @contextmanager
+    def stage(self, station: str, stage: str) -> Iterator[StageMetrics]:
+        """
+        Measures the duration of the enclosed block; the yielded metrics
+        can be used to count bytes, rows etc.
+        """
+        metrics = self.get(station, stage)
+        profile = self.profiler is not None and stage in self.profile_stages
+        start = time.perf_counter()
+        if profile:
+            self.profiler.enable()
+        try:
+            yield metrics
+        finally:
+            if profile:
+                self.profiler.disable()
+            metrics.duration += time.perf_counter() - start
+            metrics.calls += 1
+            if self.on_stage_end is not None:
+                self.on_stage_end(station, stage, metrics)
+
+    def count(self, event: str, increment: int = 1) -> None:
+        """
+        Counts run-level events, such as files without new data.
+        """
+        self.events[event] = self.events.get(event, 0) + increment
+
+    def skip_blocks(self, station: str, file: str, line_numbers: List[int]) -> None:
+        """
+        Records the line numbers of the invalid lines of a file, whose blocks
+        have been skipped.
+        """
+        if line_numbers:
+            files = self.skipped_blocks.setdefault(station, {})
+            files.setdefault(file, []).extend(line_numbers)
+
+    def to_dict(self) -> Dict:
+        stations = {}
+        for (station, stage), metrics in self.stages.items():
+            stations.setdefault(station, {})[stage] = metrics.to_dict()
+        return {
+            "started": self.started.isoformat(),
+            "duration": (datetime.now(timezone.utc) - self.started).total_seconds(),
+            "events": dict(self.events),
+            "stations": stations,
+            "skipped_blocks": {
+                station: dict(files) for station, files in self.skipped_blocks.items()
+            },
+        }
+
+    def write_json(self, path: str) -> None:
+        _write_atomically(path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Writes the metrics in the Prometheus text format, to be picked up by
+        the textfile collector of the node exporter.
+        """
+        lines = []
+        measures = [("duration", "seconds", "gauge")] + [
+            (counter, "total", "counter") for counter in StageMetrics.COUNTERS
+        ]
+        for measure, unit, metric_type in measures:
+            name = f"deflox_ingestion_stage_{measure}_{unit}"
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (station, stage), metrics in sorted(self.stages.items()):
+                lines.append(
+                    f'{name}{{station="{station}",stage="{stage}"}} '
+                    f"{getattr(metrics, measure)}"
+                )
+        for event, value in sorted(self.events.items()):
+            name = f"deflox_ingestion_{event}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+        lines.append("# TYPE deflox_ingestion_last_run_timestamp_seconds gauge")
+        lines.append(
+            f"deflox_ingestion_last_run_timestamp_seconds {self.started.timestamp()}"
+        )
+        _write_atomically(path, "\n".join(lines) + "\n")
+
+    def write_profile(self, path: str) -> None:
+        """
+        Writes the collected cProfile statistics, readable with `pstats`.
+        """
+        if self.profiler is not None:
+            self.profiler.dump_stats(path)
+
+
+def _write_atomically(path: str, content: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
@@ -0,0 +1,268 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import uuid
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.sinks import Sink
+
+_TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+# the directory of quarantined files, relative to the root of the outbox
+QUARANTINE_DIR = "_quarantine"
+
+# the directory of summary statistics which could not be written, relative to
+# the root of the outbox; see `deflox.ingestion.summaries.Summarizer`
+SUMMARIES_DIR = "_summaries"
+
+_FAILURES_SUFFIX = ".failures"
+
+
+class Outbox:
+    """
+    Durable local store for parsed data which could not be written into the
+    sink yet. Data is stored as GeoParquet, partitioned by collection,
+    station and day:
+    `<root>/<collection>/station=<station>/day=<YYYY-MM-DD>/<latest time>-<id>.parquet`.
+    Spectra are stored as fixed-size list columns.
+
+    Files which fail to be written repeatedly are moved into
+    `<root>/_quarantine/`, keeping their relative paths. Summary statistics
+    which could not be written are kept in `<root>/_summaries/`.
+
+    :param root: the root directory of the outbox
+    :param max_failures: the number of failed attempts to write a file
+        after which it is quarantined; by default `OUTBOX_MAX_FAILURES`,
+        or 5
+    """
+
+    def __init__(self, root: str, max_failures: Optional[int] = None):
+        self.root = root
+        if max_failures is None:
+            max_failures = int(os.getenv("OUTBOX_MAX_FAILURES", "5"))
+        self.max_failures = max_failures
+
+    def put(self, collection: str, station: str, gdf) -> List[str]:
+        """
+        Stores the given rows, one file per day of `utc_datetime`.
+
+        :return: the paths of the written files
+        """
+        import pandas as pd
+
+        days = pd.to_datetime(gdf["utc_datetime"]).dt.strftime("%Y-%m-%d")
+        paths = []
+        for day in sorted(days.unique()):
+            part = _to_fixed_size_lists(gdf[days == day])
+            latest_time = pd.to_datetime(part["utc_datetime"]).max()
+            directory = os.path.join(
+                self.root, collection, f"station={station}", f"day={day}"
+            )
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(
+                directory,
+                f"{latest_time.strftime(_TIME_FORMAT)}-{uuid.uuid4().hex}.parquet",
+            )
+            # write to a temporary file first, so that an interrupted write
+            # does not leave a partial file behind
+            part.to_parquet(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+            paths.append(path)
+        return paths
+
+    def pending(
+        self, collection: Optional[str] = None, station: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Returns collection names and paths of all stored files, oldest
+        first.
+
+        :param collection: if given, only the files of this collection
+        :param station: if given, only the files stored for this station
+        """
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+        collections = (
+            [collection]
+            if collection
+            else [
+                c
+                for c in sorted(os.listdir(self.root))
+                if c not in (QUARANTINE_DIR, SUMMARIES_DIR)
+            ]
+        )
+        for c in collections:
+            collection_dir = os.path.join(self.root, c)
+            if station is not None:
+                collection_dir = os.path.join(collection_dir, f"station={station}")
+            for directory, _, file_names in os.walk(collection_dir):
+                for file_name in file_names:
+                    if file_name.endswith(".parquet"):
+                        result.append((c, os.path.join(directory, file_name)))
+        return sorted(result, key=lambda entry: os.path.basename(entry[1]))
+
+    def latest_time(
+        self, collection: str, station: Optional[str] = None
+    ) -> Optional[datetime]:
+        """
+        Returns the latest `utc_datetime` stored for the given collection,
+        and station if given, or None if there is no data for it.
+        """
+        times = [
+            datetime.strptime(os.path.basename(path).split("-")[0], _TIME_FORMAT)
+            for _, path in self.pending(collection, station)
+        ]
+        return max(times) if times else None
+
+    def read(self, path: str):
+        import geopandas
+
+        gdf = geopandas.read_parquet(path, to_pandas_kwargs={"ignore_metadata": True})
+        for column in gdf.columns:
+            if len(gdf) > 0 and _is_array(gdf[column].iloc[0]):
+                gdf[column] = [values.tolist() for values in gdf[column]]
+        return gdf
+
+    def drain(
+        self,
+        sink: Sink,
+        station: str,
+        metrics: Optional[RunMetrics] = None,
+        on_drained: Optional[Callable[[str, object], None]] = None,
+    ) -> int:
+        """
+        Writes all files stored for the given station into the sink, oldest
+        first, and deletes each file once it has been written. The files of
+        other stations are left to their own runs, which hold their leases. The collections are drained
+        independently: at the first failure of a collection, its remaining
+        files are left for the next attempt, while the other collections
+        are still drained.
+
+        :param on_drained: called with the collection and the rows of each
+            file once they have been written
+        :return: the number of written rows
+        """
+        metrics = metrics if metrics is not None else RunMetrics()
+        rows = 0
+        failed_collections = set()
+        for collection, path in self.pending(station=station):
+            if collection in failed_collections:
+                continue
+            try:
+                gdf = self.read(path)
+                with metrics.stage(station, "drain") as drain_metrics:
+                    sink.insert(collection, gdf)
+                    drain_metrics.files += 1
+                    drain_metrics.rows += len(gdf)
+            except Exception as exc:
+                print(
+                    f"could not drain {collection} from outbox, retrying later: {exc}"
+                )
+                metrics.count("failed_drains")
+                failed_collections.add(collection)
+                if self._count_failure(path) >= self.max_failures:
+                    print(f"quarantining {path}")
+                    self._quarantine(path)
+                    metrics.count("quarantined_files")
+                continue
+            self._remove(path)
+            rows += len(gdf)
+            if on_drained is not None:
+                on_drained(collection, gdf)
+        return rows
+
+    def quarantined(self) -> List[str]:
+        """
+        Returns the paths of all quarantined files.
+        """
+        result = []
+        for directory, _, file_names in os.walk(
+            os.path.join(self.root, QUARANTINE_DIR)
+        ):
+            for file_name in file_names:
+                if file_name.endswith(".parquet"):
+                    result.append(os.path.join(directory, file_name))
+        return sorted(result)
+
+    def _count_failure(self, path: str) -> int:
+        failures_path = f"{path}{_FAILURES_SUFFIX}"
+        failures = 0
+        if os.path.exists(failures_path):
+            with open(failures_path) as f:
+                failures = int(f.read() or "0")
+        failures += 1
+        with open(f"{failures_path}.tmp", "w") as f:
+            f.write(str(failures))
+        os.replace(f"{failures_path}.tmp", failures_path)
+        return failures
+
+    def _quarantine(self, path: str) -> None:
+        target = os.path.join(
+            self.root, QUARANTINE_DIR, os.path.relpath(path, self.root)
+        )
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        os.replace(f"{path}{_FAILURES_SUFFIX}", f"{target}{_FAILURES_SUFFIX}")
+        _remove_empty_dirs(os.path.dirname(path), self.root)
+
+    def _remove(self, path: str) -> None:
+        os.remove(path)
+        if os.path.exists(f"{path}{_FAILURES_SUFFIX}"):
+            os.remove(f"{path}{_FAILURES_SUFFIX}")
+        _remove_empty_dirs(os.path.dirname(path), self.root)
+
+
+def _to_fixed_size_lists(gdf):
+    import pandas as pd
+    import pyarrow as pa
+
+    gdf = gdf.copy()
+    for column in gdf.columns:
+        if len(gdf) == 0 or not isinstance(gdf[column].iloc[0], list):
+            continue
+        lengths = {len(values) for values in gdf[column]}
+        if len(lengths) != 1:
+            continue
+        value_type = pa.array(gdf[column].iloc[0]).type
+        if pa.types.is_integer(value_type):
+            value_type = pa.int32()
+        elif pa.types.is_null(value_type):
+            value_type = pa.float64()
+        gdf[column] = pd.array(
+            list(gdf[column]),
+            dtype=pd.ArrowDtype(pa.list_(value_type, lengths.pop())),
+        )
+    return gdf
+
+
+def _is_array(value) -> bool:
+    return hasattr(value, "tolist") and getattr(value, "ndim", 0) == 1
+
+
+def _remove_empty_dirs(directory: str, root: str) -> None:
+    root = os.path.abspath(root)
+    directory = os.path.abspath(directory)
+    while directory != root and not os.listdir(directory):
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
@@ -0,0 +1,183 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+Ingest profiles, which write reduced copies of the spectra into collections
+next to the full-resolution collections, e.g. `<station>-raw-fluo`. A
+profile selects ranges of channels, and can bin adjacent channels: the
+digital numbers of the raw spectra are summed, so that they remain
+integers, and the radiometric products are averaged. The definitions of
+the profiles are stored in the collection `<station>-profiles`, with one
+row per reduced collection.
+"""
+
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.sinks import Sink
+from deflox.radiometry import PRODUCTS
+from deflox.spectra import SPECTRUM_COLUMNS
+
+# suffixes of collections which are not available as profile names
+RESERVED_NAMES = {"f", "processed", "hourly", "daily", "profiles"}
+
+_NAME_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+
+
+class Profile:
+    """
+    Selects and bins the channels of spectra.
+
+    :param name: the name of the profile, used as suffix of the collections
+    :param ranges: the first and the last channel (inclusive) of each range
+        of channels to keep
+    :param bin_size: the number of adjacent channels of a range reduced to
+        a single one; the last bin of a range may be smaller
+    """
+
+    def __init__(self, name: str, ranges: List[Tuple[int, int]], bin_size: int = 1):
+        self.name = name
+        self.ranges = ranges
+        self.bin_size = bin_size
+        channels = []
+        bin_firsts = []
+        for first, last in ranges:
+            channels.append(np.arange(first, last + 1))
+            bin_firsts.append(np.arange(first, last + 1, bin_size))
+        # the channels to keep, and the first channel of each bin
+        self.channels = np.concatenate(channels)
+        self.bin_firsts = np.concatenate(bin_firsts)
+        self.bin_sizes = np.concatenate(
+            [
+                np.minimum(bin_size, last + 1 - firsts)
+                for (_, last), firsts in zip(ranges, bin_firsts)
+            ]
+        )
+        # the offsets of the bins into the kept channels
+        self.bin_offsets = np.concatenate(([0], np.cumsum(self.bin_sizes)[:-1]))
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "ranges": [list(r) for r in self.ranges],
+            "bin_size": self.bin_size,
+            "bin_firsts": self.bin_firsts.tolist(),
+            "bin_sizes": self.bin_sizes.tolist(),
+            "reductions": {"spectra": "sum", "products": "mean"},
+        }
+
+    def apply(self, gdf):
+        """
+        Returns a copy of the given GeoDataFrame with its spectra and
+        radiometric products, given as lists, reduced by this profile.
+        """
+        result = gdf.copy()
+        for column in SPECTRUM_COLUMNS:
+            if column in gdf.columns:
+                values = self._select(np.asarray(list(gdf[column]), dtype=np.int64))
+                result[column] = np.add.reduceat(
+                    values, self.bin_offsets, axis=1
+                ).tolist()
+        for column in PRODUCTS:
+            if column in gdf.columns:
+                values = self._select(np.asarray(list(gdf[column]), dtype=np.float64))
+                means = np.add.reduceat(values, self.bin_offsets, axis=1)
+                means /= self.bin_sizes
+                result[column] = [
+                    [None if np.isnan(v) else v for v in row] for row in means.tolist()
+                ]
+        return result
+
+    def _select(self, values: np.ndarray) -> np.ndarray:
+        if values.ndim != 2 or values.shape[1] <= self.channels.max():
+            raise ValueError(
+                f"Profile {self.name} needs {self.channels.max() + 1} channels"
+            )
+        return values[:, self.channels]
+
+
+def parse_profiles(text: Optional[str]) -> List[Profile]:
+    """
+    Parses profile definitions given as "name:first-last[+first-last][/bin],
+    ...", with the first and the last channel of each range (inclusive),
+    and an optional bin size, e.g. "fluo:640-850,coarse:0-1023/8".
+    """
+    profiles = []
+    for definition in (text or "").split(","):
+        if not definition.strip():
+            continue
+        try:
+            name, channels = definition.split(":")
+            channels, _, bin_size = channels.partition("/")
+            ranges = [tuple(int(c) for c in r.split("-")) for r in channels.split("+")]
+            bin_size = int(bin_size) if bin_size else 1
+        except ValueError:
+            raise ValueError(f"Invalid profile definition: {definition}")
+        name = name.strip()
+        # e.g. "f-x" of <station>-raw would collide with "x" of <station>-raw-f
+        if (
+            not _NAME_PATTERN.fullmatch(name)
+            or name in RESERVED_NAMES
+            or name in (p.name for p in profiles)
+        ):
+            raise ValueError(f"Invalid profile name: {name!r}")
+        for r in ranges:
+            if len(r) != 2 or not 0 <= r[0] <= r[1]:
+                raise ValueError(f"Invalid channels of profile {name}: {channels}")
+        if bin_size < 1:
+            raise ValueError(f"Invalid bin size of profile {name}: {bin_size}")
+        profiles.append(Profile(name, ranges, bin_size))
+    return profiles
+
+
+def write_definitions(
+    sink: Sink,
+    station: str,
+    collections: Dict[str, Profile],
+    geometry,
+    metrics: RunMetrics,
+) -> None:
+    """
+    Stores the definitions of the profiles by the collections they have
+    been applied to, in the collection `<station>-profiles`.
+
+    :param geometry: the location of the station
+    """
+    import geopandas
+
+    if not collections:
+        return
+    with metrics.stage(station, "profiles") as profile_metrics:
+        gdf = geopandas.GeoDataFrame(
+            {
+                "collection": list(collections),
+                "profile": [p.name for p in collections.values()],
+                "channels": [len(p.bin_firsts) for p in collections.values()],
+                "definition": [json.dumps(p.to_dict()) for p in collections.values()],
+            },
+            geometry=[geometry] * len(collections),
+            crs="EPSG:4326",
+        )
+        sink.replace_rows(f"{station}-profiles", "collection", gdf)
+        profile_metrics.rows += len(gdf)
@@ -0,0 +1,207 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import argparse
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from deflox.ingestion.ingest import (
+    _get_latest_times,
+    _get_sink,
+    _get_summarizer,
+    _ingest_files,
+    _write_run_report,
+)
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.outbox import Outbox
+from deflox.ingestion.sinks import EARLIEST_TIME, Sink
+from deflox.ingestion.sources import ArchiveSource, LocalSource, Source
+
+
+def replay(
+    source_dir: str,
+    station: str,
+    sink: Sink,
+    first_dir: Optional[str] = None,
+    last_dir: Optional[str] = None,
+    workers: int = 1,
+    metrics: Optional[RunMetrics] = None,
+    archive: bool = False,
+    all_rows: bool = False,
+) -> int:
+    """
+    Ingests the files of a station from a local directory laid out like its
+    FTP server, with the same filtering and collection routing as the
+    regular ingestion. The files are read in parallel, and inserted in the
+    order of their day directories and names.
+
+    :param source_dir: the directory containing the day directories
+    :param station: the name of the station
+    :param sink: the sink to write into
+    :param first_dir: if given, the first day directory (YYMMDD)
+    :param last_dir: if given, the last day directory (YYMMDD)
+    :param workers: the number of processes reading files
+    :param archive: whether the directory is a `RawArchive`
+    :param all_rows: whether to insert all rows, instead of only the rows
+        later than the latest time of their collection; meant for
+        collections which are new or have been cleared, as rows already in
+        a collection are inserted again
+    :return: the number of replayed files
+    """
+    metrics = metrics if metrics is not None else RunMetrics()
+    if archive:
+        with tempfile.TemporaryDirectory() as target_dir:
+            return _replay(
+                ArchiveSource(source_dir, target_dir),
+                station,
+                sink,
+                first_dir,
+                last_dir,
+                workers,
+                metrics,
+                all_rows,
+            )
+    return _replay(
+        LocalSource(source_dir),
+        station,
+        sink,
+        first_dir,
+        last_dir,
+        workers,
+        metrics,
+        all_rows,
+    )
+
+
+def _replay(
+    source: Source,
+    station: str,
+    sink: Sink,
+    first_dir: Optional[str],
+    last_dir: Optional[str],
+    workers: int,
+    metrics: RunMetrics,
+    all_rows: bool,
+) -> int:
+    files = source.fetch(metrics, None, first_dir, last_dir)
+    if not files:
+        return 0
+
+    outbox = Outbox(os.environ["OUTBOX_DIR"]) if os.getenv("OUTBOX_DIR") else None
+    if all_rows:
+        latest_times = {
+            f"{station}-raw": EARLIEST_TIME,
+            f"{station}-raw-f": EARLIEST_TIME,
+        }
+    else:
+        latest_times = {}
+        _get_latest_times(sink, station, metrics, latest_times, outbox)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            _ingest_files(
+                files,
+                sink,
+                source,
+                station,
+                metrics,
+                latest_times,
+                outbox,
+                executor=executor,
+                summarizer=_get_summarizer(station, outbox),
+            )
+    else:
+        _ingest_files(
+            files,
+            sink,
+            source,
+            station,
+            metrics,
+            latest_times,
+            outbox,
+            summarizer=_get_summarizer(station, outbox),
+        )
+    return len(files)
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Ingests the archived data of a single FLoX from a local "
+        "directory into the xcube geoDB."
+    )
+    parser.add_argument(
+        "source_dir", help="directory containing the day directories (YYMMDD)"
+    )
+    parser.add_argument(
+        "--station", default=None, help="name of the station, default: FTP_USER"
+    )
+    parser.add_argument(
+        "--first-day", default=None, help="first day directory, as YYMMDD"
+    )
+    parser.add_argument(
+        "--last-day", default=None, help="last day directory, as YYMMDD"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of processes reading files, default: number of CPUs",
+    )
+    parser.add_argument(
+        "--all-rows",
+        action="store_true",
+        help="insert all rows, not only those later than the latest time of "
+        "their collection; for new or cleared collections only",
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="read the files from an archive written with ARCHIVE_DIR",
+    )
+    args = parser.parse_args(args)
+
+    load_dotenv()
+    station = args.station if args.station else os.environ["FTP_USER"]
+    sink_type = os.environ["SINK_TYPE"] if "SINK_TYPE" in os.environ else "geodb"
+    metrics = RunMetrics(
+        profile_stages=("parse",) if os.getenv("PROFILE_PARSE") else ()
+    )
+    try:
+        file_count = replay(
+            args.source_dir,
+            station,
+            _get_sink(sink_type),
+            args.first_day,
+            args.last_day,
+            args.workers,
+            metrics,
+            args.archive,
+            args.all_rows,
+        )
+    finally:
+        _write_run_report(metrics)
+    print(f"replayed {file_count} file(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+
+EARLIEST_TIME = datetime.strptime("1900-01-01", "%Y-%m-%d")
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class Sink(ABC):
+    """
+    The target of the ingestion process. A sink stores GeoDataFrames in named
+    collections and knows the latest time stored in each of them.
+    """
+
+    @abstractmethod
+    def get_latest_time(self, collection: str) -> datetime:
+        """
+        Returns the latest `utc_datetime` stored in the given collection, or
+        `EARLIEST_TIME` if the collection is empty.
+        """
+
+    @abstractmethod
+    def insert(self, collection: str, gdf) -> None:
+        """
+        Inserts the rows of the given GeoDataFrame into the given collection.
+        """
+
+    def get_rows(self, collection: str, column: str, values: List):
+        """
+        Returns the rows of the given collection whose `column` has one of
+        the given values, as DataFrame. Used for updating derived
+        collections; not all sinks need to support it.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot query rows")
+
+    def get_time_range(self, collection: str, start: datetime, end: datetime):
+        """
+        Returns the rows of the given collection with a `utc_datetime` from
+        `start` (inclusive) to `end` (exclusive), ordered by time, as
+        DataFrame. Used for reading collections back; not all sinks need to
+        support it.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot query time ranges")
+
+    def replace_rows(self, collection: str, column: str, gdf) -> None:
+        """
+        Replaces the rows of the given collection whose `column` has one of
+        the values of that column in the given GeoDataFrame by its rows.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot replace rows")
+
+
+class GeoDBSink(Sink):
+    """
+    Writes into the xcube geoDB; this is what is used in production.
+    """
+
+    def __init__(self, geodb, database: str = "deflox"):
+        self.geodb = geodb
+        self.database = database
+
+    def get_latest_time(self, collection: str) -> datetime:
+        latest_time_df = self.geodb.get_collection_pg(
+            collection=collection,
+            select="utc_datetime",
+            database=self.database,
+            order="utc_datetime DESC",
+            limit=1,
+        )
+        if len(latest_time_df) == 0:
+            return EARLIEST_TIME
+        return datetime.strptime(latest_time_df["utc_datetime"][0], "%Y-%m-%dT%H:%M:%S")
+
+    def insert(self, collection: str, gdf) -> None:
+        self.geodb.insert_into_collection(collection, gdf, database=self.database)
+
+    def get_rows(self, collection: str, column: str, values: List):
+        in_list = ", ".join(_sql_literal(v) for v in values)
+        return self.geodb.get_collection_pg(
+            collection=collection,
+            where=f"{column} IN ({in_list})",
+            database=self.database,
+        )
+
+    def get_time_range(self, collection: str, start: datetime, end: datetime):
+        return self.geodb.get_collection_pg(
+            collection=collection,
+            where=f"utc_datetime >= '{start:{_TIME_FORMAT}}' "
+            f"AND utc_datetime < '{end:{_TIME_FORMAT}}'",
+            order="utc_datetime",
+            database=self.database,
+        )
+
+    def replace_rows(self, collection: str, column: str, gdf) -> None:
+        # not atomic: if the insert fails, the rows are deleted already
+        in_list = ",".join(_postgrest_literal(v) for v in gdf[column])
+        self.geodb.delete_from_collection(
+            collection, query=f"{column}=in.({in_list})", database=self.database
+        )
+        self.insert(collection, gdf)
+
+
+def _sql_literal(value) -> str:
+    escaped = str(value).replace("'", "''")
+    return f"'{escaped}'"
+
+
+def _postgrest_literal(value) -> str:
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+class MemorySink(Sink):
+    """
+    Records all inserted GeoDataFrames in memory. Useful for tests and
+    benchmarks that shall not depend on a database.
+    """
+
+    def __init__(self):
+        self.inserted: Dict[str, List] = {}
+
+    def get_latest_time(self, collection: str) -> datetime:
+        latest_time = EARLIEST_TIME
+        for gdf in self.inserted.get(collection, []):
+            if len(gdf) > 0:
+                latest_time = max(latest_time, _parse_time(gdf["utc_datetime"].max()))
+        return latest_time
+
+    def insert(self, collection: str, gdf) -> None:
+        self.inserted.setdefault(collection, []).append(gdf.copy())
+
+    def get_rows(self, collection: str, column: str, values: List):
+        import pandas as pd
+
+        gdfs = [
+            gdf[gdf[column].isin(values)] for gdf in self.inserted.get(collection, [])
+        ]
+        if not gdfs:
+            return pd.DataFrame()
+        return pd.concat(gdfs, ignore_index=True)
+
+    def get_time_range(self, collection: str, start: datetime, end: datetime):
+        import pandas as pd
+
+        gdfs = []
+        for gdf in self.inserted.get(collection, []):
+            times = pd.to_datetime(gdf["utc_datetime"], format="ISO8601")
+            gdfs.append(gdf[(times >= start) & (times < end)])
+        if not gdfs:
+            return pd.DataFrame()
+        df = pd.concat(gdfs, ignore_index=True)
+        order = pd.to_datetime(df["utc_datetime"], format="ISO8601").argsort(
+            kind="stable"
+        )
+        return df.iloc[order].reset_index(drop=True)
+
+    def replace_rows(self, collection: str, column: str, gdf) -> None:
+        self.inserted[collection] = [
+            old_gdf[~old_gdf[column].isin(gdf[column])]
+            for old_gdf in self.inserted.get(collection, [])
+        ]
+        self.insert(collection, gdf)
+
+    def row_count(self, collection: Optional[str] = None) -> int:
+        collections = [collection] if collection else list(self.inserted)
+        return sum(len(gdf) for c in collections for gdf in self.inserted.get(c, []))
+
+
+class SqliteSink(Sink):
+    """
+    Writes into a local SQLite database, one table per collection. Geometries
+    are stored as WKT, spectra as JSON arrays.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+    def get_latest_time(self, collection: str) -> datetime:
+        if not self._has_table(collection):
+            return EARLIEST_TIME
+        (latest_time,) = self.connection.execute(
+            f'SELECT MAX(utc_datetime) FROM "{collection}"'
+        ).fetchone()
+        if latest_time is None:
+            return EARLIEST_TIME
+        return _parse_time(latest_time)
+
+    def insert(self, collection: str, gdf) -> None:
+        self._insert(collection, gdf)
+        self.connection.commit()
+
+    def get_rows(self, collection: str, column: str, values: List):
+        import pandas as pd
+
+        if not self._has_table(collection):
+            return pd.DataFrame()
+        placeholders = ", ".join("?" for _ in values)
+        return self._read(
+            f'SELECT * FROM "{collection}" WHERE "{column}" IN ({placeholders})',
+            list(values),
+        )
+
+    def get_time_range(self, collection: str, start: datetime, end: datetime):
+        import pandas as pd
+
+        if not self._has_table(collection):
+            return pd.DataFrame()
+        return self._read(
+            f'SELECT * FROM "{collection}" WHERE utc_datetime >= ? '
+            "AND utc_datetime < ? ORDER BY utc_datetime",
+            [f"{start:{_TIME_FORMAT}}", f"{end:{_TIME_FORMAT}}"],
+        )
+
+    def _read(self, sql: str, params: List):
+        import pandas as pd
+
+        df = pd.read_sql(sql, self.connection, params=params)
+        for c in df.columns:
+            if len(df) > 0 and isinstance(df[c].iloc[0], str):
+                if df[c].iloc[0].startswith("["):
+                    df[c] = [json.loads(v) for v in df[c]]
+        return df
+
+    def replace_rows(self, collection: str, column: str, gdf) -> None:
+        values = list(gdf[column])
+        placeholders = ", ".join("?" for _ in values)
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            if self._has_table(collection):
+                self.connection.execute(
+                    f'DELETE FROM "{collection}" WHERE "{column}" IN ({placeholders})',
+                    values,
+                )
+            self._insert(collection, gdf, begin=False)
+        except Exception:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+
+    def _insert(self, collection: str, gdf, begin: bool = True) -> None:
+        import pandas as pd
+
+        df = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+        df["geometry"] = gdf.geometry.to_wkt()
+        for column in df.columns:
+            if df[column].dtype == object and len(df) > 0:
+                if isinstance(df[column].iloc[0], list):
+                    df[column] = [json.dumps(v) for v in df[column]]
+        if begin:
+            # take the write lock first, so that processes sharing the
+            # database do not race for creating the table
+            self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            df.to_sql(collection, self.connection, if_exists="append", index=False)
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def row_count(self, collection: str) -> int:
+        if not self._has_table(collection):
+            return 0
+        (count,) = self.connection.execute(
+            f'SELECT COUNT(*) FROM "{collection}"'
+        ).fetchone()
+        return count
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _has_table(self, collection: str) -> bool:
+        return (
+            self.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                (collection,),
+            ).fetchone()
+            is not None
+        )
+
+
+def _parse_time(value) -> datetime:
+    return datetime.fromisoformat(str(value))
@@ -0,0 +1,274 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import datetime
+import gzip
+import os
+import re
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Collection, List, Optional
+
+from deflox.ingestion.content_index import hash_file
+from deflox.ingestion.data_fetcher import (
+    DataFetcher,
+    disconnect,
+    is_processed_product,
+)
+from deflox.ingestion.metrics import RunMetrics
+
+
+class Source(ABC):
+    """
+    Where the raw files of a station come from. The files are organised in
+    day directories, as `<YYMMDD>/<file>.CSV`.
+    """
+
+    @abstractmethod
+    def fetch(
+        self,
+        metrics: RunMetrics,
+        max_days: Optional[int] = None,
+        first_dir: Optional[str] = None,
+        last_dir: Optional[str] = None,
+        exclude: Collection[str] = (),
+    ) -> List[str]:
+        """
+        Makes the CSV files of the station available locally.
+
+        :param max_days: the maximum age of the files in days; if None, the
+            age is not checked
+        :param first_dir: if given, the first day directory (YYMMDD)
+        :param last_dir: if given, the last day directory (YYMMDD)
+        :param exclude: files to leave out, given as `<YYMMDD>/<file name>`
+        :return: the paths of the local files
+        """
+
+    @abstractmethod
+    def release(self, file_path: str) -> None:
+        """
+        Called once the given file has been ingested.
+        """
+
+    def content_hash(self, file_path: str) -> str:
+        """
+        Returns the content hash of the given fetched file.
+        """
+        return hash_file(file_path)
+
+    @staticmethod
+    def key(file_path: str) -> str:
+        """
+        Returns the given file as `<YYMMDD>/<file name>`.
+        """
+        return "/".join(Path(file_path).parts[-2:])
+
+
+class FtpSource(Source):
+    """
+    Downloads the files from the FTP server of the station, into a temporary
+    directory; this is what is used in production.
+
+    :param keep_session: whether to keep the FTP session open between
+        fetches, e.g. in service mode, instead of connecting and logging in
+        for each fetch. A session which fails is closed, and the next fetch
+        opens a new one.
+    """
+
+    def __init__(self, target_dir: str, keep_session: bool = False):
+        self.target_dir = target_dir
+        self.keep_session = keep_session
+        self.ftp = None
+        self.file_hashes = {}
+
+    def fetch(
+        self,
+        metrics: RunMetrics,
+        max_days: Optional[int] = None,
+        first_dir: Optional[str] = None,
+        last_dir: Optional[str] = None,
+        exclude: Collection[str] = (),
+    ) -> List[str]:
+        data_fetcher = DataFetcher(
+            self.target_dir, metrics, self._session(), self.keep_session
+        )
+        try:
+            data_fetcher.fetch_data(max_days, first_dir, last_dir, exclude)
+        except Exception:
+            disconnect(data_fetcher.ftp)
+            self.ftp = None
+            raise
+        self.ftp = data_fetcher.ftp
+        self.file_hashes.update(data_fetcher.file_hashes)
+        return data_fetcher.downloaded_files
+
+    def close(self) -> None:
+        """Closes the kept FTP session, if any."""
+        disconnect(self.ftp)
+        self.ftp = None
+
+    def _session(self):
+        if self.ftp is not None:
+            try:
+                self.ftp.voidcmd("NOOP")
+            except Exception:
+                # e.g. closed by the server after being idle
+                self.close()
+        return self.ftp
+
+    def content_hash(self, file_path: str) -> str:
+        # the hash is computed while downloading
+        if file_path in self.file_hashes:
+            return self.file_hashes[file_path]
+        return super().content_hash(file_path)
+
+    def release(self, file_path: str) -> None:
+        self.file_hashes.pop(file_path, None)
+        _remove_file(file_path)
+
+
+class LocalSource(Source):
+    """
+    Reads the files from a local directory laid out like the FTP server of
+    a station, e.g. an archive. The files are left in place.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def fetch(
+        self,
+        metrics: RunMetrics,
+        max_days: Optional[int] = None,
+        first_dir: Optional[str] = None,
+        last_dir: Optional[str] = None,
+        exclude: Collection[str] = (),
+    ) -> List[str]:
+        exclude = set(exclude)
+        station = os.getenv("FTP_USER")
+        skip_processed = bool(os.getenv("SKIP_PROCESSED_PRODUCTS"))
+        earliest_time = (
+            (datetime.datetime.today() - datetime.timedelta(days=max_days)).timestamp()
+            if max_days is not None
+            else None
+        )
+        files = []
+        with metrics.stage(station, "list"):
+            for data_dir in sorted(os.listdir(self.root)):
+                if not re.search("^\\d\\d\\d\\d\\d\\d$", data_dir):
+                    continue
+                if first_dir is not None and data_dir < first_dir:
+                    continue
+                if last_dir is not None and data_dir > last_dir:
+                    continue
+                for entry in sorted(os.listdir(os.path.join(self.root, data_dir))):
+                    name = self._file_name(entry)
+                    if name is None or not name.lower().endswith(".csv"):
+                        continue
+                    if name.lower() == "log.csv":
+                        continue
+                    if f"{data_dir}/{name}" in exclude:
+                        continue
+                    if skip_processed and is_processed_product(name):
+                        continue
+                    file_path = os.path.join(self.root, data_dir, entry)
+                    if (
+                        earliest_time is not None
+                        and os.path.getmtime(file_path) <= earliest_time
+                    ):
+                        continue
+                    files.append(file_path)
+        return files
+
+    def release(self, file_path: str) -> None:
+        pass
+
+    def _file_name(self, entry: str) -> Optional[str]:
+        """
+        Returns the name of the station file stored as the given directory
+        entry, or None if the entry is no station file.
+        """
+        return entry
+
+
+class ArchiveSource(LocalSource):
+    """
+    Reads the files from a `deflox.ingestion.archive.RawArchive`. The files
+    are decompressed into a temporary directory.
+    """
+
+    def __init__(self, root: str, target_dir: str):
+        super().__init__(root)
+        self.target_dir = target_dir
+        self.file_hashes = {}
+
+    def fetch(
+        self,
+        metrics: RunMetrics,
+        max_days: Optional[int] = None,
+        first_dir: Optional[str] = None,
+        last_dir: Optional[str] = None,
+        exclude: Collection[str] = (),
+    ) -> List[str]:
+        from deflox.ingestion.archive import RawArchive
+
+        archive = RawArchive(self.root)
+        archived_files = super().fetch(metrics, max_days, first_dir, last_dir, exclude)
+        files = []
+        with metrics.stage(os.getenv("FTP_USER"), "extract") as extract_metrics:
+            for archived_file in archived_files:
+                key = self.key(archived_file)[: -len(".gz")]
+                file_path = os.path.join(self.target_dir, *key.split("/"))
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with gzip.open(archived_file) as src, open(file_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                mtime = os.path.getmtime(archived_file)
+                os.utime(file_path, (mtime, mtime))
+                self.file_hashes[file_path] = archive.index(key)["sha256"]
+                extract_metrics.files += 1
+                extract_metrics.bytes += os.path.getsize(archived_file)
+                files.append(file_path)
+        return files
+
+    def content_hash(self, file_path: str) -> str:
+        # the hash is stored in the index of the archive
+        if file_path in self.file_hashes:
+            return self.file_hashes[file_path]
+        return super().content_hash(file_path)
+
+    def release(self, file_path: str) -> None:
+        self.file_hashes.pop(file_path, None)
+        _remove_file(file_path)
+
+    def _file_name(self, entry: str) -> Optional[str]:
+        return entry[: -len(".gz")] if entry.endswith(".gz") else None
+
+
+def _remove_file(file_path: str) -> None:
+    """
+    Removes the given file, and its directory if it is empty then.
+    """
+    os.remove(file_path)
+    parent = Path(file_path).parent.absolute()
+    files_in_dir = parent.glob("*")
+    # weirdly, this does not work with the extra 'len':
+    if len(list(files_in_dir)) == 0:
+        shutil.rmtree(parent)
@@ -0,0 +1,349 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+Hourly and daily statistics of the spectra, written into summary
+collections next to the raw collections, e.g. `<station>-raw-hourly`. For
+each period, a summary row holds the number of measurements, the mean,
+minimum and maximum of each channel, and the mean integrals of configurable
+bands of channels.
+
+Statistics which cannot be written are kept as JSON files in a pending
+directory, and merged into the summary collections by a later run.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.sinks import Sink
+from deflox.spectra import decode_spectra
+
+# period name -> pandas frequency
+PERIODS = {"hourly": "h", "daily": "D"}
+
+SUMMARY_SPECTRA = ["wr", "veg", "wr2"]
+
+# band name -> first channel, last channel + 1
+DEFAULT_BANDS = {"total": (0, 1024)}
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_periods(text: Optional[str]) -> List[str]:
+    """
+    Parses a comma-separated list of periods, e.g. "hourly,daily".
+    """
+    periods = [p.strip() for p in (text or "").split(",") if p.strip()]
+    for period in periods:
+        if period not in PERIODS:
+            raise ValueError(f"Unknown summary period: {period}")
+    return periods
+
+
+def parse_bands(text: Optional[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    Parses band definitions given as "name:first-last,...", with the first
+    and the last channel of each band (inclusive), e.g. "red:620-700".
+    """
+    if not text:
+        return dict(DEFAULT_BANDS)
+    bands = {}
+    for band in text.split(","):
+        try:
+            name, channels = band.split(":")
+            first, last = (int(c) for c in channels.split("-"))
+        except ValueError:
+            raise ValueError(f"Invalid band definition: {band}")
+        if not 0 <= first <= last < 1024:
+            raise ValueError(f"Invalid channels of band {name}: {channels}")
+        bands[name.strip()] = (first, last + 1)
+    return bands
+
+
+class _Period:
+    """The running statistics of a single period."""
+
+    def __init__(self):
+        self.count = 0
+        self.lat_sum = 0.0
+        self.lon_sum = 0.0
+        self.sums: Dict[str, np.ndarray] = {}
+        self.mins: Dict[str, np.ndarray] = {}
+        self.maxs: Dict[str, np.ndarray] = {}
+        self.band_sums: Dict[str, float] = {}
+
+    def merge(self, other: "_Period") -> None:
+        self.count += other.count
+        self.lat_sum += other.lat_sum
+        self.lon_sum += other.lon_sum
+        for name, values in other.sums.items():
+            if name in self.sums:
+                self.sums[name] = self.sums[name] + values
+                self.mins[name] = np.minimum(self.mins[name], other.mins[name])
+                self.maxs[name] = np.maximum(self.maxs[name], other.maxs[name])
+            else:
+                self.sums[name] = values
+                self.mins[name] = other.mins[name]
+                self.maxs[name] = other.maxs[name]
+        for name, value in other.band_sums.items():
+            self.band_sums[name] = self.band_sums.get(name, 0.0) + value
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "lat_sum": self.lat_sum,
+            "lon_sum": self.lon_sum,
+            "sums": {name: values.tolist() for name, values in self.sums.items()},
+            "mins": {name: values.tolist() for name, values in self.mins.items()},
+            "maxs": {name: values.tolist() for name, values in self.maxs.items()},
+            "band_sums": dict(self.band_sums),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "_Period":
+        statistics = cls()
+        statistics.count = d["count"]
+        statistics.lat_sum = d["lat_sum"]
+        statistics.lon_sum = d["lon_sum"]
+        for name, values in d["sums"].items():
+            statistics.sums[name] = np.asarray(values, dtype=np.float64)
+            statistics.mins[name] = np.asarray(d["mins"][name], dtype=np.int64)
+            statistics.maxs[name] = np.asarray(d["maxs"][name], dtype=np.int64)
+        statistics.band_sums = dict(d["band_sums"])
+        return statistics
+
+
+class Summarizer:
+    """
+    Collects the statistics of the rows ingested during a run, and merges
+    them into the summary collections at the end of the run.
+
+    :param periods: the periods to summarize, e.g. ["hourly", "daily"]
+    :param bands: the bands to integrate, see `parse_bands`
+    :param pending_dir: if given, the statistics which cannot be written
+        are stored in this directory, and loaded again by the next
+        `Summarizer` using it
+    """
+
+    def __init__(
+        self,
+        periods: List[str],
+        bands: Optional[Dict[str, Tuple[int, int]]] = None,
+        pending_dir: Optional[str] = None,
+    ):
+        self.periods = periods
+        self.bands = bands if bands is not None else dict(DEFAULT_BANDS)
+        self.pending_dir = pending_dir
+        # summary collection -> period start -> statistics
+        self.summaries: Dict[str, Dict[str, _Period]] = {}
+        # summary collection -> period starts whose statistics already
+        # include the rows of the sink, e.g. after a failed replace
+        self.merged: Dict[str, Set[str]] = {}
+        if pending_dir is not None and os.path.isdir(pending_dir):
+            for file_name in sorted(os.listdir(pending_dir)):
+                if file_name.endswith(".json"):
+                    collection = file_name[: -len(".json")]
+                    with open(os.path.join(pending_dir, file_name)) as f:
+                        pending = json.load(f)
+                    self.summaries[collection] = {
+                        period_start: _Period.from_dict(d)
+                        for period_start, d in pending["periods"].items()
+                    }
+                    self.merged[collection] = set(pending["merged"])
+
+    def add(self, collection: str, gdf) -> None:
+        """
+        Adds the rows of a GeoDataFrame of the given raw collection, with
+        spectra given as lists or encoded by `deflox.spectra`.
+        """
+        import pandas as pd
+
+        if len(gdf) == 0:
+            return
+        times = pd.to_datetime(gdf["utc_datetime"])
+        spectra = {
+            name: _to_array(gdf[name].tolist())
+            for name in SUMMARY_SPECTRA
+            if name in gdf.columns
+        }
+        lats = gdf["GPS_lat"].to_numpy(dtype=np.float64)
+        lons = gdf["GPS_lon"].to_numpy(dtype=np.float64)
+
+        for period in self.periods:
+            starts = times.dt.floor(PERIODS[period]).to_numpy()
+            order = np.argsort(starts, kind="stable")
+            keys, first_indices, counts = np.unique(
+                starts[order], return_index=True, return_counts=True
+            )
+            lat_sums = np.add.reduceat(lats[order], first_indices)
+            lon_sums = np.add.reduceat(lons[order], first_indices)
+            sums, mins, maxs, band_sums = {}, {}, {}, {}
+            for name, values in spectra.items():
+                values = values[order]
+                sums[name] = np.add.reduceat(values, first_indices, axis=0)
+                mins[name] = np.minimum.reduceat(values, first_indices, axis=0)
+                maxs[name] = np.maximum.reduceat(values, first_indices, axis=0)
+                for band, (first, last) in self.bands.items():
+                    band_sums[f"{name}_{band}"] = np.add.reduceat(
+                        values[:, first:last].sum(axis=1), first_indices
+                    )
+
+            summaries = self.summaries.setdefault(f"{collection}-{period}", {})
+            for i, key in enumerate(keys):
+                statistics = _Period()
+                statistics.count = int(counts[i])
+                statistics.lat_sum = float(lat_sums[i])
+                statistics.lon_sum = float(lon_sums[i])
+                for name in spectra:
+                    statistics.sums[name] = sums[name][i].astype(np.float64)
+                    statistics.mins[name] = mins[name][i]
+                    statistics.maxs[name] = maxs[name][i]
+                for name, values in band_sums.items():
+                    statistics.band_sums[name] = float(values[i])
+                period_start = pd.Timestamp(key).strftime(_TIME_FORMAT)
+                summaries.setdefault(period_start, _Period()).merge(statistics)
+
+    def write(self, sink: Sink, station: str, metrics: RunMetrics) -> None:
+        """
+        Merges the collected statistics with the summary rows in the sink,
+        and replaces these rows. The statistics of a collection which cannot
+        be written are kept for the next call, and stored in the pending
+        directory.
+        """
+        import pandas as pd
+
+        for collection in list(self.summaries):
+            summaries = self.summaries[collection]
+            already_merged = self.merged.setdefault(collection, set())
+            try:
+                with metrics.stage(station, "summary") as summary_metrics:
+                    merged = dict(summaries)
+                    period_starts = [p for p in summaries if p not in already_merged]
+                    if period_starts:
+                        existing = sink.get_rows(
+                            collection, "period_start", period_starts
+                        )
+                        for _, row in existing.iterrows():
+                            # e.g. the geoDB returns "YYYY-MM-DDTHH:MM:SS"
+                            period_start = pd.Timestamp(row["period_start"]).strftime(
+                                _TIME_FORMAT
+                            )
+                            statistics = _from_row(row)
+                            statistics.merge(summaries[period_start])
+                            merged[period_start] = statistics
+                    # replace_rows is not atomic: if it fails, the sink rows
+                    # may be deleted already, so the merged statistics are kept
+                    self.summaries[collection] = merged
+                    already_merged.update(merged)
+                    if merged:
+                        sink.replace_rows(collection, "period_start", _to_gdf(merged))
+                    summary_metrics.rows += len(merged)
+            except Exception as exc:
+                # the summaries are derived data, which must not fail the run
+                print(f"could not update {collection}, retrying later: {exc}")
+                metrics.count("failed_summaries")
+                self._store(collection)
+                continue
+            del self.summaries[collection]
+            del self.merged[collection]
+            self._remove(collection)
+
+    def _path(self, collection: str) -> str:
+        return os.path.join(self.pending_dir, f"{collection}.json")
+
+    def _store(self, collection: str) -> None:
+        if self.pending_dir is None:
+            return
+        os.makedirs(self.pending_dir, exist_ok=True)
+        path = self._path(collection)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(
+                {
+                    "merged": sorted(self.merged.get(collection, ())),
+                    "periods": {
+                        period_start: statistics.to_dict()
+                        for period_start, statistics in self.summaries[
+                            collection
+                        ].items()
+                    },
+                },
+                f,
+            )
+        os.replace(f"{path}.tmp", path)
+
+    def _remove(self, collection: str) -> None:
+        if self.pending_dir is not None and os.path.exists(self._path(collection)):
+            os.remove(self._path(collection))
+
+
+def _to_array(values: List) -> np.ndarray:
+    if values and isinstance(values[0], str):
+        return decode_spectra(values).astype(np.int64)
+    return np.asarray(values, dtype=np.int64)
+
+
+def _from_row(row) -> _Period:
+    statistics = _Period()
+    statistics.count = int(row["count"])
+    statistics.lat_sum = float(row["GPS_lat"]) * statistics.count
+    statistics.lon_sum = float(row["GPS_lon"]) * statistics.count
+    for name in SUMMARY_SPECTRA:
+        if f"{name}_mean" not in row:
+            continue
+        statistics.sums[name] = np.asarray(row[f"{name}_mean"]) * statistics.count
+        statistics.mins[name] = np.asarray(row[f"{name}_min"], dtype=np.int64)
+        statistics.maxs[name] = np.asarray(row[f"{name}_max"], dtype=np.int64)
+    for column in row.index:
+        if column.startswith(tuple(f"{n}_" for n in SUMMARY_SPECTRA)) and not (
+            column.endswith(("_mean", "_min", "_max"))
+        ):
+            statistics.band_sums[column] = float(row[column]) * statistics.count
+    return statistics
+
+
+def _to_gdf(summaries: Dict[str, _Period]):
+    import geopandas
+
+    rows = []
+    for period_start, statistics in sorted(summaries.items()):
+        count = statistics.count
+        row = {
+            "period_start": period_start,
+            "count": count,
+            "GPS_lat": statistics.lat_sum / count,
+            "GPS_lon": statistics.lon_sum / count,
+        }
+        for name in statistics.sums:
+            row[f"{name}_mean"] = (statistics.sums[name] / count).tolist()
+            row[f"{name}_min"] = statistics.mins[name].tolist()
+            row[f"{name}_max"] = statistics.maxs[name].tolist()
+        for name, value in statistics.band_sums.items():
+            row[name] = value / count
+        rows.append(row)
+    gdf = geopandas.GeoDataFrame(rows)
+    return geopandas.GeoDataFrame(
+        gdf,
+        geometry=geopandas.points_from_xy(gdf.GPS_lon, gdf.GPS_lat),
+        crs="EPSG:4326",
+    )
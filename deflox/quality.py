@@ -0,0 +1,164 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+Quality control of FLoX measurements. Each block of measurements gets a
+bitmask of flags, see FLAGS, computed for whole arrays of blocks at once:
+
+- the spectra are parsed into a buffer anyway, so the number of saturated
+  channels and the mean dark current of each block are counted there, see
+  `count_spectra`
+- the flags are then derived from these counters and the meta data
+  columns, see `compute_flags`
+"""
+
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+SATURATED = 1
+DARK_CURRENT = 2
+MULTICAL = 4
+TEMPERATURE = 8
+VOLTAGE = 16
+
+FLAGS = {
+    "saturated": SATURATED,
+    "dark_current": DARK_CURRENT,
+    "multical": MULTICAL,
+    "temperature": TEMPERATURE,
+    "voltage": VOLTAGE,
+}
+
+# the columns added to raw data by the quality control
+QC_COLUMNS = ["qc_saturated", "qc_dc_wr", "qc_dc_veg", "qc_flags"]
+
+
+class QualityLimits:
+    """
+    The limits outside which a block of measurements is flagged.
+
+    :param saturation: the digital number from which on a channel of the
+        spectrometer is saturated
+    :param dark_current: the range of the mean dark current of a block
+    :param temperature: the range of the mainboard temperature, in °C
+    :param voltage: the range of the supply voltage, in V
+    """
+
+    def __init__(
+        self,
+        saturation: int = 200000,
+        dark_current: Tuple[float, float] = (500.0, 5000.0),
+        temperature: Tuple[float, float] = (-20.0, 60.0),
+        voltage: Tuple[float, float] = (11.0, 15.0),
+    ):
+        self.saturation = saturation
+        self.dark_current = dark_current
+        self.temperature = temperature
+        self.voltage = voltage
+
+    @classmethod
+    def from_env(cls) -> Optional["QualityLimits"]:
+        """
+        Returns the limits configured by environment variables, or None if
+        the quality control is not enabled by `QC_FLAGS`.
+        """
+        if not os.getenv("QC_FLAGS"):
+            return None
+        limits = cls()
+        if os.getenv("QC_SATURATION"):
+            limits.saturation = int(os.environ["QC_SATURATION"])
+        for name in ["dark_current", "temperature", "voltage"]:
+            text = os.getenv(f"QC_{name.upper()}")
+            if text:
+                setattr(limits, name, parse_range(text))
+        return limits
+
+
+def parse_range(text: str) -> Tuple[float, float]:
+    """
+    Parses a range "min:max", e.g. "11:15".
+    """
+    try:
+        low, high = (float(v) for v in text.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid range {text!r}, expected 'min:max'")
+    if low > high:
+        raise ValueError(f"Invalid range {text!r}, min must not exceed max")
+    return low, high
+
+
+def count_spectra(spectra: np.ndarray, saturation: int) -> Dict[str, np.ndarray]:
+    """
+    Counts the saturated channels and the mean dark currents of blocks of
+    measurements.
+
+    :param spectra: the spectra wr, veg, wr2, DC_WR and DC_VEG of the
+        blocks, as array of shape (5, blocks, channels)
+    :return: the counters by column name, each with one value per block
+    """
+    return {
+        "qc_saturated": (spectra[:3] >= saturation).sum(axis=(0, 2)),
+        "qc_dc_wr": spectra[3].mean(axis=1),
+        "qc_dc_veg": spectra[4].mean(axis=1),
+    }
+
+
+def compute_flags(df, limits: QualityLimits) -> np.ndarray:
+    """
+    Computes the flags of all blocks of measurements of a DataFrame with
+    the counters of `count_spectra`, as array of bitmasks.
+    """
+    flags = np.zeros(len(df), dtype=np.uint8)
+    flags[np.asarray(df["qc_saturated"]) > 0] |= SATURATED
+    low, high = limits.dark_current
+    for column in ["qc_dc_wr", "qc_dc_veg"]:
+        flags[_outside(df[column], low, high)] |= DARK_CURRENT
+    flags[np.asarray(df["MultiCal"]) != 0] |= MULTICAL
+    flags[_outside(df["mainboard_temp[C]"], *limits.temperature)] |= TEMPERATURE
+    flags[_outside(df["voltage"], *limits.voltage)] |= VOLTAGE
+    return flags
+
+
+def report(gdf) -> Dict:
+    """
+    Summarizes the quality control of the blocks of measurements of a
+    GeoDataFrame, as read by `DataReader` with quality limits.
+
+    :return: the number of blocks, the number of blocks per flag, and the
+        line numbers of the invalid lines whose blocks have been skipped
+    """
+    flags = np.asarray(gdf["qc_flags"]) if len(gdf) else np.zeros(0, np.uint8)
+    return {
+        "blocks": len(gdf),
+        "flags": {
+            name: int(np.count_nonzero(flags & flag)) for name, flag in FLAGS.items()
+        },
+        "saturated_channels": int(np.sum(gdf["qc_saturated"])) if len(gdf) else 0,
+        "skipped_blocks": list(gdf.attrs.get("skipped_blocks", [])),
+    }
+
+
+def _outside(values, low: float, high: float) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    # values which are missing are not flagged
+    with np.errstate(invalid="ignore"):
+        return (values < low) | (values > high)
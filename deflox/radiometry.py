@@ -0,0 +1,173 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""
+Derives radiances and reflectances from the raw digital numbers (DN) of
+FLoX measurements, for whole arrays of measurements at once:
+
+    incoming_radiance = (wr - DC_WR) / IT_WR[ms] * wr_gain
+    reflected_radiance = (veg - DC_VEG) / IT_VEG[ms] * veg_gain
+    reflectance = reflected_radiance / incoming_radiance
+
+If the second measurement of the incoming light (`wr2`) is available, the
+incoming radiance is the mean of both measurements, which brackets the
+measurement of the reflected light. The gains per channel are given by a
+calibration table of the station.
+"""
+
+import math
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from deflox.spectra import decode_spectrum
+
+PRODUCTS = ["incoming_radiance", "reflected_radiance", "reflectance"]
+
+# the number of channels of the spectra read by `DataReader`
+CHANNELS = 1024
+
+# the columns of the raw data which are kept with the products
+PRODUCT_METADATA_COLUMNS = [
+    "local_datetime",
+    "utc_datetime",
+    "IT_WR[us]",
+    "IT_VEG[us]",
+    "GPS_lat",
+    "GPS_lon",
+]
+
+
+class CalibrationTable:
+    """
+    The wavelength and the radiometric gains of each channel of a station.
+
+    :param wavelengths: the wavelength of each channel, in nm
+    :param wr_gain: the gains of the upward-looking channel (WR)
+    :param veg_gain: the gains of the downward-looking channel (VEG)
+    """
+
+    def __init__(
+        self,
+        wavelengths: Sequence[float],
+        wr_gain: Sequence[float],
+        veg_gain: Sequence[float],
+    ):
+        self.wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        self.wr_gain = np.asarray(wr_gain, dtype=np.float64)
+        self.veg_gain = np.asarray(veg_gain, dtype=np.float64)
+        if not len(self.wavelengths) == len(self.wr_gain) == len(self.veg_gain):
+            raise ValueError("Calibration columns must have the same length")
+
+    @classmethod
+    def read(cls, path: str) -> "CalibrationTable":
+        """
+        Reads a calibration table from a CSV file with the columns `wl`,
+        `wr` and `veg`, separated by semicolons, one row per channel.
+        """
+        table = np.genfromtxt(path, delimiter=";", names=True, dtype=np.float64)
+        missing = {"wl", "wr", "veg"} - set(table.dtype.names)
+        if missing:
+            raise ValueError(
+                f"Calibration table {path} misses the columns {sorted(missing)}"
+            )
+        return cls(table["wl"], table["wr"], table["veg"])
+
+
+def to_array(values) -> np.ndarray:
+    """
+    Stacks a column of spectra, given as lists or as encoded blobs, into a
+    2D array with one row per measurement.
+    """
+    values = list(values)
+    if values and isinstance(values[0], (str, bytes)):
+        return np.stack([decode_spectrum(v) for v in values]).astype(np.float64)
+    return np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+
+
+def compute_products(gdf, calibration: CalibrationTable) -> Dict[str, np.ndarray]:
+    """
+    Computes the radiometric products of all measurements of a GeoDataFrame
+    as read by `DataReader` from raw data.
+
+    :return: the products by name, see PRODUCTS, each as 2D array with one
+        row per measurement; channels without signal are NaN
+    """
+    wr_it = _integration_time_ms(gdf["IT_WR[us]"])
+    veg_it = _integration_time_ms(gdf["IT_VEG[us]"])
+    wr_dark = to_array(gdf["DC_WR"])
+    veg_dark = to_array(gdf["DC_VEG"])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        incoming = (to_array(gdf["wr"]) - wr_dark) / wr_it
+        if "wr2" in gdf.columns:
+            incoming = (incoming + (to_array(gdf["wr2"]) - wr_dark) / wr_it) / 2
+        incoming *= calibration.wr_gain
+        reflected = (to_array(gdf["veg"]) - veg_dark) / veg_it * calibration.veg_gain
+        reflectance = reflected / incoming
+
+    products = {
+        "incoming_radiance": incoming,
+        "reflected_radiance": reflected,
+        "reflectance": reflectance,
+    }
+    for values in products.values():
+        values[~np.isfinite(values)] = np.nan
+    return products
+
+
+def to_products_gdf(gdf, calibration: CalibrationTable):
+    """
+    Returns a GeoDataFrame with the times, locations and integration times
+    of the given raw measurements, and their radiometric products as list
+    columns, with NaN replaced by None.
+    """
+    columns = [c for c in PRODUCT_METADATA_COLUMNS if c in gdf.columns]
+    result = gdf[columns + [gdf.geometry.name]].copy()
+    for name, values in compute_products(gdf, calibration).items():
+        result[name] = [
+            [None if math.isnan(v) else v for v in row] for row in values.tolist()
+        ]
+    return result
+
+
+def _integration_time_ms(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64).reshape(-1, 1) / 1000.0
+
+
+def load_station_calibration(
+    calibration_dir: Optional[str], station: str
+) -> Optional[CalibrationTable]:
+    """
+    Reads the calibration table `<calibration_dir>/<station>.csv`; returns
+    None if no directory is given. Raises a ValueError if the table does not
+    have a row for each of the channels of the spectra.
+    """
+    if not calibration_dir:
+        return None
+    path = os.path.join(calibration_dir, f"{station}.csv")
+    calibration = CalibrationTable.read(path)
+    if len(calibration.wavelengths) != CHANNELS:
+        raise ValueError(
+            f"Calibration table {path} has {len(calibration.wavelengths)} rows, "
+            f"expected one per channel ({CHANNELS})"
+        )
+    return calibration
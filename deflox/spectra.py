@@ -0,0 +1,127 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import base64
+import struct
+import zlib
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+# Layout of an encoded spectrum: a 4 byte header, consisting of the magic
+# bytes b"FX", the format version and the flags, followed by the channel
+# values as little-endian 32 bit integers. If FLAG_DELTA is set, all but the
+# first value are differences to the previous channel; if FLAG_ZLIB is set,
+# the values are zlib-compressed. Encoded spectra are base64 text, so that
+# they can be sent as JSON.
+MAGIC = b"FX"
+VERSION = 1
+FLAG_DELTA = 1
+FLAG_ZLIB = 2
+HEADER = struct.Struct("<2sBB")
+DTYPE = np.dtype("<i4")
+
+SPECTRUM_COLUMNS = ["wr", "veg", "wr2", "DC_WR", "DC_VEG"]
+
+
+def encode_spectrum(
+    values: Union[Sequence[int], np.ndarray],
+    delta: bool = False,
+    compress: bool = False,
+) -> str:
+    """
+    Encodes a spectrum as compact binary blob, in base64 text.
+
+    :param values: the integer channel values
+    :param delta: whether to encode differences between channels, which
+        compress much better
+    :param compress: whether to zlib-compress the values
+    """
+    array = np.asarray(values, dtype=DTYPE)
+    flags = 0
+    if delta:
+        array = np.diff(array, prepend=np.zeros(1, dtype=DTYPE)).astype(DTYPE)
+        flags |= FLAG_DELTA
+    payload = array.tobytes()
+    if compress:
+        payload = zlib.compress(payload)
+        flags |= FLAG_ZLIB
+    return base64.b64encode(HEADER.pack(MAGIC, VERSION, flags) + payload).decode(
+        "ascii"
+    )
+
+
+def decode_spectrum(blob: Union[str, bytes, memoryview]) -> np.ndarray:
+    """
+    Decodes a spectrum encoded by `encode_spectrum`. Blobs given as raw bytes
+    without delta encoding and compression are not copied; the returned
+    array is a read-only view on them.
+
+    :param blob: the encoded spectrum, as base64 text or as raw bytes
+    """
+    if isinstance(blob, str):
+        blob = base64.b64decode(blob)
+    magic, version, flags = HEADER.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not an encoded spectrum")
+    if flags & FLAG_ZLIB:
+        array = np.frombuffer(zlib.decompress(memoryview(blob)[HEADER.size :]), DTYPE)
+    else:
+        array = np.frombuffer(blob, DTYPE, offset=HEADER.size)
+    if flags & FLAG_DELTA:
+        array = np.cumsum(array, dtype=DTYPE)
+    return array
+
+
+def decode_spectra(blobs: Iterable[Union[str, bytes]]) -> np.ndarray:
+    """
+    Decodes a sequence of encoded spectra, e.g. a column of a data frame read
+    from the geoDB, into a 2D array with one row per spectrum.
+    """
+    return np.stack([decode_spectrum(blob) for blob in blobs])
+
+
+def parse_encoding(encoding: str) -> Optional[dict]:
+    """
+    Parses an encoding name, such as "binary+delta+zlib", into the keyword
+    arguments of `encode_spectrum`. Returns None for the plain "list"
+    encoding.
+    """
+    parts = encoding.lower().split("+")
+    if parts == ["list"]:
+        return None
+    if parts[0] != "binary" or not set(parts[1:]) <= {"delta", "zlib"}:
+        raise ValueError(f"Unknown spectrum encoding: {encoding}")
+    return {"delta": "delta" in parts, "compress": "zlib" in parts}
+
+
+def encode_spectra_columns(gdf, encoding: str):
+    """
+    Returns the given GeoDataFrame with its spectrum columns encoded as
+    given by the encoding name; see `parse_encoding`.
+    """
+    kwargs = parse_encoding(encoding)
+    if kwargs is None:
+        return gdf
+    gdf = gdf.copy()
+    for column in SPECTRUM_COLUMNS:
+        if column in gdf.columns:
+            gdf[column] = [encode_spectrum(values, **kwargs) for values in gdf[column]]
+    return gdf
@@ -0,0 +1,86 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from benchmarks.synthetic_data import SyntheticFlox, generate
+from deflox.ingestion.flox_data_reader import DataReader
+
+
+class SyntheticDataTest(unittest.TestCase):
+    """Test case for the synthetic data generator."""
+
+    def test_raw_lines(self):
+        flox = SyntheticFlox()
+        lines = flox.raw_lines(datetime(2024, 11, 5, 7, 0, 0), 10)
+
+        self.assertEqual(60, len(lines))
+        self.assertEqual(58, len(lines[0].split(";")))
+        self.assertEqual(1026, len(lines[1].split(";")))
+
+        gdf = DataReader().read(lines)
+        self.assertEqual(10, len(gdf))
+        self.assertEqual("2024-11-05 07:00:00", gdf["local_datetime"][0])
+        self.assertEqual("2024-11-05 05:00:00", gdf["utc_datetime"][0])
+        self.assertEqual(50.86594, gdf["GPS_lat"][0])
+
+    def test_raw_lines_f(self):
+        flox = SyntheticFlox()
+        lines = flox.raw_lines(datetime(2024, 11, 5, 7, 0, 0), 10, f_prefixed=True)
+
+        self.assertEqual(42, len(lines[0].split(";")))
+
+        gdf = DataReader().read(lines)
+        self.assertEqual(10, len(gdf))
+        self.assertEqual("2024-11-05 05:13:30", gdf["utc_datetime"].iloc[-1])
+
+    def test_corrupted_blocks_are_skipped(self):
+        flox = SyntheticFlox()
+        lines = flox.raw_lines(datetime(2024, 11, 5), 20, corrupt_every=5)
+
+        gdf = DataReader().read(lines)
+        self.assertEqual(16, len(gdf))
+
+    def test_generate(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = generate(root, stations=2, days=3, cycles=5, processed=True)
+
+            # 2 stations x 3 days x (2 raw + 6 processed files)
+            self.assertEqual(48, len(paths))
+            self.assertTrue(
+                os.path.exists(
+                    os.path.join(root, "station001", "241107", "F070000.CSV")
+                )
+            )
+
+            raw = os.path.join(root, "station000", "241105", "070000.CSV")
+            processed = os.path.join(
+                root, "station000", "241105", "Reflectance_FLUO_070000.csv"
+            )
+            with open(raw) as f:
+                raw_lines = f.readlines()
+            with open(processed) as f:
+                processed_lines = f.read().split("\n")
+            gdf = DataReader().read(raw_lines, processed_lines, "reflectance")
+            self.assertEqual(5, len(gdf))
+            self.assertEqual(256, len(gdf["reflectance"][0]))
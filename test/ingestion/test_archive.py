@@ -0,0 +1,132 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import contextlib
+import gzip
+import io
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks import synthetic_data
+from deflox.ingestion import archive
+from deflox.ingestion.archive import RawArchive
+from deflox.ingestion.content_index import hash_file
+from deflox.ingestion.flox_data_reader import DataReader
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.sources import ArchiveSource
+
+KEY = "241105/070000.CSV"
+
+
+class RawArchiveTest(unittest.TestCase):
+    """Test case for the archive of raw files."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        (self.path,) = synthetic_data.generate(
+            os.path.join(self.tmpdir.name, "data"),
+            cycles=50,
+            f_prefixed=False,
+            corrupt_every=9,
+        )
+        with open(self.path) as f:
+            self.lines = f.readlines()
+        self.headers = [
+            i
+            for i, line in enumerate(self.lines)
+            if re.match("^\\d+;\\d{6};\\d{6};.*;IT_WR.us.=", line)
+        ]
+        self.archive = RawArchive(os.path.join(self.tmpdir.name, "archive"), 8)
+        self.archive.add(self.path, KEY)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_add(self):
+        index = self.archive.index(KEY)
+
+        self.assertEqual(50, index["blocks"])
+        self.assertEqual(len(self.lines), index["lines"])
+        self.assertEqual(7, len(index["members"]))
+        self.assertEqual(
+            [0, 8, 16, 24, 32, 40, 48], [m["first_block"] for m in index["members"]]
+        )
+        self.assertEqual(hash_file(self.path), index["sha256"])
+        self.assertTrue(self.archive.contains(KEY, hash_file(self.path)))
+        self.assertFalse(self.archive.contains(KEY, "other"))
+        self.assertFalse(self.archive.contains("241106/070000.CSV", "other"))
+        # the archived file is a regular gzip file
+        with gzip.open(self.archive.path(KEY)) as f, open(self.path, "rb") as g:
+            self.assertEqual(g.read(), f.read())
+        self.assertEqual(
+            os.path.getmtime(self.path), os.path.getmtime(self.archive.path(KEY))
+        )
+
+    def test_add_interrupted(self):
+        key = "241106/070000.CSV"
+        with mock.patch.object(archive, "_write_json", side_effect=OSError("full")):
+            with self.assertRaises(OSError):
+                self.archive.add(self.path, key)
+
+        # the data without index does not count as archived
+        self.assertTrue(os.path.exists(self.archive.path(key)))
+        self.assertFalse(self.archive.contains(key, hash_file(self.path)))
+        self.archive.add(self.path, key)
+        self.assertEqual(self.lines, self.archive.read_lines(key))
+
+    def test_read_lines(self):
+        self.assertEqual(self.lines, self.archive.read_lines(KEY))
+        self.assertEqual(
+            self.lines[self.headers[10] : self.headers[21]],
+            self.archive.read_lines(KEY, 10, 20),
+        )
+        self.assertEqual(
+            self.lines[: self.headers[1]], self.archive.read_lines(KEY, 0, 0)
+        )
+        self.assertEqual(
+            self.lines[self.headers[49] :], self.archive.read_lines(KEY, 49)
+        )
+        with self.assertRaises(FileNotFoundError):
+            self.archive.read_lines("241106/070000.CSV")
+
+    def test_read(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = DataReader().read(self.lines[self.headers[16] :])
+            actual = self.archive.read(KEY, 16)
+
+        self.assertTrue(expected.equals(actual))
+
+    def test_archive_source(self):
+        target_dir = os.path.join(self.tmpdir.name, "target")
+        self.archive.add(self.path, "241105/F070000.CSV")
+        source = ArchiveSource(self.archive.root, target_dir)
+
+        files = source.fetch(RunMetrics(), exclude={"241105/F070000.CSV"})
+
+        self.assertEqual([os.path.join(target_dir, "241105", "070000.CSV")], files)
+        self.assertEqual(KEY, source.key(files[0]))
+        with open(files[0]) as f:
+            self.assertEqual(self.lines, f.readlines())
+        self.assertEqual(hash_file(self.path), source.content_hash(files[0]))
+        source.release(files[0])
+        self.assertEqual([], os.listdir(target_dir))
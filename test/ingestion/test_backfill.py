@@ -0,0 +1,153 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import json
+import os
+import socket
+import tempfile
+import unittest
+from multiprocessing import Process
+from unittest import mock
+
+from deflox.ingestion.backfill import Backfill, get_partitions
+from deflox.ingestion.lease import FileLease
+from deflox.ingestion.sinks import MemorySink, SqliteSink
+from test.ingestion.test_ingest import _serve, _wait_for_port
+
+
+class GetPartitionsTest(unittest.TestCase):
+    def test_get_partitions(self):
+        self.assertEqual(
+            [("231230", "240101"), ("240102", "240104"), ("240105", "240105")],
+            get_partitions("231230", "240105", 3),
+        )
+        self.assertEqual([("240101", "240101")], get_partitions("240101", "240101", 7))
+        self.assertEqual([], get_partitions("240102", "240101", 7))
+        with self.assertRaises(ValueError):
+            get_partitions("240101", "240102", 0)
+
+
+class BackfillTest(unittest.TestCase):
+    """Test case for the backfill, against a local FTP server."""
+
+    def setUp(self):
+        homedir = os.path.join(os.path.dirname(__file__), "res")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.checkpoint_dir = os.path.join(self.tmpdir.name, "checkpoints")
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+
+        self.env = mock.patch.dict(
+            os.environ,
+            {
+                "FTP_HOST": "127.0.0.1",
+                "FTP_PORT": str(port),
+                "FTP_USER": "username",
+                "FTP_PW": "password",
+                "TEMP_DATA_DIR": os.path.join(self.tmpdir.name, "data"),
+            },
+        )
+        self.env.start()
+
+        self.server = Process(target=_serve, args=(homedir, port), daemon=True)
+        self.server.start()
+        _wait_for_port(port)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.join()
+        self.env.stop()
+        self.tmpdir.cleanup()
+
+    def test_run(self):
+        sink = MemorySink()
+        backfill = Backfill(
+            "240101", "240103", self.checkpoint_dir, partition_days=1, sink=sink
+        )
+
+        self.assertEqual(
+            {"completed": 3, "skipped": 0, "busy": 0, "failed": 0}, backfill.run()
+        )
+        self.assertEqual(2, sink.row_count("username-raw"))
+        self.assertEqual(
+            [
+                "username-240101-240101.json",
+                "username-240102-240102.json",
+                "username-240103-240103.json",
+            ],
+            sorted(os.listdir(self.checkpoint_dir)),
+        )
+        with open(
+            os.path.join(self.checkpoint_dir, "username-240101-240101.json")
+        ) as f:
+            checkpoint = json.load(f)
+        self.assertEqual(["240101/070101.CSV"], checkpoint["files"])
+        self.assertTrue(checkpoint["done"])
+        self.assertEqual(
+            1, checkpoint["metrics"]["stations"]["username"]["insert"]["rows"]
+        )
+
+        # completed partitions are not processed again
+        self.assertEqual(
+            {"completed": 0, "skipped": 3, "busy": 0, "failed": 0}, backfill.run()
+        )
+        self.assertEqual(2, sink.row_count("username-raw"))
+
+    def test_resume(self):
+        # the first file of the partition has been ingested before
+        os.makedirs(self.checkpoint_dir)
+        with open(
+            os.path.join(self.checkpoint_dir, "username-240101-240102.json"), "w"
+        ) as f:
+            json.dump({"files": ["240101/070101.CSV"], "done": False}, f)
+        sink = MemorySink()
+
+        result = Backfill("240101", "240102", self.checkpoint_dir, sink=sink).run()
+
+        self.assertEqual({"completed": 1, "skipped": 0, "busy": 0, "failed": 0}, result)
+        self.assertEqual(1, sink.row_count("username-raw"))
+
+    def test_busy_partition(self):
+        sink = MemorySink()
+        backfill = Backfill(
+            "240101", "240102", self.checkpoint_dir, partition_days=1, sink=sink
+        )
+
+        with mock.patch.dict(os.environ, {"LEASE_TYPE": "file"}):
+            # another backfill works on the first partition
+            with FileLease(self.checkpoint_dir, "username-240101-240101"):
+                result = backfill.run()
+
+        self.assertEqual({"completed": 1, "skipped": 0, "busy": 1, "failed": 0}, result)
+        self.assertEqual(1, sink.row_count("username-raw"))
+
+    def test_run_parallel(self):
+        sqlite_path = os.path.join(self.tmpdir.name, "deflox.db")
+        with mock.patch.dict(
+            os.environ, {"SINK_TYPE": "sqlite", "SQLITE_PATH": sqlite_path}
+        ):
+            result = Backfill(
+                "240101", "240102", self.checkpoint_dir, partition_days=1, workers=2
+            ).run()
+
+        self.assertEqual({"completed": 2, "skipped": 0, "busy": 0, "failed": 0}, result)
+        self.assertEqual(2, SqliteSink(sqlite_path).row_count("username-raw"))
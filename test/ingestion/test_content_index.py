@@ -0,0 +1,94 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from deflox.ingestion.content_index import ContentIndex, hash_file
+from deflox.ingestion.ingest import ingest
+from deflox.ingestion.sinks import MemorySink
+
+RES_DIR = os.path.join(os.path.dirname(__file__), "res")
+
+
+class ContentIndexTest(unittest.TestCase):
+    """Test case for the index of ingested file contents."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hash_file(self):
+        path = os.path.join(RES_DIR, "240101", "070101.CSV")
+        with open(path, "rb") as f:
+            expected = hashlib.sha256(f.read()).hexdigest()
+
+        self.assertEqual(expected, hash_file(path, chunk_size=1000))
+
+    def test_index(self):
+        path = os.path.join(self.tmpdir.name, "index.db")
+        index = ContentIndex(path)
+        self.assertNotIn("abc", index)
+
+        index.add("abc", "station", "240101/070101.CSV")
+        index.add("abc", "station", "240102/070101.CSV")
+        index.close()
+
+        index = ContentIndex(path)
+        self.assertIn("abc", index)
+        self.assertNotIn("def", index)
+        index.close()
+
+    def test_ingest_duplicates(self):
+        # the same file, uploaded twice
+        source_dir = os.path.join(self.tmpdir.name, "source")
+        shutil.copytree(RES_DIR, source_dir)
+        os.makedirs(os.path.join(source_dir, "240103"))
+        shutil.copy(
+            os.path.join(source_dir, "240101", "070101.CSV"),
+            os.path.join(source_dir, "240103", "070103.CSV"),
+        )
+        report_path = os.path.join(self.tmpdir.name, "report.json")
+        env = {
+            "FTP_USER": "station",
+            "SOURCE_TYPE": "local",
+            "SOURCE_DIR": source_dir,
+            "MAX_DAY_DIFF": "73000",
+            "CONTENT_INDEX": os.path.join(self.tmpdir.name, "index.db"),
+            "RUN_REPORT_JSON": report_path,
+        }
+        with mock.patch.dict(os.environ, env):
+            sink = MemorySink()
+            ingest(sink)
+            self.assertEqual(2, sink.row_count("station-raw"))
+            self.assertEqual(2, len(sink.inserted["station-raw"]))
+            with open(report_path) as f:
+                self.assertIn('"duplicate_files": 1', f.read())
+
+            # all contents have been ingested before
+            sink = MemorySink()
+            ingest(sink)
+            self.assertEqual(0, sink.row_count("station-raw"))
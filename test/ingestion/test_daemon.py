@@ -0,0 +1,134 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from multiprocessing import Process
+from unittest import mock
+
+from deflox.ingestion.daemon import IngestionService
+from deflox.ingestion.data_fetcher import connect
+from deflox.ingestion.sinks import MemorySink
+from test.ingestion.test_ingest import _serve, _wait_for_port
+
+
+class IngestionServiceTest(unittest.TestCase):
+    """Test case for the long-running ingestion service."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.ftp_root = os.path.join(self.tmpdir.name, "ftp")
+        os.makedirs(self.ftp_root)
+        self.target_dir = os.path.join(self.tmpdir.name, "target")
+        res = os.path.join(os.path.dirname(__file__), "res")
+        shutil.copytree(
+            os.path.join(res, "240101"), os.path.join(self.ftp_root, "240101")
+        )
+
+        logging.basicConfig(level=logging.ERROR)
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+
+        self.env = mock.patch.dict(
+            os.environ,
+            {
+                "FTP_HOST": "127.0.0.1",
+                "FTP_PORT": str(port),
+                "FTP_USER": "username",
+                "FTP_PW": "password",
+                "TEMP_DATA_DIR": self.target_dir,
+                "MAX_DAY_DIFF": "73000",
+            },
+        )
+        self.env.start()
+
+        self.server = Process(target=_serve, args=(self.ftp_root, port), daemon=True)
+        self.server.start()
+        _wait_for_port(port)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.join()
+        self.env.stop()
+        self.tmpdir.cleanup()
+
+    def test_run_cycles(self):
+        sink = MemorySink()
+        service = IngestionService(sink, interval=0, jitter=0)
+
+        self.assertEqual(1, service.run_cycle())
+        self.assertEqual(1, sink.row_count("username-raw"))
+
+        # the same data again is not inserted, as the latest time is cached
+        self.assertEqual(1, service.run_cycle())
+        self.assertEqual(1, sink.row_count("username-raw"))
+        self.assertEqual(2, len(service.latest_times))
+
+        # new data, though, is
+        shutil.copytree(
+            os.path.join(os.path.dirname(__file__), "res", "240102"),
+            os.path.join(self.ftp_root, "240102"),
+        )
+        with open(os.path.join(self.ftp_root, "240102", "070102.CSV")) as f:
+            content = f.read().replace("050119.", "060119.")
+        with open(os.path.join(self.ftp_root, "240102", "070102.CSV"), "w") as f:
+            f.write(content)
+        self.assertEqual(2, service.run_cycle())
+        self.assertEqual(2, sink.row_count("username-raw"))
+
+    def test_keep_ftp_session(self):
+        service = IngestionService(MemorySink(), interval=0, jitter=0)
+        with mock.patch(
+            "deflox.ingestion.data_fetcher.connect", wraps=connect
+        ) as connect_mock:
+            for _ in range(3):
+                self.assertEqual(1, service.run_cycle())
+            self.assertEqual(1, connect_mock.call_count)
+
+            # a session closed in the meantime is replaced
+            service.source.ftp.close()
+            self.assertEqual(1, service.run_cycle())
+            self.assertEqual(2, connect_mock.call_count)
+        service.source.close()
+
+    def test_run_and_stop(self):
+        service = IngestionService(MemorySink(), interval=10, jitter=0)
+        threading.Timer(0.5, service.stop).start()
+        start = time.perf_counter()
+        service.run()
+        self.assertEqual(1, service.cycles)
+        self.assertLess(time.perf_counter() - start, 5)
+
+    def test_failing_cycle(self):
+        sink = MemorySink()
+        service = IngestionService(sink, interval=0, jitter=0)
+        with mock.patch.object(sink, "insert", side_effect=IOError("down")):
+            self.assertEqual(0, service.run_cycle())
+        self.assertEqual({}, service.latest_times)
+        self.assertEqual(1, service.run_cycle())
+        self.assertEqual(1, sink.row_count("username-raw"))
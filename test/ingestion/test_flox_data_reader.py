@@ -18,10 +18,16 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
+import contextlib
+import io
 import pkgutil
+import tempfile
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
 
-
+from benchmarks import synthetic_data
+from deflox.ingestion import flox_data_reader
 from deflox.ingestion.flox_data_reader import DataReader
 
 
@@ -351,3 +357,146 @@ class DataReaderTest(unittest.TestCase):
         processed_lines = processed_data.split("\n")
         rdr = DataReader()
         return rdr.read(raw_lines, processed_lines, var_name)
+
+
+class ParallelReadTest(unittest.TestCase):
+    """Checks that reading in parallel gives the same result as serially."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_read_raw(self):
+        self._assert_same_result(self._generate(f_prefixed=False))
+
+    def test_read_raw_f(self):
+        self._assert_same_result(self._generate(f_prefixed=True))
+
+    def test_read_raw_missing_lines(self):
+        lines = self._generate(f_prefixed=False)
+        # a block without one of its spectra, and a stray line
+        del lines[15]
+        lines.insert(40, "garbage;1;2;\n")
+
+        self._assert_same_result(lines)
+
+    def _assert_same_result(self, lines):
+        serial_output = io.StringIO()
+        with contextlib.redirect_stdout(serial_output):
+            expected = DataReader().read(lines)
+        parallel_output = io.StringIO()
+        with (
+            mock.patch.object(flox_data_reader, "BLOCKS_PER_TASK", 7),
+            contextlib.redirect_stdout(parallel_output),
+        ):
+            actual = DataReader().read(lines, executor=self.executor)
+
+        self.assertTrue(len(expected.attrs["skipped_blocks"]) > 0)
+        self.assertTrue(expected.equals(actual))
+        self.assertEqual(list(expected.columns), list(actual.columns))
+        self.assertEqual(expected.attrs, actual.attrs)
+        self.assertEqual(serial_output.getvalue(), parallel_output.getvalue())
+
+    @staticmethod
+    def _generate(f_prefixed: bool):
+        with tempfile.TemporaryDirectory() as work_dir:
+            (path,) = synthetic_data.generate(
+                work_dir, cycles=40, f_prefixed=f_prefixed, corrupt_every=9
+            )
+            with open(path) as f:
+                return f.readlines()
+
+
+class PointsTest(unittest.TestCase):
+    """Checks that rows at the same position share their geometry."""
+
+    def test_points(self):
+        points = flox_data_reader._points(
+            [6.4, 6.4, 6.4, 6.5, 6.5, 6.4], [50.8, 50.8, 50.8, 50.8, 50.8, 50.8]
+        )
+
+        self.assertEqual(6, len(points))
+        self.assertEqual(
+            [(6.4, 50.8), (6.4, 50.8), (6.4, 50.8), (6.5, 50.8), (6.5, 50.8)]
+            + [(6.4, 50.8)],
+            [(p.x, p.y) for p in points],
+        )
+        self.assertIs(points[0], points[2])
+        self.assertIs(points[3], points[4])
+        self.assertIsNot(points[2], points[3])
+        self.assertIsNot(points[0], points[5])
+
+    def test_points_empty(self):
+        self.assertEqual(0, len(flox_data_reader._points([], [])))
+
+    def test_read_raw(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            (path,) = synthetic_data.generate(work_dir, cycles=10, f_prefixed=False)
+            with open(path) as f:
+                lines = f.readlines()
+        gdf = DataReader().read(lines)
+        columns = flox_data_reader._parse_blocks(lines, range(0, 60, 6), False)
+
+        self.assertEqual(10, len(gdf))
+        self.assertEqual(1, len({id(p) for p in gdf.geometry}))
+        self.assertEqual(1, len({id(v) for v in columns["flox_identifier"]}))
+        self.assertEqual(1, len({id(v) for v in columns["GPS_lat"]}))
+        self.assertEqual(gdf["GPS_lon"][9], gdf.geometry[9].x)
+        self.assertEqual(gdf["GPS_lat"][9], gdf.geometry[9].y)
+
+
+class ReentrancyTest(unittest.TestCase):
+    """Checks that a reader can be reused, and shared by threads."""
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as work_dir:
+            paths = synthetic_data.generate(
+                work_dir, stations=4, cycles=30, corrupt_every=7
+            )
+            cls.files = []
+            for path in paths:
+                with open(path) as f:
+                    cls.files.append(f.readlines())
+
+    def test_reuse(self):
+        reader = DataReader()
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = reader.read(self.files[0])
+            reader.read(self.files[1])
+            again = reader.read(self.files[0])
+
+        self.assertTrue(first.equals(again))
+        self.assertEqual(first.attrs, again.attrs)
+
+    def test_read_in_threads(self):
+        reader = DataReader()
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = [reader.read(lines) for lines in self.files]
+            with (
+                mock.patch.object(flox_data_reader, "BUFFER_BLOCKS", 4),
+                ThreadPoolExecutor(4) as executor,
+            ):
+                actual = list(executor.map(reader.read, self.files * 3))
+
+        for i, gdf in enumerate(actual):
+            self.assertTrue(expected[i % len(self.files)].equals(gdf))
+
+    def test_buffer_per_thread(self):
+        buffer = flox_data_reader._get_spectrum_buffer()
+
+        self.assertIs(buffer, flox_data_reader._get_spectrum_buffer())
+        with ThreadPoolExecutor(1) as executor:
+            other = executor.submit(flox_data_reader._get_spectrum_buffer).result()
+        self.assertIsNot(buffer, other)
+
+    def test_read_invalid_value(self):
+        lines = list(self.files[0])
+        lines[1] = lines[1].replace(";", ";x", 1)
+
+        with self.assertRaises(ValueError), contextlib.redirect_stdout(io.StringIO()):
+            DataReader().read(lines)
@@ -0,0 +1,341 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+import unittest
+from multiprocessing import Process
+from unittest import mock
+
+from pyftpdlib.authorizers import DummyAuthorizer
+from pyftpdlib.handlers import FTPHandler
+from pyftpdlib.servers import FTPServer
+
+from benchmarks import synthetic_data
+from benchmarks.startup_benchmark import run_no_new_data
+from deflox.ingestion.content_index import ContentIndex, hash_file
+from deflox.ingestion.ingest import _ingest_files, ingest
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.outbox import Outbox
+from deflox.ingestion.sinks import EARLIEST_TIME, MemorySink
+from deflox.ingestion.sources import LocalSource
+from deflox.spectra import decode_spectrum
+from deflox.quality import VOLTAGE
+from test.sinks import FailingSink
+
+
+class IngestTest(unittest.TestCase):
+    """Test case for the complete ingestion process, using a local sink."""
+
+    def setUp(self):
+        homedir = os.path.join(os.path.dirname(__file__), "res")
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        logging.basicConfig(level=logging.ERROR)
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+
+        self.env = mock.patch.dict(
+            os.environ,
+            {
+                "FTP_HOST": "127.0.0.1",
+                "FTP_PORT": str(port),
+                "FTP_USER": "username",
+                "FTP_PW": "password",
+                "TEMP_DATA_DIR": self.tmpdir.name,
+                "MAX_DAY_DIFF": "73000",
+            },
+        )
+        self.env.start()
+
+        # serve from another process, so that the FTP server does not share
+        # pyftpdlib's global state with other tests
+        self.server = Process(target=_serve, args=(homedir, port), daemon=True)
+        self.server.start()
+        _wait_for_port(port)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.join()
+        self.env.stop()
+        self.tmpdir.cleanup()
+
+    def test_ingest(self):
+        sink = MemorySink()
+        ingest(sink)
+
+        self.assertEqual(2, sink.row_count("username-raw"))
+        self.assertEqual(0, sink.row_count("username-raw-f"))
+        gdf = sink.inserted["username-raw"][0]
+        self.assertEqual("2080-01-05 05:01:19", gdf["utc_datetime"].iloc[0])
+        self.assertEqual(1024, len(gdf["wr"].iloc[0]))
+        # downloaded files are removed after ingestion
+        self.assertEqual([], os.listdir(self.tmpdir.name))
+
+    def test_ingest_binary_spectra(self):
+        sink = MemorySink()
+        with mock.patch.dict(os.environ, {"SPECTRUM_ENCODING": "binary+delta+zlib"}):
+            ingest(sink)
+
+        gdf = sink.inserted["username-raw"][0]
+        self.assertIsInstance(gdf["wr"].iloc[0], str)
+        self.assertEqual(1536, decode_spectrum(gdf["wr"].iloc[0])[0])
+
+    def test_ingest_run_report(self):
+        with tempfile.TemporaryDirectory() as report_dir:
+            report_path = os.path.join(report_dir, "report.json")
+            with mock.patch.dict(os.environ, {"RUN_REPORT_JSON": report_path}):
+                ingest(MemorySink())
+            with open(report_path) as f:
+                report = json.load(f)
+
+        stages = report["stations"]["username"]
+        self.assertEqual(2, stages["transfer"]["files"])
+        self.assertEqual(52352, stages["transfer"]["bytes"])
+        self.assertEqual(2, stages["parse"]["rows"])
+        self.assertEqual(0, stages["parse"]["skipped_blocks"])
+        self.assertEqual(2, stages["insert"]["rows"])
+        self.assertEqual({}, report["skipped_blocks"])
+
+    def test_ingest_skipped_blocks(self):
+        with tempfile.TemporaryDirectory() as source_dir:
+            synthetic_data.generate(
+                source_dir, cycles=20, f_prefixed=False, corrupt_every=9
+            )
+            source = LocalSource(source_dir)
+            metrics = RunMetrics()
+            latest_times = {"station-raw": EARLIEST_TIME}
+            with contextlib.redirect_stdout(io.StringIO()):
+                _ingest_files(
+                    source.fetch(metrics),
+                    MemorySink(),
+                    source,
+                    "station",
+                    metrics,
+                    latest_times,
+                )
+
+        report = metrics.to_dict()
+        (line_numbers,) = report["skipped_blocks"]["station"].values()
+        self.assertEqual(
+            ["241105/070000.CSV"], list(report["skipped_blocks"]["station"])
+        )
+        self.assertEqual(2, len(line_numbers))
+        self.assertEqual(2, report["stations"]["station"]["parse"]["skipped_blocks"])
+
+    def test_ingest_quality(self):
+        with tempfile.TemporaryDirectory() as report_dir:
+            report_path = os.path.join(report_dir, "report.json")
+            sink = MemorySink()
+            with mock.patch.dict(
+                os.environ,
+                {
+                    "QC_FLAGS": "1",
+                    "QC_VOLTAGE": "20:30",
+                    "RUN_REPORT_JSON": report_path,
+                },
+            ):
+                ingest(sink)
+                with open(report_path) as f:
+                    report = json.load(f)
+                # the second run reads the same files, without new rows
+                ingest(sink)
+                with open(report_path) as f:
+                    second_report = json.load(f)
+
+        for gdf in sink.inserted["username-raw"]:
+            self.assertEqual([VOLTAGE], list(gdf["qc_flags"] & VOLTAGE))
+        self.assertEqual(2, report["events"]["qc_voltage"])
+        self.assertNotIn("qc_saturated", report["events"])
+        self.assertEqual(2, second_report["events"]["files_without_new_data"])
+        self.assertNotIn("qc_voltage", second_report["events"])
+
+    def test_ingest_profiles(self):
+        sink = MemorySink()
+        with mock.patch.dict(
+            os.environ,
+            {
+                "INGEST_PROFILES": "fluo:640-850,coarse:0-1023/8",
+                "SPECTRUM_ENCODING": "binary+delta+zlib",
+            },
+        ):
+            ingest(sink)
+
+        self.assertEqual(2, sink.row_count("username-raw"))
+        self.assertEqual(2, sink.row_count("username-raw-fluo"))
+        self.assertEqual(2, sink.row_count("username-raw-coarse"))
+        full = decode_spectrum(sink.inserted["username-raw"][0]["veg"].iloc[0])
+        fluo = decode_spectrum(sink.inserted["username-raw-fluo"][0]["veg"].iloc[0])
+        coarse = sink.inserted["username-raw-coarse"][0]["veg"].iloc[0]
+        self.assertEqual(full[640:851].tolist(), fluo.tolist())
+        self.assertEqual(
+            full.reshape(128, 8).sum(axis=1).tolist(),
+            decode_spectrum(coarse).tolist(),
+        )
+        definitions = sink.get_rows(
+            "username-profiles",
+            "collection",
+            ["username-raw-fluo", "username-raw-coarse"],
+        )
+        self.assertEqual(["fluo", "coarse"], list(definitions["profile"]))
+        self.assertEqual([211, 128], list(definitions["channels"]))
+
+    def test_ingest_outbox(self):
+        with tempfile.TemporaryDirectory() as outbox_dir:
+            with mock.patch.dict(os.environ, {"OUTBOX_DIR": outbox_dir}):
+                ingest(FailingSink())
+                self.assertEqual(2, len(Outbox(outbox_dir).pending()))
+
+                sink = MemorySink()
+                ingest(sink)
+                self.assertEqual([], Outbox(outbox_dir).pending())
+
+        # the drained rows are not inserted a second time
+        self.assertEqual(2, sink.row_count("username-raw"))
+        self.assertEqual(2, len(sink.inserted["username-raw"]))
+
+    def test_ingest_content_index(self):
+        with tempfile.TemporaryDirectory() as index_dir:
+            index_path = os.path.join(index_dir, "index.db")
+            with mock.patch.dict(os.environ, {"CONTENT_INDEX": index_path}):
+                ingest(MemorySink())
+                sink = MemorySink()
+                ingest(sink)
+            index = ContentIndex(index_path)
+            path = os.path.join(os.path.dirname(__file__), "res", "240101")
+            self.assertIn(hash_file(os.path.join(path, "070101.CSV")), index)
+            index.close()
+
+        # the files are downloaded again, but neither read nor inserted
+        self.assertEqual(0, sink.row_count("username-raw"))
+
+
+class StopTest(unittest.TestCase):
+    """Test case for stopping the ingestion once the lease has been lost."""
+
+    def test_stop_before_next_file(self):
+        sink = MemorySink()
+        # the lease is lost while the first file is inserted
+        should_continue = mock.Mock(side_effect=lambda: sink.row_count() == 0)
+        source = LocalSource(os.path.join(os.path.dirname(__file__), "res"))
+        metrics = RunMetrics()
+        latest_times = {"station-raw": EARLIEST_TIME, "station-raw-f": EARLIEST_TIME}
+        done = []
+        with mock.patch.dict(os.environ, {"FTP_USER": "station"}):
+            files = source.fetch(metrics)
+            _ingest_files(
+                files,
+                sink,
+                source,
+                "station",
+                metrics,
+                latest_times,
+                on_file_done=done.append,
+                should_continue=should_continue,
+            )
+
+        self.assertEqual(2, len(files))
+        self.assertEqual(1, sink.row_count("station-raw"))
+        self.assertEqual(files[:1], done)
+        self.assertEqual(1, metrics.events["stopped_runs"])
+        self.assertEqual("2080-01-05 05:01:19", str(latest_times["station-raw"]))
+
+    def test_stop_before_insert(self):
+        sink = MemorySink()
+        source = LocalSource(os.path.join(os.path.dirname(__file__), "res"))
+        metrics = RunMetrics()
+        latest_times = {"station-raw": EARLIEST_TIME, "station-raw-f": EARLIEST_TIME}
+        # the lease is lost while the first file is parsed
+        should_continue = mock.Mock(side_effect=[True, False])
+        with mock.patch.dict(os.environ, {"FTP_USER": "station"}):
+            _ingest_files(
+                source.fetch(metrics),
+                sink,
+                source,
+                "station",
+                metrics,
+                latest_times,
+                should_continue=should_continue,
+            )
+
+        self.assertEqual(0, sink.row_count())
+        self.assertEqual(EARLIEST_TIME, latest_times["station-raw"])
+
+
+def _serve(homedir: str, port: int):
+    logging.basicConfig(level=logging.ERROR)
+    authorizer = DummyAuthorizer()
+    authorizer.add_user("username", "password", homedir, perm="elr")
+    handler = FTPHandler
+    handler.authorizer = authorizer
+    FTPServer(("127.0.0.1", port), handler).serve_forever()
+
+
+def _wait_for_port(port: int):
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except ConnectionRefusedError:
+            time.sleep(0.05)
+
+
+class NoNewDataTest(unittest.TestCase):
+    """Guards the start-up of the ingestion when there is no new data."""
+
+    def setUp(self):
+        self.ftp_root = tempfile.TemporaryDirectory()
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        self.env = mock.patch.dict(
+            os.environ,
+            {
+                "FTP_HOST": "127.0.0.1",
+                "FTP_PORT": str(port),
+                "FTP_USER": "username",
+                "FTP_PW": "password",
+            },
+        )
+        self.env.start()
+
+        self.server = Process(
+            target=_serve, args=(self.ftp_root.name, port), daemon=True
+        )
+        self.server.start()
+        _wait_for_port(port)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.join()
+        self.env.stop()
+        self.ftp_root.cleanup()
+
+    def test_no_heavy_imports(self):
+        self.assertEqual([], run_no_new_data())
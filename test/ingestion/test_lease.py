@@ -0,0 +1,173 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from deflox.ingestion.ingest import ingest
+from deflox.ingestion.lease import FileLease, SqliteLease
+from deflox.ingestion.sinks import MemorySink
+
+
+class FileLeaseTest(unittest.TestCase):
+    """Test case for leases stored as files."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def new_lease(self, ttl: float = 600):
+        return FileLease(self.tmpdir.name, "station", ttl)
+
+    def test_exclusive(self):
+        lease = self.new_lease()
+        other = self.new_lease()
+
+        self.assertTrue(lease.acquire())
+        self.assertFalse(other.acquire())
+        lease.release()
+        self.assertTrue(other.acquire())
+        other.release()
+
+    def test_context_manager(self):
+        with self.new_lease() as acquired:
+            self.assertTrue(acquired)
+            with self.new_lease() as other_acquired:
+                self.assertFalse(other_acquired)
+        with self.new_lease() as acquired:
+            self.assertTrue(acquired)
+
+    def test_heartbeat(self):
+        lease = self.new_lease(ttl=0.3)
+        self.assertTrue(lease.acquire())
+
+        # the lease is renewed while held
+        time.sleep(0.6)
+        self.assertFalse(self.new_lease(ttl=0.3).acquire())
+        self.assertFalse(lease.lost)
+        lease.release()
+
+    def test_expiry(self):
+        lease = self.new_lease(ttl=0.2)
+        self.assertTrue(lease.acquire())
+        # the holder stops renewing, as if it had crashed
+        lease._stopped.set()
+        lease._heartbeat.join()
+
+        time.sleep(0.3)
+        other = self.new_lease(ttl=0.2)
+        self.assertTrue(other.acquire())
+        self.assertFalse(lease.renew())
+        self.assertTrue(lease.lost)
+
+        # releasing a lost lease does not free the new holder's lease
+        lease.release()
+        self.assertFalse(self.new_lease().acquire())
+        other.release()
+
+    def test_renew_error(self):
+        lease = self.new_lease(ttl=0.3)
+        self.assertTrue(lease.acquire())
+        lease._stopped.set()
+        lease._heartbeat.join()
+
+        error = sqlite3.OperationalError("database is locked")
+        with (
+            mock.patch.object(lease, "_claim", side_effect=error),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            # the lease is held until its known expiry
+            self.assertFalse(lease.renew())
+            self.assertFalse(lease.lost)
+            time.sleep(0.4)
+            self.assertFalse(lease.renew())
+            self.assertTrue(lease.lost)
+        lease.release()
+
+    def test_heartbeat_error(self):
+        lease = self.new_lease(ttl=0.3)
+        self.assertTrue(lease.acquire())
+
+        with (
+            mock.patch.object(lease, "_claim", side_effect=OSError("I/O error")),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            lease._heartbeat.join(timeout=2)
+            self.assertFalse(lease._heartbeat.is_alive())
+            self.assertTrue(lease.lost)
+        lease.release()
+
+    def test_concurrent_acquire(self):
+        leases = [self.new_lease() for _ in range(8)]
+        results = []
+        threads = [
+            threading.Thread(target=lambda l=l: results.append(l.acquire()))
+            for l in leases
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, results.count(True))
+        for lease in leases:
+            if lease._heartbeat is not None:
+                lease.release()
+
+
+class SqliteLeaseTest(FileLeaseTest):
+    """Test case for leases stored in a SQLite database."""
+
+    def new_lease(self, ttl: float = 600):
+        return SqliteLease(os.path.join(self.tmpdir.name, "leases.db"), "station", ttl)
+
+
+class IngestLeaseTest(unittest.TestCase):
+    def test_skip_overlapping_run(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = {
+                "FTP_USER": "station",
+                "SOURCE_TYPE": "local",
+                "SOURCE_DIR": os.path.join(os.path.dirname(__file__), "res"),
+                "MAX_DAY_DIFF": "73000",
+                "TEMP_DATA_DIR": tmpdir,
+                "LEASE_TYPE": "file",
+            }
+            with mock.patch.dict(os.environ, env):
+                sink = MemorySink()
+                with FileLease(tmpdir, "station"):
+                    with self.assertRaises(SystemExit) as cm:
+                        ingest(sink)
+                    self.assertEqual(0, cm.exception.code)
+                    self.assertEqual(0, sink.row_count())
+
+                ingest(sink)
+                self.assertEqual(2, sink.row_count("station-raw"))
+                # the lease has been freed
+                self.assertFalse(os.path.exists(os.path.join(tmpdir, "station.lease")))
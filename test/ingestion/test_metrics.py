@@ -0,0 +1,104 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import json
+import os
+import pstats
+import tempfile
+import unittest
+
+from deflox.ingestion.metrics import RunMetrics
+
+
+class RunMetricsTest(unittest.TestCase):
+    """Test case for RunMetrics."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_stage(self):
+        ended = []
+        metrics = RunMetrics(on_stage_end=lambda *args: ended.append(args[:2]))
+        for _ in range(2):
+            with metrics.stage("station", "parse") as parse_metrics:
+                parse_metrics.rows += 10
+                parse_metrics.skipped_blocks += 1
+
+        parse_metrics = metrics.get("station", "parse")
+        self.assertEqual(2, parse_metrics.calls)
+        self.assertEqual(20, parse_metrics.rows)
+        self.assertEqual(2, parse_metrics.skipped_blocks)
+        self.assertGreater(parse_metrics.duration, 0)
+        self.assertEqual([("station", "parse"), ("station", "parse")], ended)
+
+    def test_write_json(self):
+        metrics = RunMetrics()
+        with metrics.stage("station", "transfer") as transfer_metrics:
+            transfer_metrics.bytes += 1024
+            transfer_metrics.retries += 1
+        metrics.count("files_without_new_data")
+        metrics.skip_blocks("station", "240101/070101.CSV", [7, 19])
+        metrics.skip_blocks("station", "240101/070102.CSV", [])
+
+        path = os.path.join(self.tmpdir.name, "report.json")
+        metrics.write_json(path)
+        with open(path) as f:
+            report = json.load(f)
+
+        transfer = report["stations"]["station"]["transfer"]
+        self.assertEqual(1024, transfer["bytes"])
+        self.assertEqual(1, transfer["retries"])
+        self.assertIn("bytes_per_second", transfer)
+        self.assertEqual({"files_without_new_data": 1}, report["events"])
+        self.assertEqual(
+            {"station": {"240101/070101.CSV": [7, 19]}}, report["skipped_blocks"]
+        )
+
+    def test_write_prometheus(self):
+        metrics = RunMetrics()
+        with metrics.stage("station", "insert") as insert_metrics:
+            insert_metrics.rows += 428
+
+        path = os.path.join(self.tmpdir.name, "deflox.prom")
+        metrics.write_prometheus(path)
+        with open(path) as f:
+            lines = f.read().split("\n")
+
+        self.assertIn("# TYPE deflox_ingestion_stage_rows_total counter", lines)
+        self.assertIn(
+            'deflox_ingestion_stage_rows_total{station="station",stage="insert"} 428',
+            lines,
+        )
+        self.assertFalse(os.path.exists(f"{path}.tmp"))
+
+    def test_profile(self):
+        metrics = RunMetrics(profile_stages=("parse",))
+        with metrics.stage("station", "parse"):
+            sorted(range(1000))
+
+        path = os.path.join(self.tmpdir.name, "parse.prof")
+        metrics.write_profile(path)
+        stats = pstats.Stats(path)
+        self.assertTrue(
+            any(func[2] == "<built-in method builtins.sorted>" for func in stats.stats)
+        )
@@ -0,0 +1,150 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import pkgutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from deflox.ingestion.flox_data_reader import DataReader
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.outbox import Outbox
+from deflox.ingestion.sinks import MemorySink
+from test.sinks import FailingSink, rejecting_sink
+
+
+class OutboxTest(unittest.TestCase):
+    """Test case for the local outbox."""
+
+    def setUp(self):
+        data = pkgutil.get_data("test.ingestion.res", "240101/070101.CSV").decode()
+        self.gdf = DataReader().read(data.split("\n"))
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.outbox = Outbox(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_put(self):
+        paths = self.outbox.put("station-raw", "station", self.gdf)
+
+        self.assertEqual(1, len(paths))
+        self.assertEqual(
+            os.path.join(
+                self.tmpdir.name, "station-raw", "station=station", "day=2080-01-05"
+            ),
+            os.path.dirname(paths[0]),
+        )
+        self.assertTrue(os.path.basename(paths[0]).startswith("20800105T050119-"))
+        self.assertEqual([("station-raw", paths[0])], self.outbox.pending())
+        self.assertEqual(
+            datetime(2080, 1, 5, 5, 1, 19), self.outbox.latest_time("station-raw")
+        )
+        self.assertIsNone(self.outbox.latest_time("station-raw-f"))
+
+    def test_read(self):
+        path = self.outbox.put("station-raw", "station", self.gdf)[0]
+
+        gdf = self.outbox.read(path)
+
+        self.assertEqual(list(self.gdf.columns), list(gdf.columns))
+        self.assertEqual(self.gdf.crs, gdf.crs)
+        self.assertEqual(self.gdf["wr"].iloc[0], gdf["wr"].iloc[0])
+        self.assertIsInstance(gdf["wr"].iloc[0], list)
+        self.assertEqual(self.gdf["geometry"].iloc[0], gdf["geometry"].iloc[0])
+
+    def test_drain(self):
+        self.outbox.put("station-raw", "station", self.gdf)
+        metrics = RunMetrics()
+
+        self.assertEqual(0, self.outbox.drain(FailingSink(), "station", metrics))
+        self.assertEqual(1, len(self.outbox.pending()))
+        self.assertEqual(1, metrics.events["failed_drains"])
+
+        sink = MemorySink()
+        self.assertEqual(1, self.outbox.drain(sink, "station", metrics))
+        self.assertEqual(1, sink.row_count("station-raw"))
+        self.assertEqual([], self.outbox.pending())
+        self.assertEqual([], os.listdir(self.tmpdir.name))
+        self.assertEqual(1, metrics.get("station", "drain").rows)
+
+    def test_drain_collections_independently(self):
+        later = self.gdf.copy()
+        later["utc_datetime"] = "2080-01-05 06:00:00"
+        self.outbox.put("station-raw-processed", "station", self.gdf)
+        self.outbox.put("station-raw", "station", self.gdf)
+        self.outbox.put("station-raw", "station", later)
+        sink = rejecting_sink(lambda c: c == "station-raw-processed")
+        metrics = RunMetrics()
+
+        self.assertEqual(2, self.outbox.drain(sink, "station", metrics))
+
+        self.assertEqual(2, sink.row_count("station-raw"))
+        self.assertEqual(
+            ["station-raw-processed"], [c for c, _ in self.outbox.pending()]
+        )
+        self.assertEqual(1, metrics.events["failed_drains"])
+
+    def test_drain_station(self):
+        self.outbox.put("station-raw", "station", self.gdf)
+        self.outbox.put("other-raw", "other", self.gdf)
+        sink = MemorySink()
+
+        self.assertEqual(1, self.outbox.drain(sink, "station"))
+
+        # the files of other stations are left to their own runs
+        self.assertEqual(["station-raw"], list(sink.inserted))
+        self.assertEqual([], self.outbox.pending(station="station"))
+        self.assertEqual(["other-raw"], [c for c, _ in self.outbox.pending()])
+        self.assertIsNone(self.outbox.latest_time("other-raw", "station"))
+        self.assertIsNotNone(self.outbox.latest_time("other-raw", "other"))
+
+    def test_quarantine(self):
+        self.outbox.max_failures = 3
+        self.outbox.put("station-raw-processed", "station", self.gdf)
+        (path,) = [p for _, p in self.outbox.pending()]
+        metrics = RunMetrics()
+
+        for _ in range(2):
+            self.outbox.drain(
+                rejecting_sink(lambda c: c == "station-raw-processed"),
+                "station",
+                metrics,
+            )
+            self.assertEqual(1, len(self.outbox.pending()))
+        self.outbox.drain(
+            rejecting_sink(lambda c: c == "station-raw-processed"), "station", metrics
+        )
+
+        self.assertEqual([], self.outbox.pending())
+        self.assertIsNone(self.outbox.latest_time("station-raw-processed"))
+        (quarantined,) = self.outbox.quarantined()
+        self.assertEqual(
+            os.path.relpath(path, self.tmpdir.name),
+            os.path.relpath(quarantined, os.path.join(self.tmpdir.name, "_quarantine")),
+        )
+        self.assertEqual(3, metrics.events["failed_drains"])
+        self.assertEqual(1, metrics.events["quarantined_files"])
+        # a later success resets the count of failures
+        self.outbox.put("station-raw", "station", self.gdf)
+        self.outbox.drain(FailingSink(), "station", metrics)
+        self.outbox.drain(MemorySink(), "station", metrics)
+        self.assertEqual(["_quarantine"], os.listdir(self.tmpdir.name))
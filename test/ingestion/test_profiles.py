@@ -0,0 +1,164 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import geopandas
+import shapely
+
+from deflox.ingestion.ingest import ingest
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.profiles import Profile, parse_profiles, write_definitions
+from deflox.ingestion.sinks import MemorySink, SqliteSink
+from test.sinks import rejecting_sink
+
+
+class ProfileTest(unittest.TestCase):
+    """Test case for the ingest profiles."""
+
+    def setUp(self):
+        self.gdf = geopandas.GeoDataFrame(
+            {
+                "wr": [list(range(10)), list(range(10, 20))],
+                "DC_WR": [[1] * 10, [2] * 10],
+                "reflectance": [
+                    [0.1, 0.2, None, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0],
+                    [1.0] * 10,
+                ],
+                "voltage": [12.0, 12.1],
+            },
+            geometry=[shapely.Point(6.4, 50.8)] * 2,
+            crs="EPSG:4326",
+        )
+
+    def test_parse_profiles(self):
+        fluo, coarse = parse_profiles("fluo:2-5, coarse:0-6+8-9/3")
+
+        self.assertEqual("fluo", fluo.name)
+        self.assertEqual([(2, 5)], fluo.ranges)
+        self.assertEqual(1, fluo.bin_size)
+        self.assertEqual("coarse", coarse.name)
+        self.assertEqual([(0, 6), (8, 9)], coarse.ranges)
+        self.assertEqual(3, coarse.bin_size)
+        self.assertEqual([], parse_profiles(None))
+
+    def test_parse_invalid_profiles(self):
+        for text in [
+            "fluo",
+            "fluo:5",
+            "fluo:5-2",
+            "fluo:2-5/0",
+            "fluo:2-5/x",
+            "processed:2-5",
+            "fluo:2-5,fluo:6-7",
+            "f-x:0-10,x:0-10",
+            "fluo band:2-5",
+        ]:
+            with self.assertRaises(ValueError, msg=text):
+                parse_profiles(text)
+
+    def test_apply_subset(self):
+        result = Profile("fluo", [(2, 5)]).apply(self.gdf)
+
+        self.assertEqual([[2, 3, 4, 5], [12, 13, 14, 15]], list(result["wr"]))
+        self.assertEqual([[1] * 4, [2] * 4], list(result["DC_WR"]))
+        self.assertEqual([None, 0.4, 0.5, 0.6], result["reflectance"][0])
+        self.assertEqual([12.0, 12.1], list(result["voltage"]))
+        # the full-resolution rows are not changed
+        self.assertEqual(10, len(self.gdf["wr"][0]))
+
+    def test_apply_bins(self):
+        profile = Profile("coarse", [(0, 6), (8, 9)], 3)
+        result = profile.apply(self.gdf)
+
+        self.assertEqual([0, 3, 6, 8], profile.bin_firsts.tolist())
+        self.assertEqual([3, 3, 1, 2], profile.bin_sizes.tolist())
+        self.assertEqual([3, 12, 6, 17], result["wr"][0])
+        self.assertIsInstance(result["wr"][0][0], int)
+        self.assertEqual([33, 42, 16, 37], result["wr"][1])
+        reflectance = result["reflectance"][0]
+        # a bin with a missing channel is missing
+        self.assertIsNone(reflectance[0])
+        self.assertAlmostEqual(0.5, reflectance[1])
+        self.assertAlmostEqual(0.7, reflectance[2])
+        self.assertAlmostEqual(0.95, reflectance[3])
+
+    def test_apply_too_few_channels(self):
+        with self.assertRaises(ValueError):
+            Profile("wide", [(0, 10)]).apply(self.gdf)
+        # the ranges are not ordered
+        with self.assertRaises(ValueError):
+            Profile("unordered", [(12, 13), (0, 1)]).apply(self.gdf)
+
+    def test_write_definitions(self):
+        profile = Profile("coarse", [(0, 6), (8, 9)], 3)
+        for sink in [MemorySink(), SqliteSink()]:
+            for _ in range(2):
+                write_definitions(
+                    sink,
+                    "station",
+                    {"station-raw-coarse": profile},
+                    shapely.Point(6.4, 50.8),
+                    RunMetrics(),
+                )
+
+            rows = sink.get_rows(
+                "station-profiles", "collection", ["station-raw-coarse"]
+            )
+            self.assertEqual(1, len(rows))
+            self.assertEqual("coarse", rows["profile"][0])
+            self.assertEqual(4, rows["channels"][0])
+            definition = json.loads(rows["definition"][0])
+            self.assertEqual([[0, 6], [8, 9]], definition["ranges"])
+            self.assertEqual([3, 3, 1, 2], definition["bin_sizes"])
+            self.assertEqual("sum", definition["reductions"]["spectra"])
+
+    def test_ingest_rejected_profile(self):
+        with tempfile.TemporaryDirectory() as report_dir:
+            report_path = os.path.join(report_dir, "report.json")
+            env = {
+                "FTP_USER": "station",
+                "SOURCE_TYPE": "local",
+                "SOURCE_DIR": os.path.join(os.path.dirname(__file__), "res"),
+                "MAX_DAY_DIFF": "73000",
+                "INGEST_PROFILES": "fluo:640-850,coarse:0-1023/8",
+                "RUN_REPORT_JSON": report_path,
+            }
+            with (
+                mock.patch.dict(os.environ, env),
+                contextlib.redirect_stdout(io.StringIO()),
+            ):
+                sink = rejecting_sink(lambda c: c == "station-raw-fluo")
+                ingest(sink)
+            with open(report_path) as f:
+                report = json.load(f)
+
+        # the raw rows and the other profiles are written nevertheless
+        self.assertEqual(2, sink.row_count("station-raw"))
+        self.assertEqual(2, sink.row_count("station-raw-coarse"))
+        self.assertEqual(2, report["events"]["failed_profiles"])
+        definitions = sink.inserted["station-profiles"][0]
+        self.assertEqual(["station-raw-coarse"], list(definitions["collection"]))
@@ -0,0 +1,125 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from deflox.ingestion.ingest import ingest
+from deflox.ingestion.replay import replay
+from deflox.ingestion.sinks import MemorySink
+
+RES_DIR = os.path.join(os.path.dirname(__file__), "res")
+
+
+class ReplayTest(unittest.TestCase):
+    """Test case for the ingestion from a local directory."""
+
+    def test_replay(self):
+        sink = MemorySink()
+
+        self.assertEqual(2, replay(RES_DIR, "station", sink))
+
+        self.assertEqual(2, sink.row_count("station-raw"))
+        self.assertEqual(0, sink.row_count("station-raw-f"))
+        # the files are left in place
+        self.assertTrue(os.path.isfile(os.path.join(RES_DIR, "240101/070101.CSV")))
+
+        # rows which are in the sink already are filtered
+        self.assertEqual(2, replay(RES_DIR, "station", sink))
+        self.assertEqual(2, sink.row_count("station-raw"))
+
+    def test_replay_all_rows(self):
+        sink = MemorySink()
+        replay(RES_DIR, "station", sink)
+
+        self.assertEqual(2, replay(RES_DIR, "station", sink, all_rows=True))
+        self.assertEqual(4, sink.row_count("station-raw"))
+
+    def test_replay_parallel(self):
+        serial_sink = MemorySink()
+        parallel_sink = MemorySink()
+
+        replay(RES_DIR, "station", serial_sink)
+        replay(RES_DIR, "station", parallel_sink, workers=2)
+
+        serial = serial_sink.inserted["station-raw"]
+        parallel = parallel_sink.inserted["station-raw"]
+        self.assertEqual(len(serial), len(parallel))
+        for expected, actual in zip(serial, parallel):
+            self.assertTrue(expected.equals(actual))
+
+    def test_replay_range(self):
+        sink = MemorySink()
+
+        self.assertEqual(1, replay(RES_DIR, "station", sink, first_dir="240102"))
+        self.assertEqual(0, replay(RES_DIR, "station", sink, first_dir="240103"))
+
+    def test_replay_archive(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive_dir = os.path.join(tmpdir, "archive")
+            env = {
+                "FTP_USER": "station",
+                "SOURCE_TYPE": "local",
+                "SOURCE_DIR": RES_DIR,
+                "TEMP_DATA_DIR": tmpdir,
+                "MAX_DAY_DIFF": "73000",
+                "ARCHIVE_DIR": archive_dir,
+            }
+            with mock.patch.dict(os.environ, env):
+                sink = MemorySink()
+                ingest(sink)
+            self.assertTrue(
+                os.path.isfile(os.path.join(archive_dir, "240101", "070101.CSV.gz"))
+            )
+
+            replayed_sink = MemorySink()
+            self.assertEqual(
+                2, replay(archive_dir, "station", replayed_sink, archive=True)
+            )
+
+        expected = sink.inserted["station-raw"]
+        actual = replayed_sink.inserted["station-raw"]
+        self.assertEqual(len(expected), len(actual))
+        for expected_gdf, actual_gdf in zip(expected, actual):
+            self.assertTrue(expected_gdf.equals(actual_gdf))
+
+    def test_ingest_local_source(self):
+        self._ingest_local_source({})
+
+    def test_ingest_local_source_parse_workers(self):
+        self._ingest_local_source({"PARSE_WORKERS": "2"})
+
+    def _ingest_local_source(self, extra_env):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = {
+                **extra_env,
+                "FTP_USER": "station",
+                "SOURCE_TYPE": "local",
+                "SOURCE_DIR": RES_DIR,
+                "TEMP_DATA_DIR": tmpdir,
+                "MAX_DAY_DIFF": "73000",
+            }
+            with mock.patch.dict(os.environ, env):
+                sink = MemorySink()
+                ingest(sink)
+
+        self.assertEqual(2, sink.row_count("station-raw"))
@@ -0,0 +1,150 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import pkgutil
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+from deflox.ingestion.flox_data_reader import DataReader
+from deflox.ingestion.sinks import EARLIEST_TIME, GeoDBSink, MemorySink, SqliteSink
+
+
+class SinkTest(unittest.TestCase):
+    """Test case for the local sinks."""
+
+    def setUp(self):
+        data = pkgutil.get_data("test.ingestion.res", "240101/070101.CSV").decode()
+        self.gdf = DataReader().read(data.split("\n"))
+
+    def test_memory_sink(self):
+        sink = MemorySink()
+        self.assertEqual(EARLIEST_TIME, sink.get_latest_time("station-raw"))
+
+        sink.insert("station-raw", self.gdf)
+
+        self.assertEqual(1, sink.row_count("station-raw"))
+        self.assertEqual(0, sink.row_count("station-raw-f"))
+        self.assertEqual(
+            datetime(2080, 1, 5, 5, 1, 19), sink.get_latest_time("station-raw")
+        )
+
+    def test_sqlite_sink(self):
+        sink = SqliteSink()
+        self.assertEqual(EARLIEST_TIME, sink.get_latest_time("station-raw"))
+
+        sink.insert("station-raw", self.gdf)
+        sink.insert("station-raw", self.gdf)
+
+        self.assertEqual(2, sink.row_count("station-raw"))
+        self.assertEqual(
+            datetime(2080, 1, 5, 5, 1, 19), sink.get_latest_time("station-raw")
+        )
+        wr, geometry = sink.connection.execute(
+            'SELECT wr, geometry FROM "station-raw"'
+        ).fetchone()
+        self.assertTrue(wr.startswith("[1536, 1735, 1743"))
+        self.assertEqual("POINT (6.44715 50.86594)", geometry)
+        sink.close()
+
+    def test_get_time_range(self):
+        gdf = self.gdf.copy()
+        gdf["utc_datetime"] = "2080-01-05 05:01:19"
+        later = gdf.copy()
+        later["utc_datetime"] = "2080-01-05 06:00:00"
+        for sink in [MemorySink(), SqliteSink()]:
+            sink.insert("station-raw", later)
+            sink.insert("station-raw", gdf)
+
+            rows = sink.get_time_range(
+                "station-raw", datetime(2080, 1, 5), datetime(2080, 1, 6)
+            )
+            self.assertEqual(
+                ["2080-01-05 05:01:19", "2080-01-05 06:00:00"],
+                list(rows["utc_datetime"]),
+            )
+            self.assertEqual(1024, len(rows["wr"][0]))
+            rows = sink.get_time_range(
+                "station-raw", datetime(2080, 1, 5, 5, 1, 20), datetime(2080, 1, 5, 6)
+            )
+            self.assertEqual(0, len(rows))
+            rows = sink.get_time_range(
+                "station-missing", datetime(2080, 1, 5), datetime(2080, 1, 6)
+            )
+            self.assertEqual(0, len(rows))
+
+
+class GeoDBSinkTest(unittest.TestCase):
+    """Test case for the filters which `GeoDBSink` passes to the geoDB."""
+
+    def setUp(self):
+        self.geodb = mock.Mock()
+        self.sink = GeoDBSink(self.geodb, database="test")
+
+    def test_get_rows(self):
+        self.geodb.get_collection_pg.return_value = pd.DataFrame()
+
+        self.sink.get_rows(
+            "station-raw-daily",
+            "period_start",
+            ["2080-01-05 00:00:00", "it's"],
+        )
+
+        self.geodb.get_collection_pg.assert_called_once_with(
+            collection="station-raw-daily",
+            where="period_start IN ('2080-01-05 00:00:00', 'it''s')",
+            database="test",
+        )
+
+    def test_get_time_range(self):
+        self.sink.get_time_range(
+            "station-raw", datetime(2080, 1, 5), datetime(2080, 1, 6)
+        )
+
+        self.geodb.get_collection_pg.assert_called_once_with(
+            collection="station-raw",
+            where="utc_datetime >= '2080-01-05 00:00:00' "
+            "AND utc_datetime < '2080-01-06 00:00:00'",
+            order="utc_datetime",
+            database="test",
+        )
+
+    def test_replace_rows(self):
+        gdf = pd.DataFrame(
+            {"period_start": ["2080-01-05 00:00:00", 'a "b"'], "count": [1, 2]}
+        )
+
+        self.sink.replace_rows("station-raw-daily", "period_start", gdf)
+
+        self.assertEqual(
+            [
+                mock.call.delete_from_collection(
+                    "station-raw-daily",
+                    query='period_start=in.("2080-01-05 00:00:00","a \\"b\\"")',
+                    database="test",
+                ),
+                mock.call.insert_into_collection(
+                    "station-raw-daily", gdf, database="test"
+                ),
+            ],
+            self.geodb.mock_calls,
+        )
@@ -0,0 +1,111 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.sources import FtpSource, LocalSource, Source
+
+RES_DIR = os.path.join(os.path.dirname(__file__), "res")
+
+
+class LocalSourceTest(unittest.TestCase):
+    """Test case for the local directory source."""
+
+    def test_fetch(self):
+        source = LocalSource(RES_DIR)
+
+        files = source.fetch(RunMetrics())
+
+        self.assertEqual(
+            ["240101/070101.CSV", "240102/070102.CSV"],
+            [Source.key(f) for f in files],
+        )
+        self.assertTrue(all(os.path.isfile(f) for f in files))
+
+    def test_fetch_range(self):
+        source = LocalSource(RES_DIR)
+        metrics = RunMetrics()
+
+        self.assertEqual(
+            ["240102/070102.CSV"],
+            [Source.key(f) for f in source.fetch(metrics, first_dir="240102")],
+        )
+        self.assertEqual(
+            ["240101/070101.CSV"],
+            [Source.key(f) for f in source.fetch(metrics, last_dir="240101")],
+        )
+        self.assertEqual(
+            ["240102/070102.CSV"],
+            [
+                Source.key(f)
+                for f in source.fetch(metrics, exclude=["240101/070101.CSV"])
+            ],
+        )
+
+    def test_fetch_max_days(self):
+        with tempfile.TemporaryDirectory() as root:
+            shutil.copytree(os.path.join(RES_DIR, "240101"), f"{root}/240101")
+            shutil.copytree(os.path.join(RES_DIR, "240102"), f"{root}/240102")
+            old = time.time() - 10 * 86400
+            os.utime(f"{root}/240101/070101.CSV", (old, old))
+            os.utime(f"{root}/240102/070102.CSV")
+            source = LocalSource(root)
+
+            files = source.fetch(RunMetrics(), max_days=2)
+            source.release(files[0])
+
+            self.assertEqual(["240102/070102.CSV"], [Source.key(f) for f in files])
+            # local files are left in place
+            self.assertTrue(os.path.isfile(files[0]))
+
+    def test_fetch_skip_processed_products(self):
+        with tempfile.TemporaryDirectory() as root:
+            shutil.copytree(os.path.join(RES_DIR, "240101"), f"{root}/240101")
+            shutil.copy(
+                os.path.join(RES_DIR, "Reflectance_FLUO_070003.csv"), f"{root}/240101"
+            )
+            source = LocalSource(root)
+
+            self.assertEqual(2, len(source.fetch(RunMetrics())))
+            with mock.patch.dict(os.environ, {"SKIP_PROCESSED_PRODUCTS": "1"}):
+                files = source.fetch(RunMetrics())
+
+            self.assertEqual(["240101/070101.CSV"], [Source.key(f) for f in files])
+
+
+class FtpSourceTest(unittest.TestCase):
+    def test_release(self):
+        with tempfile.TemporaryDirectory() as target_dir:
+            os.makedirs(f"{target_dir}/240101")
+            for name in ["070101.CSV", "070102.CSV"]:
+                with open(f"{target_dir}/240101/{name}", "w") as f:
+                    f.write("data")
+            source = FtpSource(target_dir)
+
+            source.release(f"{target_dir}/240101/070101.CSV")
+            self.assertEqual(["070102.CSV"], os.listdir(f"{target_dir}/240101"))
+            source.release(f"{target_dir}/240101/070102.CSV")
+            self.assertEqual([], os.listdir(target_dir))
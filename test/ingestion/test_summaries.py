@@ -0,0 +1,255 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic_data
+from deflox.ingestion.flox_data_reader import DataReader
+from deflox.ingestion.ingest import ingest
+from deflox.ingestion.metrics import RunMetrics
+from deflox.ingestion.sinks import MemorySink, SqliteSink
+from deflox.ingestion.summaries import Summarizer, parse_bands, parse_periods
+from test.sinks import FailingSink
+
+
+class IsoTimeSink(MemorySink):
+    """Returns the period starts like the geoDB, in ISO format."""
+
+    def get_rows(self, collection, column, values):
+        rows = super().get_rows(collection, column, values)
+        if len(rows) > 0:
+            rows[column] = rows[column].str.replace(" ", "T")
+        return rows
+
+
+class ParseTest(unittest.TestCase):
+    def test_parse_periods(self):
+        self.assertEqual(["hourly", "daily"], parse_periods("hourly, daily"))
+        self.assertEqual([], parse_periods(None))
+        with self.assertRaises(ValueError):
+            parse_periods("weekly")
+
+    def test_parse_bands(self):
+        self.assertEqual({"total": (0, 1024)}, parse_bands(None))
+        self.assertEqual(
+            {"red": (620, 701), "nir": (800, 1024)},
+            parse_bands("red:620-700,nir:800-1023"),
+        )
+        with self.assertRaises(ValueError):
+            parse_bands("red:620")
+        with self.assertRaises(ValueError):
+            parse_bands("red:620-1024")
+
+
+class SummarizerTest(unittest.TestCase):
+    """Test case for the summary collections."""
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as work_dir:
+            # 100 measurements every 90 seconds, spanning three hours
+            (path,) = synthetic_data.generate(work_dir, cycles=100, f_prefixed=False)
+            with open(path) as f, contextlib.redirect_stdout(io.StringIO()):
+                cls.gdf = DataReader().read(f.readlines())
+
+    def test_summaries(self):
+        sink = MemorySink()
+        summarizer = Summarizer(["hourly", "daily"], parse_bands("red:10-19"))
+
+        summarizer.add("station-raw", self.gdf)
+        summarizer.write(sink, "station", RunMetrics())
+
+        hourly = sink.get_rows("station-raw-hourly", "period_start", self._hours())
+        self.assertEqual(self._hours(), list(hourly["period_start"]))
+        self.assertEqual(len(self.gdf), hourly["count"].sum())
+        self._assert_statistics(hourly.iloc[1], self._hours()[1])
+
+        daily = sink.get_rows("station-raw-daily", "period_start", [self._day()])
+        self.assertEqual(1, len(daily))
+        self.assertEqual(len(self.gdf), daily["count"].iloc[0])
+        self._assert_statistics(daily.iloc[0], None)
+
+    def test_incremental_summaries(self):
+        for sink in [MemorySink(), SqliteSink()]:
+            # two runs, the second one updating the periods of the first one
+            for gdf in [self.gdf.iloc[:50], self.gdf.iloc[50:]]:
+                summarizer = Summarizer(["hourly", "daily"], parse_bands("red:10-19"))
+                summarizer.add("station-raw", gdf)
+                summarizer.write(sink, "station", RunMetrics())
+
+            self.assertEqual(3, sink.row_count("station-raw-hourly"))
+            self.assertEqual(1, sink.row_count("station-raw-daily"))
+            hourly = sink.get_rows("station-raw-hourly", "period_start", self._hours())
+            hourly = hourly.sort_values("period_start").reset_index(drop=True)
+            for i, hour in enumerate(self._hours()):
+                self._assert_statistics(hourly.iloc[i], hour)
+            daily = sink.get_rows("station-raw-daily", "period_start", [self._day()])
+            self._assert_statistics(daily.iloc[0], None)
+
+    def test_iso_period_starts(self):
+        sink = IsoTimeSink()
+        for gdf in [self.gdf.iloc[:50], self.gdf.iloc[50:]]:
+            summarizer = Summarizer(["daily"], parse_bands("red:10-19"))
+            summarizer.add("station-raw", gdf)
+            metrics = RunMetrics()
+            summarizer.write(sink, "station", metrics)
+            self.assertEqual({}, metrics.events)
+
+        self.assertEqual(1, sink.row_count("station-raw-daily"))
+        daily = MemorySink.get_rows(
+            sink, "station-raw-daily", "period_start", [self._day()]
+        )
+        self._assert_statistics(daily.iloc[0], None)
+
+    def test_ingest_summaries(self):
+        env = {
+            "FTP_USER": "station",
+            "SOURCE_TYPE": "local",
+            "SOURCE_DIR": os.path.join(os.path.dirname(__file__), "res"),
+            "MAX_DAY_DIFF": "73000",
+            "SUMMARY_PERIODS": "daily",
+        }
+        with mock.patch.dict(os.environ, env):
+            sink = MemorySink()
+            ingest(sink)
+
+        daily = sink.inserted["station-raw-daily"][0]
+        self.assertEqual(["2080-01-05 00:00:00"], list(daily["period_start"]))
+        self.assertEqual(2, daily["count"].iloc[0])
+        self.assertNotIn("station-raw-hourly", sink.inserted)
+
+    def test_pending_summaries(self):
+        with tempfile.TemporaryDirectory() as pending_dir:
+            summarizer = Summarizer(["daily"], parse_bands("red:10-19"), pending_dir)
+            summarizer.add("station-raw", self.gdf.iloc[:50])
+            metrics = RunMetrics()
+            with contextlib.redirect_stdout(io.StringIO()):
+                summarizer.write(FailingSink(), "station", metrics)
+            self.assertEqual(1, metrics.events["failed_summaries"])
+            self.assertEqual(["station-raw-daily.json"], os.listdir(pending_dir))
+
+            # the next run merges the kept statistics with its own ones
+            sink = MemorySink()
+            summarizer = Summarizer(["daily"], parse_bands("red:10-19"), pending_dir)
+            summarizer.add("station-raw", self.gdf.iloc[50:])
+            summarizer.write(sink, "station", RunMetrics())
+            self.assertEqual([], os.listdir(pending_dir))
+
+        daily = sink.get_rows("station-raw-daily", "period_start", [self._day()])
+        self._assert_statistics(daily.iloc[0], None)
+
+    def test_pending_merged_summaries(self):
+        sink = FailingSink(lambda collection: False)
+        summarizer = Summarizer(["daily"], parse_bands("red:10-19"))
+        summarizer.add("station-raw", self.gdf.iloc[:30])
+        summarizer.write(sink, "station", RunMetrics())
+
+        with tempfile.TemporaryDirectory() as pending_dir:
+            # the replace deletes the existing rows, but fails to insert
+            sink.fails = lambda collection: True
+            summarizer = Summarizer(["daily"], parse_bands("red:10-19"), pending_dir)
+            summarizer.add("station-raw", self.gdf.iloc[30:60])
+            with contextlib.redirect_stdout(io.StringIO()):
+                summarizer.write(sink, "station", RunMetrics())
+            self.assertEqual(0, sink.row_count("station-raw-daily"))
+
+            # the kept statistics include the deleted rows
+            sink.fails = lambda collection: False
+            summarizer = Summarizer(["daily"], parse_bands("red:10-19"), pending_dir)
+            summarizer.add("station-raw", self.gdf.iloc[60:])
+            summarizer.write(sink, "station", RunMetrics())
+            self.assertEqual([], os.listdir(pending_dir))
+
+        self.assertEqual(1, sink.row_count("station-raw-daily"))
+        daily = sink.get_rows("station-raw-daily", "period_start", [self._day()])
+        self._assert_statistics(daily.iloc[0], None)
+
+    def test_ingest_drained_summaries(self):
+        env = {
+            "FTP_USER": "station",
+            "SOURCE_TYPE": "local",
+            "SOURCE_DIR": os.path.join(os.path.dirname(__file__), "res"),
+            "MAX_DAY_DIFF": "73000",
+            "SUMMARY_PERIODS": "daily",
+            "SPECTRUM_ENCODING": "binary+delta+zlib",
+        }
+        with (
+            tempfile.TemporaryDirectory() as outbox_dir,
+            mock.patch.dict(os.environ, dict(env, OUTBOX_DIR=outbox_dir)),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            ingest(FailingSink())
+            sink = MemorySink()
+            ingest(sink)
+
+        # the rows are summarized once, when they are drained from the outbox
+        daily = sink.inserted["station-raw-daily"][0]
+        self.assertEqual(2, daily["count"].iloc[0])
+        self.assertEqual(2, sink.row_count("station-raw"))
+
+    def test_ingest_pending_summaries_of_station(self):
+        env = {
+            "FTP_USER": "station",
+            "SOURCE_TYPE": "local",
+            "SOURCE_DIR": os.path.join(os.path.dirname(__file__), "res"),
+            "MAX_DAY_DIFF": "73000",
+            "SUMMARY_PERIODS": "daily",
+        }
+        with (
+            tempfile.TemporaryDirectory() as outbox_dir,
+            mock.patch.dict(os.environ, dict(env, OUTBOX_DIR=outbox_dir)),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            ingest(FailingSink(lambda c: c.endswith("-daily")))
+            summaries_dir = os.path.join(outbox_dir, "_summaries")
+            self.assertEqual(["station=station"], os.listdir(summaries_dir))
+            self.assertEqual(
+                ["station-raw-daily.json"],
+                os.listdir(os.path.join(summaries_dir, "station=station")),
+            )
+
+    def _assert_statistics(self, row, hour):
+        times = pd.to_datetime(self.gdf["utc_datetime"])
+        selected = self.gdf[times.dt.floor("h") == hour] if hour else self.gdf
+        wr = np.asarray(selected["wr"].tolist())
+        self.assertEqual(len(selected), row["count"])
+        np.testing.assert_allclose(wr.mean(axis=0), row["wr_mean"])
+        np.testing.assert_array_equal(wr.min(axis=0), row["wr_min"])
+        np.testing.assert_array_equal(wr.max(axis=0), row["wr_max"])
+        self.assertAlmostEqual(wr[:, 10:20].sum(axis=1).mean(), row["wr_red"])
+        self.assertAlmostEqual(selected["GPS_lat"].mean(), row["GPS_lat"])
+
+    def _hours(self):
+        times = pd.to_datetime(self.gdf["utc_datetime"])
+        return sorted(
+            t.strftime("%Y-%m-%d %H:%M:%S") for t in times.dt.floor("h").unique()
+        )
+
+    def _day(self):
+        times = pd.to_datetime(self.gdf["utc_datetime"])
+        return times.iloc[0].floor("D").strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,51 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+from typing import Callable, Type
+
+from deflox.ingestion.sinks import MemorySink
+
+
+class FailingSink(MemorySink):
+    """
+    A sink which cannot insert into the collections for which `fails`
+    returns True; by default into any collection. The default error acts as
+    if the sink was not available; pass `ValueError` to act as if the
+    collections did not exist.
+    """
+
+    def __init__(
+        self,
+        fails: Callable[[str], bool] = lambda collection: True,
+        error: Type[Exception] = ConnectionError,
+    ):
+        super().__init__()
+        self.fails = fails
+        self.error = error
+
+    def insert(self, collection, gdf):
+        if self.fails(collection):
+            raise self.error(f"cannot insert into {collection}")
+        super().insert(collection, gdf)
+
+
+def rejecting_sink(fails: Callable[[str], bool]) -> FailingSink:
+    """Returns a sink which rejects the matching collections as missing."""
+    return FailingSink(fails, ValueError)
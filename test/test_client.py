@@ -0,0 +1,167 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import geopandas
+import numpy as np
+import shapely
+
+from deflox.client import FloxClient
+from deflox.ingestion.sinks import MemorySink, SqliteSink
+from deflox.spectra import encode_spectra_columns
+
+START = datetime(2024, 11, 5, 6)
+
+
+def _rows(first: int, count: int, encoding: str = "list"):
+    times = [START + timedelta(minutes=i) for i in range(first, first + count)]
+    gdf = geopandas.GeoDataFrame(
+        {
+            "utc_datetime": [t.strftime("%Y-%m-%d %H:%M:%S") for t in times],
+            "voltage": [12.0 + i / 100 for i in range(first, first + count)],
+            "wr": [[i, i + 1, i + 2] for i in range(first, first + count)],
+        },
+        geometry=[shapely.Point(6.4, 50.8)] * count,
+        crs="EPSG:4326",
+    )
+    return encode_spectra_columns(gdf, encoding)
+
+
+class FloxClientTest(unittest.TestCase):
+    """Test case for reading collections back."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.sink = MemorySink()
+        self.sink.insert("station-raw", _rows(0, 30))
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_read(self):
+        for sink in [self.sink, SqliteSink()]:
+            if isinstance(sink, SqliteSink):
+                sink.insert("station-raw", _rows(0, 30))
+            client = FloxClient(sink, cache_dir=None)
+
+            result = client.read(
+                "station", START + timedelta(minutes=5), START + timedelta(minutes=10)
+            )
+
+            self.assertEqual(5, len(result))
+            self.assertEqual("2024-11-05 06:05:00", result.gdf["utc_datetime"][0])
+            self.assertEqual([[5, 6, 7], [6, 7, 8]], result.spectra["wr"][:2].tolist())
+            self.assertNotIn("wr", result.gdf.columns)
+            self.assertEqual(6.4, result.gdf.geometry[0].x)
+
+    def test_read_encoded(self):
+        sink = MemorySink()
+        sink.insert("station-raw", _rows(0, 3, "binary+delta+zlib"))
+        result = FloxClient(sink).read("station", START, START + timedelta(hours=1))
+
+        self.assertEqual(
+            [[0, 1, 2], [1, 2, 3], [2, 3, 4]], result.spectra["wr"].tolist()
+        )
+
+    def test_read_cached(self):
+        client = FloxClient(self.sink, cache_dir=self.cache_dir.name)
+        end = START + timedelta(minutes=10)
+        first = client.read("station", START, end)
+
+        with mock.patch.object(
+            self.sink, "get_time_range", wraps=self.sink.get_time_range
+        ) as get_time_range:
+            second = client.read("station", START, end)
+            get_time_range.assert_not_called()
+
+        self.assertTrue(first.gdf.equals(second.gdf))
+        np.testing.assert_array_equal(first.spectra["wr"], second.spectra["wr"])
+
+    def test_refresh_incrementally(self):
+        client = FloxClient(self.sink, cache_dir=self.cache_dir.name)
+        end = START + timedelta(hours=1)
+        self.assertEqual(30, len(client.read("station", START, end)))
+
+        self.sink.insert("station-raw", _rows(30, 10))
+        with mock.patch.object(
+            self.sink, "get_time_range", wraps=self.sink.get_time_range
+        ) as get_time_range:
+            result = client.read("station", START, end)
+            # only the appended rows are fetched
+            get_time_range.assert_called_once_with(
+                "station-raw",
+                START + timedelta(minutes=29, seconds=1),
+                START + timedelta(minutes=39, seconds=1),
+            )
+
+        self.assertEqual(40, len(result))
+        self.assertEqual(list(range(40)), result.spectra["wr"][:, 0].tolist())
+        self.assertEqual("2024-11-05 06:39:00", result.gdf["utc_datetime"].iloc[-1])
+
+        # nothing appended
+        with mock.patch.object(self.sink, "get_time_range") as get_time_range:
+            self.assertEqual(40, len(client.read("station", START, end)))
+            get_time_range.assert_not_called()
+
+    def test_read_empty_collection(self):
+        client = FloxClient(MemorySink(), cache_dir=self.cache_dir.name)
+        end = START + timedelta(hours=1)
+
+        self.assertEqual(0, len(client.read("station", START, end)))
+        self.assertEqual(0, len(client.read("station", START, end)))
+
+    def test_evict(self):
+        client = FloxClient(self.sink, cache_dir=self.cache_dir.name)
+        for minute in range(3):
+            client.read("station", START, START + timedelta(minutes=minute + 1))
+        sizes = [
+            sum(os.path.getsize(os.path.join(root, f)) for f in files)
+            for root, _, files in os.walk(self.cache_dir.name)
+            if files
+        ]
+        self.assertEqual(3, len(sizes))
+
+        # the first slice has been used most recently
+        client.read("station", START, START + timedelta(minutes=1))
+        client.max_cache_bytes = max(sizes) * 2 + 1
+        client.read("station", START, START + timedelta(minutes=4))
+
+        entries = os.listdir(self.cache_dir.name)
+        self.assertEqual(2, len(entries))
+        self.assertIn(
+            client._entry_path(
+                "station-raw", START, START + timedelta(minutes=1)
+            ).split(os.sep)[-1],
+            entries,
+        )
+
+    def test_read_from_env(self):
+        with mock.patch.dict(
+            os.environ,
+            {"SINK_TYPE": "memory", "READ_CACHE_DIR": self.cache_dir.name},
+        ):
+            client = FloxClient()
+        self.assertIsInstance(client.sink, MemorySink)
+        self.assertEqual(self.cache_dir.name, client.cache_dir)
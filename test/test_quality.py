@@ -0,0 +1,145 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic_data
+from deflox import quality
+from deflox.ingestion import flox_data_reader
+from deflox.ingestion.flox_data_reader import DataReader
+from deflox.quality import (
+    DARK_CURRENT,
+    MULTICAL,
+    SATURATED,
+    TEMPERATURE,
+    VOLTAGE,
+    QualityLimits,
+)
+
+
+class QualityTest(unittest.TestCase):
+    """Test case for the quality control."""
+
+    def test_count_spectra(self):
+        spectra = np.full((5, 2, 4), 1000, dtype=np.int64)
+        spectra[0, 0, :2] = 200000
+        spectra[2, 0, 3] = 250000
+        spectra[4, 1] = [10, 20, 30, 40]
+
+        counters = quality.count_spectra(spectra, 200000)
+
+        self.assertEqual([3, 0], counters["qc_saturated"].tolist())
+        self.assertEqual([1000.0, 1000.0], counters["qc_dc_wr"].tolist())
+        self.assertEqual([1000.0, 25.0], counters["qc_dc_veg"].tolist())
+
+    def test_compute_flags(self):
+        df = pd.DataFrame(
+            {
+                "qc_saturated": [0, 3, 0, 0, 0],
+                "qc_dc_wr": [1600.0, 1600.0, 100.0, 1600.0, 1600.0],
+                "qc_dc_veg": [1600.0, 1600.0, 1600.0, 1600.0, np.nan],
+                "MultiCal": [0, 0, 0, 4, 0],
+                "mainboard_temp[C]": [25.0, 25.0, 25.0, 70.0, 25.0],
+                "voltage": [12.0, 12.0, 12.0, 12.0, 10.5],
+            }
+        )
+
+        flags = quality.compute_flags(df, QualityLimits())
+
+        self.assertEqual(np.uint8, flags.dtype)
+        self.assertEqual(
+            [0, SATURATED, DARK_CURRENT, MULTICAL | TEMPERATURE, VOLTAGE],
+            flags.tolist(),
+        )
+
+    def test_parse_range(self):
+        self.assertEqual((11.0, 15.0), quality.parse_range("11:15"))
+        self.assertEqual((-20.0, 60.0), quality.parse_range("-20:60"))
+        with self.assertRaises(ValueError):
+            quality.parse_range("15")
+        with self.assertRaises(ValueError):
+            quality.parse_range("15:11")
+
+    def test_from_env(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(QualityLimits.from_env())
+        with mock.patch.dict(
+            os.environ,
+            {"QC_FLAGS": "1", "QC_SATURATION": "60000", "QC_VOLTAGE": "23:25"},
+            clear=True,
+        ):
+            limits = QualityLimits.from_env()
+        self.assertEqual(60000, limits.saturation)
+        self.assertEqual((23.0, 25.0), limits.voltage)
+        self.assertEqual((-20.0, 60.0), limits.temperature)
+
+
+class ReadQualityTest(unittest.TestCase):
+    """Checks the quality control columns added by the reader."""
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as work_dir:
+            (path,) = synthetic_data.generate(
+                work_dir, cycles=20, f_prefixed=False, corrupt_every=9
+            )
+            with open(path) as f:
+                cls.lines = f.readlines()
+
+    def test_read(self):
+        limits = QualityLimits(saturation=20000)
+        with (
+            mock.patch.object(flox_data_reader, "BUFFER_BLOCKS", 4),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            gdf = DataReader().read(self.lines, quality=limits)
+            plain = DataReader().read(self.lines)
+
+        self.assertEqual(
+            list(plain.columns[:-1]) + quality.QC_COLUMNS, list(gdf.columns[:-1])
+        )
+        wr = np.array(gdf["wr"].tolist())
+        veg = np.array(gdf["veg"].tolist())
+        wr2 = np.array(gdf["wr2"].tolist())
+        expected = (wr >= 20000).sum(axis=1) + (veg >= 20000).sum(axis=1)
+        expected += (wr2 >= 20000).sum(axis=1)
+        self.assertEqual(expected.tolist(), gdf["qc_saturated"].tolist())
+        self.assertTrue(
+            np.allclose(np.array(gdf["DC_VEG"].tolist()).mean(axis=1), gdf["qc_dc_veg"])
+        )
+        self.assertEqual(
+            (gdf["MultiCal"] != 0).tolist(), (gdf["qc_flags"] & MULTICAL > 0).tolist()
+        )
+        self.assertTrue((gdf["qc_flags"] & SATURATED > 0).all())
+
+        report = quality.report(gdf)
+        self.assertEqual(len(gdf), report["blocks"])
+        self.assertEqual(len(gdf), report["flags"]["saturated"])
+        self.assertEqual(int(expected.sum()), report["saturated_channels"])
+        self.assertEqual(plain.attrs["skipped_blocks"], report["skipped_blocks"])
+        self.assertEqual(2, len(report["skipped_blocks"]))
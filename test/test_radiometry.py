@@ -0,0 +1,230 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import geopandas
+import numpy as np
+
+from benchmarks import synthetic_data
+from deflox.ingestion.flox_data_reader import DataReader
+from deflox.ingestion.ingest import ingest
+from deflox.ingestion.sinks import MemorySink
+from deflox.radiometry import (
+    CalibrationTable,
+    compute_products,
+    load_station_calibration,
+    to_products_gdf,
+)
+from deflox.spectra import encode_spectra_columns
+from test.sinks import rejecting_sink
+
+RES_DIR = os.path.join(os.path.dirname(__file__), "ingestion", "res")
+
+
+def _write_calibration(path: str, channels: int = 1024):
+    with open(path, "w") as f:
+        f.write("wl;wr;veg\n")
+        for i in range(channels):
+            f.write(f"{400 + i * 0.5};{0.01 + i * 1e-5};{0.02 + i * 1e-5}\n")
+
+
+class RadiometryTest(unittest.TestCase):
+    """Test case for the radiometric processing."""
+
+    def setUp(self):
+        self.gdf = geopandas.GeoDataFrame(
+            {
+                "wr": [[110, 210, 10], [120, 220, 20]],
+                "wr2": [[130, 230, 10], [120, 220, 20]],
+                "veg": [[60, 110, 10], [70, 120, 20]],
+                "DC_WR": [[10, 10, 10], [20, 20, 20]],
+                "DC_VEG": [[10, 10, 10], [20, 20, 20]],
+                "IT_WR[us]": [2000.0, 4000.0],
+                "IT_VEG[us]": [5000.0, 5000.0],
+                "utc_datetime": ["2024-01-01 10:00:00", "2024-01-01 10:01:00"],
+                "GPS_lat": [50.0, 50.0],
+                "GPS_lon": [6.0, 6.0],
+            },
+            geometry=geopandas.points_from_xy([6.0, 6.0], [50.0, 50.0]),
+            crs="EPSG:4326",
+        )
+        self.calibration = CalibrationTable([500, 600, 700], [2, 2, 2], [3, 3, 3])
+
+    def test_compute_products(self):
+        products = compute_products(self.gdf, self.calibration)
+
+        # the mean of wr and wr2, dark-corrected, per ms, times the gain
+        np.testing.assert_allclose(
+            [[110, 210, 0], [50, 100, 0]], products["incoming_radiance"]
+        )
+        np.testing.assert_allclose(
+            [[30, 60, 0], [30, 60, 0]], products["reflected_radiance"]
+        )
+        np.testing.assert_allclose(
+            [[30 / 110, 60 / 210, np.nan], [0.6, 0.6, np.nan]],
+            products["reflectance"],
+        )
+
+    def test_compute_products_without_wr2(self):
+        products = compute_products(self.gdf.drop(columns="wr2"), self.calibration)
+
+        np.testing.assert_allclose(
+            [[100, 200, 0], [50, 100, 0]], products["incoming_radiance"]
+        )
+
+    def test_compute_products_encoded(self):
+        encoded = encode_spectra_columns(self.gdf, "binary+delta+zlib")
+
+        expected = compute_products(self.gdf, self.calibration)
+        actual = compute_products(encoded, self.calibration)
+
+        for name in expected:
+            np.testing.assert_array_equal(expected[name], actual[name])
+
+    def test_compute_products_vectorized(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            (path,) = synthetic_data.generate(work_dir, cycles=20, f_prefixed=False)
+            with open(path) as f, contextlib.redirect_stdout(io.StringIO()):
+                gdf = DataReader().read(f.readlines())
+            calibration_path = os.path.join(work_dir, "station.csv")
+            _write_calibration(calibration_path)
+            calibration = CalibrationTable.read(calibration_path)
+
+        products = compute_products(gdf, calibration)
+
+        # compare against the measurements computed one by one
+        for i in range(len(gdf)):
+            row = gdf.iloc[i]
+            dark = np.asarray(row["DC_WR"])
+            wr = (np.asarray(row["wr"]) - dark) / (row["IT_WR[us]"] / 1000)
+            wr2 = (np.asarray(row["wr2"]) - dark) / (row["IT_WR[us]"] / 1000)
+            incoming = (wr + wr2) / 2 * calibration.wr_gain
+            np.testing.assert_allclose(incoming, products["incoming_radiance"][i])
+
+    def test_to_products_gdf(self):
+        products = to_products_gdf(self.gdf, self.calibration)
+
+        self.assertEqual(
+            [
+                "utc_datetime",
+                "IT_WR[us]",
+                "IT_VEG[us]",
+                "GPS_lat",
+                "GPS_lon",
+                "geometry",
+                "incoming_radiance",
+                "reflected_radiance",
+                "reflectance",
+            ],
+            list(products.columns),
+        )
+        self.assertEqual([0.6, 0.6, None], products["reflectance"].iloc[1])
+        self.assertEqual(self.gdf.crs, products.crs)
+
+    def test_read_calibration(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            path = os.path.join(work_dir, "station.csv")
+            _write_calibration(path, channels=3)
+            calibration = CalibrationTable.read(path)
+
+            self.assertEqual([400, 400.5, 401], calibration.wavelengths.tolist())
+            self.assertEqual(0.02001, calibration.veg_gain[1])
+
+            with open(path, "w") as f:
+                f.write("wl;wr\n400;1\n")
+            with self.assertRaises(ValueError):
+                CalibrationTable.read(path)
+
+    def test_load_station_calibration(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            self.assertIsNone(load_station_calibration(None, "station"))
+
+            _write_calibration(os.path.join(work_dir, "station.csv"))
+            calibration = load_station_calibration(work_dir, "station")
+            self.assertEqual(1024, len(calibration.wr_gain))
+
+            _write_calibration(os.path.join(work_dir, "station.csv"), channels=1023)
+            with self.assertRaisesRegex(ValueError, "has 1023 rows"):
+                load_station_calibration(work_dir, "station")
+
+    def test_ingest_products(self):
+        with tempfile.TemporaryDirectory() as calibration_dir:
+            _write_calibration(os.path.join(calibration_dir, "station.csv"))
+            env = {
+                "FTP_USER": "station",
+                "SOURCE_TYPE": "local",
+                "SOURCE_DIR": RES_DIR,
+                "MAX_DAY_DIFF": "73000",
+                "CALIBRATION_DIR": calibration_dir,
+                "INGEST_PROFILES": "fluo:640-850/2",
+            }
+            with mock.patch.dict(os.environ, env):
+                sink = MemorySink()
+                ingest(sink)
+
+        self.assertEqual(2, sink.row_count("station-raw-processed"))
+        products = sink.inserted["station-raw-processed"][0]
+        self.assertEqual(1024, len(products["reflectance"].iloc[0]))
+        self.assertEqual("2080-01-05 05:01:19", products["utc_datetime"].iloc[0])
+        # binned products are the means of their channels
+        self.assertEqual(2, sink.row_count("station-raw-processed-fluo"))
+        binned = sink.inserted["station-raw-processed-fluo"][0]
+        reflectance = products["reflectance"].iloc[0]
+        self.assertEqual(106, len(binned["reflectance"].iloc[0]))
+        self.assertAlmostEqual(
+            (reflectance[640] + reflectance[641]) / 2, binned["reflectance"].iloc[0][0]
+        )
+        self.assertEqual(
+            ["station-raw-fluo", "station-raw-processed-fluo"],
+            sorted(sink.inserted["station-profiles"][0]["collection"]),
+        )
+
+    def test_ingest_rejected_products(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            _write_calibration(os.path.join(work_dir, "station.csv"))
+            report_path = os.path.join(work_dir, "report.json")
+            env = {
+                "FTP_USER": "station",
+                "SOURCE_TYPE": "local",
+                "SOURCE_DIR": RES_DIR,
+                "MAX_DAY_DIFF": "73000",
+                "CALIBRATION_DIR": work_dir,
+                "RUN_REPORT_JSON": report_path,
+            }
+            with (
+                mock.patch.dict(os.environ, env),
+                contextlib.redirect_stdout(io.StringIO()),
+            ):
+                sink = rejecting_sink(lambda c: c.endswith("-processed"))
+                ingest(sink)
+            with open(report_path) as f:
+                report = json.load(f)
+
+        # the raw rows are inserted although the products are rejected
+        self.assertEqual(2, sink.row_count("station-raw"))
+        self.assertEqual(0, sink.row_count("station-raw-processed"))
+        self.assertEqual(2, report["events"]["failed_products"])
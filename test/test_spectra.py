@@ -0,0 +1,86 @@
+# The MIT License (MIT)
+# Copyright (c) 2025 by the xcube team
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+import base64
+import json
+import pkgutil
+import unittest
+
+import numpy as np
+
+from deflox.ingestion.flox_data_reader import DataReader
+from deflox.spectra import (
+    decode_spectra,
+    decode_spectrum,
+    encode_spectra_columns,
+    encode_spectrum,
+    parse_encoding,
+)
+
+
+class SpectraTest(unittest.TestCase):
+    """Test case for the binary encoding of spectra."""
+
+    def setUp(self):
+        data = pkgutil.get_data("test.ingestion.res", "240101/070101.CSV").decode()
+        self.gdf = DataReader().read(data.split("\n"))
+        self.wr = self.gdf["wr"][0]
+
+    def test_round_trip(self):
+        for delta in [False, True]:
+            for compress in [False, True]:
+                encoded = encode_spectrum(self.wr, delta=delta, compress=compress)
+                np.testing.assert_array_equal(self.wr, decode_spectrum(encoded))
+
+    def test_size(self):
+        as_json = len(json.dumps(self.wr))
+        plain = len(encode_spectrum(self.wr))
+        packed = len(encode_spectrum(self.wr, delta=True, compress=True))
+        self.assertLess(plain, as_json)
+        self.assertLess(packed, plain / 2)
+
+    def test_decode_without_copy(self):
+        blob = base64.b64decode(encode_spectrum(self.wr))
+        decoded = decode_spectrum(blob)
+        self.assertFalse(decoded.flags.owndata)
+        self.assertFalse(decoded.flags.writeable)
+        self.assertEqual(1536, decoded[0])
+
+    def test_decode_invalid(self):
+        with self.assertRaises(ValueError):
+            decode_spectrum(base64.b64encode(b"XX\x01\x00").decode())
+
+    def test_parse_encoding(self):
+        self.assertIsNone(parse_encoding("list"))
+        self.assertEqual(
+            {"delta": True, "compress": True}, parse_encoding("binary+delta+zlib")
+        )
+        self.assertEqual({"delta": False, "compress": False}, parse_encoding("binary"))
+        with self.assertRaises(ValueError):
+            parse_encoding("binary+lz4")
+
+    def test_encode_spectra_columns(self):
+        encoded = encode_spectra_columns(self.gdf, "binary+delta")
+        self.assertIsInstance(encoded["wr"][0], str)
+        self.assertIsInstance(self.gdf["wr"][0], list)
+        spectra = decode_spectra(encoded["DC_VEG"])
+        self.assertEqual((1, 1024), spectra.shape)
+        np.testing.assert_array_equal(self.gdf["DC_VEG"][0], spectra[0])
+        self.assertIs(self.gdf, encode_spectra_columns(self.gdf, "list"))